@@ -0,0 +1,79 @@
+"""Benchmark of reader polling strategies on a plain Linux box (no RFID hardware needed).
+
+Runs each strategy against the same scripted taps on a FakeMFRC522 and reports
+CPU time, SPI requests and detection latency (card placed -> on_tag):
+    python bench_reader.py --duration 20 --taps 10
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from rfid_reader import FakeIrqReader, FakeMFRC522, PollingScheduler, RFID
+
+
+def make_taps(duration, count, seed):
+    """Spreads `count` taps of 0.3-1.5 s over the run, with random UIDs."""
+    rng = random.Random(seed)
+    slot = duration / count
+    return [(i * slot + rng.uniform(0.5, max(slot - 2.0, 0.6)), rng.uniform(0.3, 1.5),
+             bytes(rng.randrange(256) for _ in range(5))) for i in range(count)]
+
+
+def run_strategy(name, taps, duration):
+    fake = FakeMFRC522(taps)
+    if name == "busy":
+        # Dotychczasowa petla: odpytywanie bez przerwy
+        reader, options = RFID(fake), dict(fast_interval=0, idle_interval=0, backoff=1)
+    elif name == "irq":
+        reader, options = FakeIrqReader(fake), dict(use_irq=True)
+    else:
+        reader, options = RFID(fake), {}
+
+    detections = []
+    scheduler = PollingScheduler(reader, lambda uid: detections.append(time.perf_counter() - fake.started), **options)
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+
+    fake.start()
+    cpu_before = time.process_time()
+    thread.start()
+    time.sleep(duration)
+    scheduler.stop()
+    thread.join()
+    cpu = time.process_time() - cpu_before
+
+    latencies = []
+    for start, length, _ in taps:
+        first = next((t for t in detections if start <= t < start + length + 0.5), None)
+        latencies.append(None if first is None else (first - start) * 1000)
+    found = [l for l in latencies if l is not None]
+    return {
+        'strategy': name,
+        'cpu_percent': cpu / duration * 100,
+        'spi_requests': fake.requests,
+        'detected': f"{len(found)}/{len(taps)}",
+        'latency_p50_ms': statistics.median(found) if found else None,
+        'latency_max_ms': max(found) if found else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU use and tap detection latency of polling strategies.")
+    parser.add_argument('--duration', type=float, default=20.0, help="seconds per strategy")
+    parser.add_argument('--taps', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--strategies', nargs='+', default=["busy", "adaptive", "irq"])
+    args = parser.parse_args()
+
+    taps = make_taps(args.duration, args.taps, args.seed)
+    print(f"{'strategia':<10} {'CPU %':>7} {'SPI':>9} {'wykryte':>8} {'p50 ms':>8} {'max ms':>8}")
+    for name in args.strategies:
+        r = run_strategy(name, taps, args.duration)
+        p50 = f"{r['latency_p50_ms']:8.1f}" if r['latency_p50_ms'] is not None else f"{'-':>8}"
+        worst = f"{r['latency_max_ms']:8.1f}" if r['latency_max_ms'] is not None else f"{'-':>8}"
+        print(f"{name:<10} {r['cpu_percent']:7.1f} {r['spi_requests']:9d} {r['detected']:>8} {p50} {worst}")
+
+
+if __name__ == '__main__':
+    main()
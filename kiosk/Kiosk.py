@@ -1,9 +1,17 @@
+import time
+
+PROCESS_STARTED = time.perf_counter()  # punkt odniesienia profilu uruchomienia
+
 import threading
 from tkinter import Tk
-from kiosk_model import KioskModel
+
+from startup_profile import StartupProfile
 from kiosk_view import KioskView
-from kiosk_controller import KioskController
-from receiver import MqttClient
+
+MQTT_BROKER = "10.108.33.128"
+MQTT_PORT = 1883
+READER_IDS = ["reader-1"]  # czytniki przypisane do tego kiosku
+KIOSK_ID = None  # np. "kiosk-1", gdy dziala restauracja/tap_gateway.py - sesje zamiast surowych odczytow
 
 
 def start_terminal_rfid_listener(controller):
@@ -21,30 +29,56 @@ def start_terminal_rfid_listener(controller):
             print(f"Error while listening for RFID input: {e}")
 
 
-def main():
-
-    MQTT_BROKER = "10.108.33.128"
-    MQTT_PORT = 1883
-    MQTT_TOPIC = "rfid/read"
-    TIME_INTERVAL = 0.5
-    # Initialize root window
-    root = Tk()
+def connect_mqtt(controller, profile):
+    """Connects to the MQTT broker; runs in a background thread so it never delays the window."""
+    # PyQt6 i paho importujemy dopiero tutaj - nie sa potrzebne do pierwszej klatki
+    from receiver import MqttClient
 
-    # Initialize Model and View
-    model = KioskModel()
-    view = KioskView(root)  # Do not pass the controller here yet
-    receiver = MqttClient(MQTT_BROKER,MQTT_PORT,MQTT_TOPIC)
-    receiver.run()
-    # Initialize Controller
-    controller = KioskController(model, view)
+    receiver = MqttClient(MQTT_BROKER, MQTT_PORT, READER_IDS, kiosk_id=KIOSK_ID)
     receiver.setController(controller=controller)
+    receiver.run()  # connect + loop_start; bledy polaczenia obsluguje MqttClient
+    profile.mark("mqtt_started")
+    return receiver
+
+
+def start_services(view, profile):
+    """Phase 2, after the first frame: model and controller, with MQTT and the menu loading concurrently."""
+    from kiosk_model import KioskModel
+    from replica import LocalReplica
+    from kiosk_controller import KioskController
+    profile.mark("imports")
+
+    def on_ready():
+        profile.mark("interactive")
+        profile.report()
+
+    model = KioskModel(replica=LocalReplica())
+    model.start_sync()
+    # Menu laduje sie w tle (UiTaskRunner), on_ready przychodzi gdy jest na ekranie
+    controller = KioskController(model, view, on_ready=on_ready)
+    profile.mark("controller")
+
+    threading.Thread(target=connect_mqtt, args=(controller, profile), name="mqtt-connect", daemon=True).start()
 
     # Start RFID input listener in a separate thread
     threading.Thread(target=start_terminal_rfid_listener, args=(controller,), daemon=True).start()
 
+
+def main():
+    profile = StartupProfile(started=PROCESS_STARTED)
+
+    # Faza 1: okno na ekranie, zanim cokolwiek zacznie sie laczyc
+    root = Tk()
+    view = KioskView(root)  # Do not pass the controller here yet
+    root.update()
+    profile.mark("first_frame")
+
+    # Faza 2: reszta startuje z petli Tk, okno jest juz widoczne
+    root.after_idle(start_services, view, profile)
+
     # Start the GUI
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
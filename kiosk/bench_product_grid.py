@@ -0,0 +1,84 @@
+"""Benchmark of category-switch render time vs. product count.
+
+Compares the old destroy-and-rebuild grid with the pooled and the virtual grid.
+Needs a display (run on the kiosk or under Xvfb):
+    python bench_product_grid.py --counts 6 30 100 500 --switches 20
+"""
+import argparse
+import statistics
+import time
+import tkinter as tk
+
+from product_grid import PooledProductGrid, VirtualProductGrid
+
+
+class RebuildGrid:
+    """The previous implementation: every tile is destroyed and recreated on each switch."""
+
+    def __init__(self, parent, on_add, columns=3):
+        self.frame = tk.Frame(parent, bg="white")
+        self.on_add = on_add
+        self.columns = columns
+
+    def render(self, products):
+        for widget in self.frame.winfo_children():
+            widget.destroy()
+        for index, product in enumerate(products):
+            product_frame = tk.Frame(self.frame, bg="lightblue", bd=2, relief=tk.RAISED)
+            product_frame.grid(row=index // self.columns, column=index % self.columns, padx=10, pady=10)
+            tk.Label(product_frame, text=product['name'], font=("Helvetica", 14), bg="lightblue").pack(pady=5)
+            tk.Label(product_frame, text=f"{product['price']} PLN", font=("Helvetica", 12), bg="lightblue").pack(pady=5)
+            tk.Button(product_frame, text="Dodaj", command=lambda p=product: self.on_add(p)).pack(pady=5)
+
+    def show(self):
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+
+def make_categories(count):
+    """Two categories of `count` products each, so every switch changes all tiles."""
+    return [[{'product_id': c * count + i, 'name': f"Produkt {c}-{i}", 'price': round(5 + i * 0.5, 2)}
+             for i in range(count)] for c in range(2)]
+
+
+def bench(root, grid_class, count, switches):
+    """Returns render times (ms) of `switches` category switches, including layout."""
+    container = tk.Frame(root)
+    container.pack(fill=tk.BOTH, expand=True)
+    grid = grid_class(container, lambda p: None)
+    grid.show()
+    categories = make_categories(count)
+    grid.render(categories[1])  # rozgrzewka - pula kafelkow juz istnieje
+    root.update()
+
+    times = []
+    for switch in range(switches):
+        start = time.perf_counter()
+        grid.render(categories[switch % 2])
+        root.update_idletasks()
+        times.append((time.perf_counter() - start) * 1000)
+    container.destroy()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure product grid render time per category switch.")
+    parser.add_argument('--counts', type=int, nargs='+', default=[6, 30, 100, 500], help="products per category")
+    parser.add_argument('--switches', type=int, default=20)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.geometry("1000x600")
+    grids = [("rebuild", RebuildGrid), ("pooled", PooledProductGrid), ("virtual", VirtualProductGrid)]
+
+    print(f"{'produkty':>9} " + " ".join(f"{name + ' p50':>13} {name + ' max':>13}" for name, _ in grids))
+    for count in args.counts:
+        row = []
+        for _, grid_class in grids:
+            times = bench(root, grid_class, count, args.switches)
+            row.append(f"{statistics.median(times):11.2f}ms {max(times):11.2f}ms")
+        print(f"{count:>9} " + " ".join(row))
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+class CardSession:
+    """Per-tap slot holding the sets of the card that was just tapped.
+
+    A new slot is created for every tap, so a late result for a previous card
+    can be recognised (its slot is no longer the current one) and dropped.
+    Used only on the Tk thread.
+    """
+
+    def __init__(self, rfid):
+        self.rfid = rfid
+        self.sets = None       # None = jeszcze nie pobrane
+        self.confirmed = False  # backend (lub replika offline) przyjal odczyt
+        self.rendered = False   # panel "Moje Zestawy" juz pokazuje te zestawy
+
+    @property
+    def ready(self):
+        return self.sets is not None
+
+    def fill(self, sets):
+        self.sets = sets if sets is not None else {}
+        self.rendered = False
+
+    def invalidate(self):
+        """Drops the sets after a change; they are fetched again on the next opening."""
+        self.sets = None
+        self.rendered = False
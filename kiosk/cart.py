@@ -0,0 +1,107 @@
+class CartLine:
+    """One cart line; prices are kept in grosze (integer minor units)."""
+
+    __slots__ = ("key", "product_id", "name", "unit_price", "quantity")
+
+    def __init__(self, key, product_id, name, unit_price, quantity):
+        self.key = key
+        self.product_id = product_id
+        self.name = name
+        self.unit_price = unit_price
+        self.quantity = quantity
+
+    @property
+    def total(self):
+        return self.unit_price * self.quantity
+
+
+def to_minor(price):
+    """Converts a PLN price (float) to grosze."""
+    return int(round(price * 100))
+
+
+class Cart:
+    """Cart keyed by product id with an incrementally maintained total.
+
+    Listeners are called with (event, index, line) after every change:
+    ("added", index, line), ("updated", index, line), ("removed", index, line)
+    or ("cleared", None, None), so the view can update just the affected row.
+    """
+
+    def __init__(self):
+        self._lines = {}  # key -> CartLine, w kolejnosci dodawania
+        self._positions = {}  # key -> indeks wiersza
+        self.total_minor = 0
+        self._listeners = []
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def _emit(self, event, index=None, line=None):
+        for listener in self._listeners:
+            listener(event, index, line)
+
+    def add(self, product, quantity=1):
+        """Adds a product (dict with product_id, name, price) to the cart."""
+        product_id = product.get("product_id")
+        # Pozycje bez id (np. z repliki offline) rozrozniamy po nazwie
+        key = product_id if product_id is not None else product["name"]
+        line = self._lines.get(key)
+        if line is None:
+            line = CartLine(key, product_id, product["name"], to_minor(product["price"]), quantity)
+            self._positions[key] = len(self._lines)
+            self._lines[key] = line
+            event = "added"
+        else:
+            line.quantity += quantity
+            event = "updated"
+        self.total_minor += line.unit_price * quantity
+        self._emit(event, self._positions[key], line)
+        return line
+
+    def remove(self, key, quantity=None):
+        """Takes `quantity` of a line out of the cart (the whole line if None or if nothing is left)."""
+        line = self._lines[key]
+        if quantity is None or quantity >= line.quantity:
+            quantity = line.quantity
+        line.quantity -= quantity
+        self.total_minor -= line.unit_price * quantity
+        index = self._positions[key]
+        if line.quantity:
+            self._emit("updated", index, line)
+            return line
+        del self._lines[key]
+        del self._positions[key]
+        for other, position in self._positions.items():
+            if position > index:
+                self._positions[other] = position - 1
+        self._emit("removed", index, line)
+        return line
+
+    def clear(self):
+        self._lines.clear()
+        self._positions.clear()
+        self.total_minor = 0
+        self._emit("cleared")
+
+    @property
+    def total(self):
+        """Total in PLN."""
+        return self.total_minor / 100
+
+    def lines(self):
+        return list(self._lines.values())
+
+    def to_payload(self):
+        """Returns the cart in the API format: {product name: {"quantity", "price"}}."""
+        payload = {}
+        for line in self._lines.values():
+            details = payload.setdefault(line.name, {"quantity": 0, "price": line.unit_price / 100})
+            details["quantity"] += line.quantity
+        return payload
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = 2.0  # s
+READ_TIMEOUT = 5.0     # s
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.2   # 0.2 s, 0.4 s, 0.8 s
+POOL_SIZE = 8
+
+
+class ApiSession:
+    """Shared HTTP session for the kiosk: keep-alive connection pool, timeouts,
+    bounded retries with backoff for idempotent calls and per-call latency capture.
+
+    Network errors (after retries) are logged and reported as a None response,
+    so a dead backend never freezes or crashes the kiosk.
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR, pool_size=POOL_SIZE,
+                 history_size=500):
+        self.timeout = (connect_timeout, read_timeout)
+        # Retry domyslnie ponawia tylko metody idempotentne (GET, PUT, DELETE, ...), nie POST
+        retry = Retry(total=max_retries, connect=max_retries, read=max_retries,
+                      backoff_factor=backoff_factor, status_forcelist=(502, 503, 504),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latencies = deque(maxlen=history_size)  # (method, path, status, seconds)
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        """Sends a request and returns the response, or None if the backend could not be reached."""
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.perf_counter()
+        status = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        except requests.RequestException as e:
+            print(f"Błąd połączenia ({method} {url}): {e}")
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.latencies.append((method, urlsplit(url).path, status, elapsed))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def latency_summary(self):
+        """Returns {"METHOD path": {"count", "avg_ms", "max_ms"}} over the recorded calls."""
+        with self._lock:
+            samples = list(self.latencies)
+        summary = {}
+        for method, path, _, seconds in samples:
+            entry = summary.setdefault(f"{method} {path}", {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+        return {key: {"count": entry["count"],
+                      "avg_ms": round(entry["total"] / entry["count"] * 1000, 2),
+                      "max_ms": round(entry["max"] * 1000, 2)}
+                for key, entry in summary.items()}
+
+    def close(self):
+        self.session.close()
@@ -1,15 +1,37 @@
-from copy import copy
 from tkinter import simpledialog
 
+from card_session import CardSession
+from cart import Cart
+
+from menu_store import MenuStore
+from tap_dispatcher import TapDispatcher
+from ui_tasks import UiTaskRunner
+
+MENU_WATCH_INTERVAL_MS = 1000
+TAP_STATS_INTERVAL_MS = 60000
+
+
 class KioskController:
     """Controller responsible for coordinating the View and Model."""
 
-    def __init__(self, model, view):
+    def __init__(self, model, view, on_ready=None):
         self.model = model
         self.view = view
-        self.cart = {}
+        self.cart = Cart()
+        # Widok aktualizuje tylko zmienione wiersze koszyka
+        self.cart.subscribe(view.on_cart_change)
         self.current_rfid = None
-        
+        self.session = None  # slot z zestawami potwierdzonej karty (tej z current_rfid)
+        self.pending_session = None  # slot odczytu czekajacego na potwierdzenie backendu
+        self.menu_store = MenuStore(model)
+        self._menu_version = 0
+        # Cala komunikacja sieciowa idzie przez tasks, wyniki wracaja do watku Tk
+        self.tasks = UiTaskRunner(view.master, on_busy=view.set_loading)
+        self.on_ready = on_ready  # wywolywane raz, gdy menu jest pierwszy raz na ekranie
+        # Odczyty z MQTT i terminala trafiaja do watku Tk przez ograniczona kolejke
+        self.taps = TapDispatcher(self._on_tap, self.tasks.call_soon)
+        self._reported_taps = 0
+        view.master.after(TAP_STATS_INTERVAL_MS, self._report_taps)
 
         # Load initial data
         self.load_categories()
@@ -18,9 +40,26 @@ class KioskController:
         view.bind_controller(self)
 
     def load_categories(self):
-        """Loads categories from the model and displays them in the view."""
-        categories = self.model.get_categories()
-        self.view.load_categories(categories)
+        """Loads the whole menu into the menu store in the background and displays its categories."""
+        self.tasks.submit('menu', self.menu_store.refresh, lambda changed: self._on_menu_loaded())
+        self.menu_store.start_auto_refresh()
+        self.view.master.after(MENU_WATCH_INTERVAL_MS, self._watch_menu)
+
+    def _on_menu_loaded(self):
+        self._show_menu()
+        if self.on_ready is not None:
+            on_ready, self.on_ready = self.on_ready, None
+            on_ready()
+
+    def _show_menu(self):
+        self._menu_version = self.menu_store.version
+        self.view.load_categories(self.menu_store.categories())
+
+    def _watch_menu(self):
+        """Runs on the Tk thread: redraws the categories after a background refresh changed the menu."""
+        if self.menu_store.version != self._menu_version:
+            self._show_menu()
+        self.view.master.after(MENU_WATCH_INTERVAL_MS, self._watch_menu)
 
     def on_category_select(self, event):
         """Handles category selection."""
@@ -28,19 +67,16 @@ class KioskController:
         if category is None:
             return
         
-        products = self.model.get_products_by_category(category)
-        self.view.load_products(products)
+        products = self.menu_store.products_in(category)
+        self.view.load_products(products or [])
 
     def add_to_cart(self, product, quantity=1):
         """Adds a product to the cart."""
-        self.cart = self.model.add_product_to_cart(self.cart, product, quantity)
-        self.view.load_cart_list(self.cart)
+        self.model.add_product_to_cart(self.cart, product, quantity)
 
     def clear_cart(self):
         """Clears the cart."""
-        self.cart = self.model.clear_cart()
-        self.view.load_cart_list(self.cart)
-        self.view.cart = self.cart
+        self.model.clear_cart(self.cart)
 
     def checkout(self):
         """Handles the checkout process."""
@@ -53,15 +89,17 @@ class KioskController:
         total_price = self.model.calculate_total(self.cart)
         self.view.show_info("Zamówienie złożone", f"Twoje zamówienie o wartości {total_price:.2f} PLN zostało złożone!")
         
-        cart = copy(self.cart)
+        cart = self.cart.to_payload()
         print(cart)
         
         self.clear_cart()
         print(cart)
 
         # Odlączenie karty po zamówieniu
+        self.tasks.cancel('user_sets')
         if self.current_rfid:
             self.current_rfid = None
+            self.session = None
             self.view.update_rfid_display(None)
             self.view.update_buttons_state()
         
@@ -70,55 +108,173 @@ class KioskController:
 
 
     def show_user_sets(self,select_set_callback=None):
-        """Handles showing user sets."""
-        if self.current_rfid is None:
+        """Handles showing user sets; they are usually already in the session slot since the tap."""
+        session = self.session
+        if self.current_rfid is None or session is None or not session.confirmed:
             self.view.show_warning("Brak karty", "Nie zeskanowano karty. Zeskanuj kartę, aby zobaczyć swoje zestawy.")
+        elif session.ready:
+            self._display_user_sets(select_set_callback)
         else:
-            user_sets = self.model.get_sets_by_rfid(self.current_rfid)
-            print(user_sets)
-            
-            self.view.display_user_sets(user_sets, self.add_set_to_cart, self.delete_set, self.rename_set ,select_set_callback)
+            rfid = session.rfid
+            self.tasks.submit('user_sets', lambda: self.model.get_sets_by_rfid(rfid),
+                              lambda sets: self._on_user_sets_loaded(session, sets, select_set_callback))
+
+    def _on_user_sets_loaded(self, session, sets, select_set_callback):
+        if session is not self.session:
+            return  # w miedzyczasie przylozono inna karte lub ja odlaczono
+        session.fill(sets)
+        self._display_user_sets(select_set_callback)
+
+    def _display_user_sets(self, select_set_callback=None):
+        session = self.session
+        if select_set_callback is None and session.rendered:
+            self.view.show_user_sets_panel()  # panel przygotowany juz przy odczycie karty
+            return
+        self.view.display_user_sets(session.sets, self.add_set_to_cart, self.delete_set, self.rename_set ,select_set_callback)
+        session.rendered = select_set_callback is None
+
+    def _prepare_user_sets(self):
+        """Builds the "Moje Zestawy" panel off-screen, so opening it right after the tap is instant."""
+        session = self.session
+        if session is not None and session.ready and not session.rendered:
+            self.view.render_user_sets(session.sets, self.add_set_to_cart, self.delete_set, self.rename_set)
+            session.rendered = True
+
+    def refresh_user_sets(self):
+        """Drops the cached sets after a change and shows them again."""
+        if self.session is not None:
+            self.session.invalidate()
+        self.show_user_sets()
 
     def add_set_to_cart(self, set_items):
         """Adds all items in the set to the cart."""
         for item in set_items:
             print(item)
-            self.cart = self.model.add_product_to_cart(self.cart,item)
-        self.view.load_cart_list(self.cart)
+            self.model.add_product_to_cart(self.cart,item)
+
+    def _run_set_change(self, work, info=None, error_message="Nie udało się zapisać zmian"):
+        """Runs a set write in the background, then reports and refreshes the sets on the Tk thread.
+
+        `work` returns the model's result dict; a write the backend rejected
+        (result["success"] false) is shown as a warning, not as a success.
+        """
+        rfid = self.current_rfid
+
+        def done(result):
+            if not result.get("success"):
+                self.view.show_warning("Błąd", f"{error_message}: {result.get('message')}")
+                return
+            if info:
+                # Zapis offline: komunikat modelu mowi, ze trafil do kolejki
+                self.view.show_info(info[0], result["message"] if result.get("queued") else info[1])
+            if rfid == self.current_rfid and self.session is not None:
+                self.refresh_user_sets()
+
+        self.tasks.submit(None, work, done, lambda e: self.view.show_warning("Błąd", f"{error_message}: {e}"))
 
     def delete_set(self, set_name):
         """Deletes a set."""
-        self.model.delete_set(set_name,self.current_rfid)
-        #self.view.show_info("Usunięto zestaw", f"Zestaw {set_name} został usunięty.")
-        self.show_user_sets()
+        rfid = self.current_rfid
+        self._run_set_change(lambda: self.model.delete_set(set_name, rfid),
+                             ("Usunięto Zestaw", f"Zestaw '{set_name}' został pomyślnie usunięty."),
+                             "Nie udało się usunąć zestawu")
 
     def add_set(self, set_name, cart):
-        if self.model.does_set_exist(set_name, self.current_rfid):
-            self.overwrite_set(set_name, set_name, cart) 
-        else:
-            self.model.add_set(set_name, cart, self.current_rfid)
-        self.show_user_sets()
+        """Saves the cart as a set (created or overwritten) and shows the sets returned by the backend."""
+        rfid = self.current_rfid
+        cart = cart.to_payload()  # migawka w watku Tk, wysylana w tle
+
+        def done(result):
+            if not result.get("success") or "sets" not in result:
+                self.view.show_warning("Błąd", f"Nie udało się zapisać zestawu: {result.get('message')}")
+                return
+            self.view.show_info("Zapisano Zestaw", f"Zestaw '{set_name}' został pomyślnie zapisany.")
+            if rfid == self.current_rfid and self.session is not None:
+                self.session.fill(result["sets"])
+                self._display_user_sets()
+
+        self.tasks.submit(None, lambda: self.model.upsert_set(set_name, cart, rfid), done,
+                          lambda e: self.view.show_warning("Błąd", f"Nie udało się zapisać zestawu: {e}"))
 
     def overwrite_set(self,set_name_old,set_name_new,cart):
-        self.model.overwrite_set(set_name_old,set_name_new,cart,self.current_rfid)
-        self.show_user_sets()
+        rfid = self.current_rfid
+        cart = cart.to_payload()  # migawka w watku Tk, wysylana w tle
+        self._run_set_change(lambda: self.model.overwrite_set(set_name_old, set_name_new, cart, rfid),
+                             ("Nadpisano Zestaw", f"Zestaw '{set_name_old}' został nadpisany."),
+                             "Nie udało się nadpisać zestawu")
 
     def rename_set(self, set_name_old):
         """Renames a set."""
         set_name_new = simpledialog.askstring("Zmiana nazwy", f"Podaj nową nazwę dla zestawu {set_name_old}:")
         if set_name_new:
-            self.model.rename_set(set_name_old,self.current_rfid, set_name_new)
-            self.view.show_info("Zmiana nazwy", f"Zestaw {set_name_old} został zmieniony na {set_name_new}.")
-            self.show_user_sets() 
+            rfid = self.current_rfid
+            self._run_set_change(lambda: self.model.rename_set(set_name_old, rfid, set_name_new),
+                                 ("Zmiana nazwy", f"Zestaw {set_name_old} został zmieniony na {set_name_new}."),
+                                 "Nie udało się zmienić nazwy zestawu")
 
     def handle_rfid_input(self, rfid):
-        """Obsługuje wejście RFID - sprawdza i dodaje nowe, jeśli nie istnieje."""
-        response = self.model.check_and_add_rfid(rfid)
+        """Obsługuje wejście RFID - sprawdza i dodaje nowe, jeśli nie istnieje.
+
+        Może być wywołane z dowolnego wątku (MQTT, terminal) i nigdy nie blokuje;
+        odczyt trafia do wątku Tk przez TapDispatcher.
+        """
+        self.taps.offer(rfid)
 
+    def handle_session_push(self, response):
+        """Handles a session pushed by the tap gateway (card already registered, sets included).
+
+        Same threading rules as handle_rfid_input; no HTTP request is made for the tap.
+        An error session (the gateway could not resolve the tap) falls back to /tap.
+        """
+        if "error" in response:
+            print(f"Bramka nie obsłużyła odczytu {response['rfid']}: {response['error']}")
+            self.taps.offer(response["rfid"])
+            return
+        self.taps.offer(response["rfid"], response)
+
+    def _report_taps(self):
+        stats = self.taps.stats()
+        if stats["offered"] != self._reported_taps:
+            self._reported_taps = stats["offered"]
+            print(f"Odczyty kart: {stats}")
+        self.view.master.after(TAP_STATS_INTERVAL_MS, self._report_taps)
+
+    def _on_tap(self, rfid, pushed=None):
+        # Poprzednia karta zostaje aktywna, dopoki backend nie potwierdzi nowej;
+        # spozniona odpowiedz dla wczesniejszego odczytu rozpoznajemy po slocie
+        session = CardSession(rfid)
+        self.pending_session = session
+        if pushed is not None:
+            # Bramka juz zarejestrowala karte i dolaczyla zestawy
+            sets = pushed.get("sets")
+            self.tasks.submit(None, lambda: self.model.remember_card(rfid, sets))
+            self._on_rfid_response(session, pushed)
+            return
+        self.tasks.submit('tap', lambda: self.model.tap_rfid(rfid),
+                          lambda response: self._on_rfid_response(session, response))
+        # Zestawy z lokalnej repliki sa gotowe zanim backend potwierdzi odczyt
+        self.tasks.submit('prefetch_sets', lambda: self.model.local_sets(rfid),
+                          lambda sets: self._on_sets_prefetched(session, sets))
+
+    def _on_sets_prefetched(self, session, sets):
+        if session is self.pending_session and sets is not None and not session.confirmed:
+            session.fill(sets)
+
+    def _on_rfid_response(self, session, response):
+        if session is not self.pending_session:
+            return  # w miedzyczasie przylozono inna karte
+        self.pending_session = None
         if response.get("rfid"):
-            self.current_rfid = rfid
-            self.view.update_rfid_display(rfid)
-            self.view.update_buttons_state() 
+            session.confirmed = True
+            if "sets" in response and response["sets"] != session.sets:
+                session.fill(response["sets"])
+            # Karta, sesja i ekran zmieniaja sie razem
+            self.session = session
+            self.current_rfid = session.rfid
+            self.view.update_rfid_display(session.rfid)
+            self.view.update_buttons_state()
+            self._prepare_user_sets()
             self.view.show_info("RFID", response["message"])
         else:
-            self.view.show_warning("Błąd RFID", response["message"])
\ No newline at end of file
+            # Nieudany odczyt nie zmienia aktywnej karty
+            self.view.show_warning("Błąd RFID", response["message"])
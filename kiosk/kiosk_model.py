@@ -1,4 +1,8 @@
-import requests
+import uuid
+from urllib.parse import quote
+
+from http_client import ApiSession
+from replica import SyncEngine, IDEMPOTENCY_HEADER
 
 class KioskModel:
     """Model responsible for managing data logic and interacting with Flask API."""
@@ -6,55 +10,130 @@ class KioskModel:
     #BASE_URL = "http://10.108.33.113:5000"  # Flask server URL
     BASE_URL = "http://127.0.0.1:5000"  # Flask server URL
 
+    def __init__(self, http=None, replica=None):
+        # Wspolna sesja HTTP: keep-alive, timeouty, ponowienia
+        self.http = http or ApiSession()
+        # url -> (ETag, ostatnia odpowiedz) dla zasobow katalogu
+        self._catalog_cache = {}
+        # Lokalna replika (opcjonalna): odczyty lokalnie, zapisy w kolejce gdy backend niedostepny
+        self.replica = replica
+        self.sync = SyncEngine(replica, self.http, self.BASE_URL) if replica is not None else None
+
+    def start_sync(self):
+        """Starts the background replica sync (no-op without a replica)."""
+        if self.sync is not None:
+            self.sync.start()
+
+    def _write(self, path, data, apply_locally, method="POST"):
+        """Sends a write; with a replica it is applied locally too and queued if the backend is down.
+
+        The idempotency key travels with the queued copy: if the request timed
+        out after the backend applied it, the replay gets the stored response.
+        """
+        key = uuid.uuid4().hex
+        response = self.http.request(method, f"{self.BASE_URL}{path}", json=data,
+                                     headers={IDEMPOTENCY_HEADER: key})
+        if self.replica is not None:
+            if response is None:
+                self.replica.enqueue(path, data, method, idempotency_key=key)
+            if response is None or response.status_code < 400:
+                apply_locally()
+            self.sync.wake()
+        return response
+
+    def _queued(self, response):
+        return response is None and self.replica is not None
+
+    def _write_result(self, response, queued_message, failure_message):
+        """Turns the response of a set write into a result dict; result["success"] says if it went through."""
+        if self._queued(response):
+            return {"success": True, "queued": True, "message": queued_message}
+        if response is not None and response.status_code in (200, 201):
+            return dict(response.json(), success=True)
+        error = None
+        if response is not None:
+            try:
+                error = response.json().get("error")
+            except ValueError:
+                pass
+        return {"success": False, "message": error or failure_message}
+
+    def _get_catalog(self, url, params=None):
+        """GETs a catalog resource, revalidating the cached copy with If-None-Match."""
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        cached = self._catalog_cache.get(cache_key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        response = self.http.get(url, params=params, headers=headers)
+        if response is None:
+            return None
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code == 200:
+            data = response.json()
+            etag = response.headers.get("ETag")
+            if etag:
+                self._catalog_cache[cache_key] = (etag, data)
+            return data
+        return None
+
+    def get_menu(self):
+        """Fetches all categories with their products nested, in one request."""
+        if self.replica is not None and self.replica.is_ready():
+            return self.replica.menu()
+        menu = self._get_catalog(f"{self.BASE_URL}/kiosk/bootstrap")
+        return menu if menu is not None else []
+
     def get_categories(self):
         """Fetches categories from the Flask API."""
-        response = requests.get(f"{self.BASE_URL}/categories")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return []
+        categories = self._get_catalog(f"{self.BASE_URL}/categories")
+        return categories if categories is not None else []
 
     def get_products_by_category(self, category):
         """Fetches products for a specific category from lask FAPI."""
-        response = requests.get(f"{self.BASE_URL}/products?category={category}")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return []
+        products = self._get_catalog(f"{self.BASE_URL}/products", params={"category": category})
+        return products if products is not None else []
 
     def get_sets_by_rfid(self, rfid):
         """Fetches user sets by RFID from Flask API."""
-        response = requests.get(f"{self.BASE_URL}/rfid/{rfid}/sets")
-        if response.status_code == 200:
+        if self.replica is not None and self.replica.is_ready():
+            return self.replica.sets(rfid)
+        response = self.http.get(f"{self.BASE_URL}/rfid/{rfid}/sets")
+        if response is not None and response.status_code == 200:
             return response.json()
         else:
             return {}
 
+    def remember_card(self, rfid, sets):
+        """Stores a card and its sets in the local replica (no-op without one)."""
+        if self.replica is not None:
+            self.replica.store_card(rfid, sets)
+
+    def local_sets(self, rfid):
+        """Returns the card's sets from the local replica, or None if they are not available locally."""
+        if self.replica is not None and self.replica.is_ready():
+            return self.replica.sets(rfid)
+        return None
+
     def add_product_to_cart(self, cart, product, quantity=1):
         """Adds product to cart and returns the updated cart."""
-        product_name = product["name"]
-        product_price = product["price"]
-        
-        if product_name in cart:
-            cart[product_name]["quantity"] += quantity
-        else:
-            cart[product_name] = {"quantity": quantity, "price": product_price}
-        
+        cart.add(product, quantity)
         return cart
 
     def calculate_total(self, cart):
-        """Calculates the total price of items in the cart."""
-        return sum(details["price"] * details["quantity"] for details in cart.values())
+        """Returns the total price of items in the cart (maintained incrementally by the cart)."""
+        return cart.total
     
-    def clear_cart(self):
+    def clear_cart(self, cart):
         """Clears the cart."""
-        return {}
+        cart.clear()
+        return cart
 
     def add_category(self, category_id, name):
         """Sends a request to add a category via Flask API."""
         data = {"category_id": category_id, "name": name}
-        response = requests.post(f"{self.BASE_URL}/categories", json=data)
-        if response.status_code == 201:
+        response = self.http.post(f"{self.BASE_URL}/categories", json=data)
+        if response is not None and response.status_code == 201:
             return response.json()
         else:
             return {"message": "Failed to add category"}
@@ -62,80 +141,82 @@ class KioskModel:
     def add_product(self, product_id, name, price, category_id):
         """Sends a request to add a product via Flask API."""
         data = {"product_id": product_id, "name": name, "price": price, "category_id": category_id}
-        response = requests.post(f"{self.BASE_URL}/products", json=data)
-        if response.status_code == 201:
+        response = self.http.post(f"{self.BASE_URL}/products", json=data)
+        if response is not None and response.status_code == 201:
             return response.json()
         else:
             return {"message": "Failed to add product"}
 
     def delete_set(self,set_name,user_rfid):
         data = {"set_name":set_name,"rfid":user_rfid}
-        response = requests.post(f'{self.BASE_URL}/delete_set',json=data)
-        if response.status_code == 201:
-            return response.json()
-        else:
-            return {"message": f"Failed to delete set {set_name} attached to user_rfid: {user_rfid}"}
+        response = self._write('/delete_set', data,
+                               lambda: self.replica.apply_delete_set(user_rfid, set_name))
+        return self._write_result(response, f"Usunięcie zestawu {set_name} zapisano offline",
+                                  f"Failed to delete set {set_name} attached to user_rfid: {user_rfid}")
 
 
     def add_set(self,set_name,cart,user_rfid):
         data = {"set_name":set_name,"cart":cart,"rfid":user_rfid}
         print(data)
-        response = requests.post(f'{self.BASE_URL}/add_set', json=data)
+        response = self._write('/add_set', data,
+                               lambda: self.replica.apply_add_set(user_rfid, set_name, cart))
         print(response)
-        if response.status_code == 201:
-
-            return response.json()
-        else:
-            return {"message": f"Failed to add set {set_name} attached to user_rfid: {user_rfid}"}
+        return self._write_result(response, f"Zestaw {set_name} zapisano offline",
+                                  f"Failed to add set {set_name} attached to user_rfid: {user_rfid}")
         
+    def upsert_set(self, set_name, cart, user_rfid):
+        """Creates or overwrites a set in one request; the result carries the card's updated sets."""
+        path = f"/rfid/{quote(str(user_rfid), safe='')}/sets/{quote(set_name, safe='')}"
+        response = self._write(path, {"cart": cart},
+                               lambda: self.replica.apply_add_set(user_rfid, set_name, cart), method="PUT")
+        result = self._write_result(response, f"Zestaw {set_name} zapisano offline",
+                                    f"Failed to save set {set_name} attached to user_rfid: {user_rfid}")
+        if result.get("queued"):
+            result["sets"] = self.replica.sets(user_rfid)
+        return result
+
     def does_set_exist(self, set_name, user_rfid):
-        # Sprawdzamy zestawy przypisane do danego RFID
-        response = requests.get(f'{self.BASE_URL}/rfid/{user_rfid}/sets')
-        
-        if response.status_code == 200:
-            sets = response.json()
-            # Sprawdzamy, czy zestaw o danej nazwie istnieje w odpowiedzi
-            return set_name in sets
-        else:
-            return False
-        
+        # Sprawdzamy zestawy przypisane do danego RFID (lokalnie, jesli jest replika)
+        return set_name in self.get_sets_by_rfid(user_rfid)
 
     def overwrite_set(self,set_name_old,set_name_new,cart,user_rfid):
         data = {"set_name_old": set_name_old,"set_name_new":set_name_new, "cart": cart, "rfid": user_rfid}
-        response = requests.post(f'{self.BASE_URL}/overwrite_set', json=data)
-        if response.status_code == 201:
-            return response.json()
-        else:
-            return {"message": f"Failed to overwrite set {set_name_old} attached to user_rfid: {user_rfid}"}
+        response = self._write('/overwrite_set', data,
+                               lambda: self.replica.apply_overwrite_set(user_rfid, set_name_old, set_name_new, cart))
+        return self._write_result(response, f"Nadpisanie zestawu {set_name_old} zapisano offline",
+                                  f"Failed to overwrite set {set_name_old} attached to user_rfid: {user_rfid}")
 
     def rename_set(self,set_name_old,user_rfid,set_name_new):
         data = {"set_name_old": set_name_old, "rfid": user_rfid,"set_name_new":set_name_new}
-        response = requests.post(f'{self.BASE_URL}/rename_set',json=data)
-        if response.status_code == 201:
-            return response.json()
-        else:
-            return {"message": f"Failed to rename set {set_name_old} to new name: {set_name_new} attached to user_rfid: {user_rfid}"}
+        response = self._write('/rename_set', data,
+                               lambda: self.replica.apply_rename_set(user_rfid, set_name_old, set_name_new))
+        return self._write_result(response, f"Zmianę nazwy zestawu {set_name_old} zapisano offline",
+                                  f"Failed to rename set {set_name_old} to new name: {set_name_new} attached to user_rfid: {user_rfid}")
 
     def assign_sets_to_rfid(self, rfid, sets_dict):
         """Sends request to assign sets to RFID."""
         data = {"rfid": rfid, "sets": sets_dict}
-        response = requests.post(f"{self.BASE_URL}/rfid", json=data)
-        if response.status_code == 201:
+        response = self.http.post(f"{self.BASE_URL}/rfid", json=data)
+        if response is not None and response.status_code == 201:
             return response.json()
         else:
             return {"message": "Failed to assign sets to RFID"}
     
-    def check_and_add_rfid(self, rfid):
-        """Sprawdza, czy RFID istnieje w bazie, a jeśli nie - dodaje je."""
-        response = requests.get(f"{self.BASE_URL}/rfid/{rfid}")
-        
-        if response.status_code == 404:  # RFID nie istnieje
-            add_response = requests.post(f"{self.BASE_URL}/rfid", json={"rfid": rfid})
-            if add_response.status_code == 201:
-                return {"message": "Karta wczytana pomyślnie", "rfid": rfid}
-            else:
-                return {"message": "Nie udało się dodać nowego RFID"}
-        elif response.status_code == 200:
-            return {"message": "RFID już istnieje", "rfid": rfid}
-        
-        return {"message": "Błąd połączenia z bazą danych"}
+    def tap_rfid(self, rfid):
+        """Registers a card tap; the card is added if new and its sets come back in the same response."""
+        response = self.http.post(f"{self.BASE_URL}/tap/{rfid}")
+        if response is None:
+            if self.replica is not None and self.replica.is_ready():
+                # Offline: karta dopisana lokalnie, rejestracja w backendzie po powrocie polaczenia
+                self.replica.enqueue(f"/tap/{rfid}", {})
+                self.replica.store_card(rfid)
+                return {"message": "Karta wczytana (tryb offline)", "rfid": rfid,
+                        "sets": self.replica.sets(rfid), "offline": True}
+            return {"message": "Błąd połączenia z bazą danych"}
+
+        if response.status_code == 200:
+            result = response.json()
+            if self.replica is not None:
+                self.replica.store_card(rfid, result.get("sets"))
+            return result
+        return {"message": "Nie udało się wczytać karty"}
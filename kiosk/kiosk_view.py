@@ -1,7 +1,9 @@
-import threading
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 
+from product_grid import ProductGrid
+from sets_panel import SetsPanel
+
 
 class KioskView:
     """View responsible for the GUI."""
@@ -14,7 +16,7 @@ class KioskView:
         master.title("To co zwykle - Kiosk Samoobsługowy")
         master.geometry("1000x600")
 
-        self.cart = {}
+        self.cart = None  # koszyk kontrolera, ustawiany w bind_controller
 
         # Main layout
         self.main_frame = tk.Frame(master)
@@ -40,8 +42,14 @@ class KioskView:
         self.products_label = tk.Label(self.products_frame, text="Produkty", font=("Helvetica", 16), bg="white")
         self.products_label.pack(pady=10)
 
+        # Wskaznik ladowania, widoczny gdy trwa komunikacja z backendem
+        self.loading_label = tk.Label(self.products_frame, text="Ładowanie...", font=("Helvetica", 12),
+                                      fg="gray", bg="white")
+
         self.products_grid_frame = tk.Frame(self.products_frame, bg="white")
         self.products_grid_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        # Kafelki produktow sa wielokrotnie uzywane przy zmianie kategorii
+        self.product_grid = ProductGrid(self.products_grid_frame, lambda p: self.controller.add_to_cart(p))
 
         # Cart panel
         self.cart_frame = tk.Frame(self.main_frame, bg="lightgray", width=200)
@@ -83,6 +91,9 @@ class KioskView:
 
         self.user_sets_content = tk.Frame(self.user_sets_panel, bg="white")
         self.user_sets_content.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Lista zestawow jest budowana raz i uzywana przy kazdym otwarciu panelu
+        self.sets_list = SetsPanel(self.user_sets_content)
+        self.sets_list.frame.pack(fill=tk.BOTH, expand=True)
 
         self.close_sets_panel_button = tk.Button(self.user_sets_panel, text="Zamknij", command=self.hide_user_sets_panel)
         self.close_sets_panel_button.pack(pady=10)
@@ -91,6 +102,7 @@ class KioskView:
     def bind_controller(self, controller):
         """Binds the controller to the view and connects events."""
         self.controller = controller
+        self.cart = controller.cart
         self.categories_listbox.bind("<<ListboxSelect>>", controller.on_category_select)
         self.my_sets_button.config(command=controller.show_user_sets)
         self.clear_cart_button.config(command=controller.clear_cart)
@@ -111,117 +123,51 @@ class KioskView:
             self.categories_listbox.insert(tk.END, category['name'])
 
     def load_products(self, products):
-        """Displays products in the grid."""
-        for widget in self.products_grid_frame.winfo_children():
-            widget.destroy()
-
-        row, col = 0, 0
-        for product in products:
-            product_frame = tk.Frame(self.products_grid_frame, bg="lightblue", bd=2, relief=tk.RAISED)
-            product_frame.grid(row=row, column=col, padx=10, pady=10)
-
-            tk.Label(product_frame, text=product['name'], font=("Helvetica", 14), bg="lightblue").pack(pady=5)
-            tk.Label(product_frame, text=f"{product['price']} PLN", font=("Helvetica", 12), bg="lightblue").pack(pady=5)
-            tk.Button(product_frame, text="Dodaj", command=lambda p=product: self.controller.add_to_cart(p)).pack(
-                pady=5)
-
-            col += 1
-            if col == 3:
-                col = 0
-                row += 1
-
-    def load_cart_list(self, cart):
-        """Updates the cart display."""
-        self.cart_listbox.delete(0, tk.END)
-        for product_name, details in cart.items():
-            quantity = details["quantity"]
-            total_price = quantity * details["price"]
-            self.cart_listbox.insert(tk.END, f"{product_name} - {quantity}x - {total_price:.2f} PLN")
-        self.cart = self.controller.cart
+        """Displays products in the grid, reusing the existing tiles."""
+        self.product_grid.render(products)
+
+    def _cart_line_text(self, line):
+        return f"{line.name} - {line.quantity}x - {line.total / 100:.2f} PLN"
+
+    def on_cart_change(self, event, index, line):
+        """Updates only the cart row affected by a change."""
+        if event == "added":
+            self.cart_listbox.insert(tk.END, self._cart_line_text(line))
+        elif event == "updated":
+            self.cart_listbox.delete(index)
+            self.cart_listbox.insert(index, self._cart_line_text(line))
+        elif event == "removed":
+            self.cart_listbox.delete(index)
+        elif event == "cleared":
+            self.cart_listbox.delete(0, tk.END)
+
+    def render_user_sets(self, user_sets, add_set_to_cart, delete_set, rename_set, select_set_callback=None):
+        """Fills the sets mini-panel without showing it."""
+        self.sets_list.render(user_sets, add_set_to_cart,
+                              lambda s: self._confirm_and_delete_set(s, delete_set),
+                              rename_set, select_set_callback)
 
     def display_user_sets(self, user_sets, add_set_to_cart, delete_set, rename_set, select_set_callback=None):
-        """Displays user-defined sets in a mini-panel."""
-        self.user_sets_content.destroy()  # Usuń poprzednią zawartość
-        self.user_sets_content = tk.Frame(self.user_sets_panel, bg="white")
-        self.user_sets_content.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        if not user_sets or user_sets == {}:
-            tk.Label(self.user_sets_content, text="Nie znaleziono zestawów przypisanych do Twojej karty.", bg="white",
-                     font=("Helvetica", 12)).pack(pady=10)
-
-
-        # Scrollbar i Canvas dla przewijania, jeśli zestawów jest dużo
-        canvas = tk.Canvas(self.user_sets_content, bg="white")
-        if(user_sets!={}):
-            scrollbar = tk.Scrollbar(self.user_sets_content, orient="vertical", command=canvas.yview)
-            scrollable_frame = tk.Frame(canvas, bg="white")
-
-            scrollable_frame.bind(
-                "<Configure>",
-                lambda e: canvas.configure(
-                    scrollregion=canvas.bbox("all")
-                )
-            )
-
-            canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
-
-        # Create frames for each set
-            for set_name, set_items_list in user_sets.items():
-                set_frame = tk.LabelFrame(scrollable_frame, text=set_name, font=("Helvetica", 14), padx=10, pady=10,
-                                          bg="white")
-                set_frame.pack(fill=tk.X, pady=5, padx=5)
-
-                # Display items in the set
-                for set_item in set_items_list:
-                    product_name = set_item["name"]
-                    product_quantity = set_item["quantity"]
-                    product_label = tk.Label(set_frame, text=f"{product_name}: {product_quantity}", font=("Helvetica", 12),
-                                             bg="white")
-                    product_label.pack(anchor="w", padx=5, pady=2)
-
-                # Create a frame for buttons
-                button_frame = tk.Frame(set_frame, bg="white")
-                button_frame.pack(fill=tk.X, pady=5)
-                if not select_set_callback:
-                # "Add to Cart" button
-                    add_to_cart_button = tk.Button(button_frame, text="Dodaj do koszyka",
-                                                command=lambda s=set_items_list: add_set_to_cart(s))
-                    add_to_cart_button.pack(side=tk.LEFT, padx=5)
-
-                    # "Delete" button with confirmation
-                    delete_button = tk.Button(button_frame, text="Usuń",
-                                            command=lambda s=set_name: self._confirm_and_delete_set(s, delete_set))
-                    delete_button.pack(side=tk.LEFT, padx=5)
-
-                    # "Rename" button
-                    rename_button = tk.Button(button_frame, text="Zmień nazwę", command=lambda s=set_name: rename_set(s))
-                    rename_button.pack(side=tk.LEFT, padx=5)
-
-                if select_set_callback:
-                    select_button = tk.Button(button_frame, text="Wybierz do nadpisania",
-                                              command=lambda s=set_name: select_set_callback(s))
-                    select_button.pack(side=tk.LEFT, padx=5)
-
+        """Displays user-defined sets in a mini-panel, reusing the rows of previous openings."""
+        self.render_user_sets(user_sets, add_set_to_cart, delete_set, rename_set, select_set_callback)
         self.show_user_sets_panel()
 
     def start_checkout(self):
-        """Rozpoczyna proces checkout w osobnym wątku."""
+        """Rozpoczyna proces checkout (bez operacji sieciowych, więc w wątku Tk)."""
         # Wyłącz przycisk, aby zapobiec wielokrotnym kliknięciom
         self.checkout_button.config(state=tk.DISABLED)
-
-        # Uruchomienie checkout w nowym wątku
-        thread = threading.Thread(target=self.run_checkout)
-        thread.start()
-
-    def run_checkout(self):
-        """Wykonuje checkout w osobnym wątku."""
-        # Wykonanie checkout
-        cart = self.controller.checkout()
-        self.checkout_button.config(state=tk.NORMAL)
+        try:
+            self.controller.checkout()
+        finally:
+            self.checkout_button.config(state=tk.NORMAL)
+
+    def set_loading(self, busy):
+        """Pokazuje lub ukrywa wskaźnik ładowania."""
+        if busy:
+            self.loading_label.place(relx=1.0, y=10, anchor="ne")
+        else:
+            self.loading_label.place_forget()
+        self.master.config(cursor="watch" if busy else "")
 
     def _confirm_and_delete_set(self, set_name, delete_set_callback):
         """
@@ -233,8 +179,8 @@ class KioskView:
         """
         confirm = messagebox.askyesno("Potwierdzenie Usunięcia", f"Czy na pewno chcesz usunąć zestaw '{set_name}'?")
         if confirm:
+            # Potwierdzenie pokaże kontroler po zakończeniu operacji
             delete_set_callback(set_name)
-            self.show_info("Usunięto Zestaw", f"Zestaw '{set_name}' został pomyślnie usunięty.")
         else:
             # Użytkownik anulował operację
             self.show_info("Anulowano", f"Usuwanie zestawu '{set_name}' zostało anulowane.")
@@ -254,11 +200,7 @@ class KioskView:
             # Tworzenie nowego zestawu
             set_name = simpledialog.askstring("Nazwa Zestawu", "Wprowadź nazwę dla nowego zestawu:")
             if set_name:
-                try:
-                    self.controller.add_set(set_name, cart)
-                    self.show_info("Zapisano Zestaw", f"Zestaw '{set_name}' został pomyślnie zapisany.")
-                except Exception as e:
-                    self.show_warning("Błąd", f"Nie udało się zapisać zestawu: {str(e)}")
+                self.controller.add_set(set_name, cart)
         else:
             # Nadpisywanie istniejącego zestawu
             # Wybierz zestaw do nadpisania
@@ -278,11 +220,7 @@ class KioskView:
         else:
             new_set_name = set_name  # Keep the same name
 
-        try:
-            self.controller.overwrite_set(set_name, new_set_name, self.cart)
-            self.show_info("Nadpisano Zestaw", f"Zestaw '{set_name}' został nadpisany.")
-        except Exception as e:
-            self.show_warning("Błąd", f"Nie udało się nadpisać zestawu: {str(e)}")
+        self.controller.overwrite_set(set_name, new_set_name, self.cart)
 
     def show_user_sets_panel(self):
         """Pokazuje mini-panel z zestawami użytkownika."""
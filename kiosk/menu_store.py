@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = 4
+REFRESH_INTERVAL = 60  # s
+RETRY_INTERVAL = 5     # s, dopoki menu nie zostalo wczytane ani razu
+
+
+class MenuStore:
+    """In-memory, indexed copy of the whole menu kept on the kiosk.
+
+    Category switches are served from here without any network I/O. The menu
+    is loaded with one /kiosk/bootstrap request; if that is not available the
+    products of all categories are prefetched concurrently with a small worker
+    pool. refresh() swaps the indexes atomically, so readers never see a
+    half-built menu, and bumps `version` when the content changed.
+    """
+
+    def __init__(self, model, workers=PREFETCH_WORKERS):
+        self.model = model
+        self.workers = workers
+        self.version = 0
+        self._categories = []
+        self._by_category = {}  # nazwa kategorii -> lista produktow
+        self._by_id = {}        # product_id -> produkt
+        self._by_name = {}      # nazwa produktu -> produkt
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def categories(self):
+        return self._categories
+
+    def products_in(self, category):
+        """Returns the products of a category, or None if the category is unknown."""
+        return self._by_category.get(category)
+
+    def product_by_id(self, product_id):
+        return self._by_id.get(product_id)
+
+    def product_by_name(self, name):
+        return self._by_name.get(name)
+
+    def refresh(self):
+        """Fetches the menu and swaps it in. Returns True if the menu changed."""
+        with self._refresh_lock:
+            menu = self.model.get_menu()
+            if not menu:
+                menu = self._prefetch_by_category()
+            if not menu:
+                return False  # brak polaczenia - zostaje poprzednie menu
+            return self._load(menu)
+
+    def _prefetch_by_category(self):
+        """Fallback: one /products request per category, run concurrently."""
+        categories = self.model.get_categories()
+        if not categories:
+            return []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="menu-prefetch") as executor:
+            products = list(executor.map(lambda c: self.model.get_products_by_category(c['name']), categories))
+        return [dict(category, products=items) for category, items in zip(categories, products)]
+
+    def _load(self, menu):
+        categories = [{'category_id': c['category_id'], 'name': c['name']} for c in menu]
+        by_category = {c['name']: c['products'] for c in menu}
+        by_id = {}
+        by_name = {}
+        for products in by_category.values():
+            for product in products:
+                by_id[product['product_id']] = product
+                by_name[product['name']] = product
+
+        with self._lock:
+            if by_category == self._by_category and categories == self._categories:
+                return False
+            self._categories, self._by_category = categories, by_category
+            self._by_id, self._by_name = by_id, by_name
+            self.version += 1
+        return True
+
+    def start_auto_refresh(self, interval=REFRESH_INTERVAL):
+        """Refreshes the menu in a background thread every `interval` seconds."""
+        def run():
+            while not self._stop.wait(interval if self.version else min(interval, RETRY_INTERVAL)):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Błąd odświeżania menu: {e}")
+
+        threading.Thread(target=run, name="menu-refresh", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
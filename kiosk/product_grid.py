@@ -0,0 +1,163 @@
+import tkinter as tk
+
+COLUMNS = 3
+TILE_PADDING = 10
+VIRTUALIZE_THRESHOLD = 30  # powyzej tylu produktow uzywamy siatki wirtualnej
+
+
+class ProductTile:
+    """One product tile (Frame + two Labels + Button) that can be reused for any product."""
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent, bg="lightblue", bd=2, relief=tk.RAISED)
+        self.name_label = tk.Label(self.frame, font=("Helvetica", 14), bg="lightblue")
+        self.name_label.pack(pady=5)
+        self.price_label = tk.Label(self.frame, font=("Helvetica", 12), bg="lightblue")
+        self.price_label.pack(pady=5)
+        self.button = tk.Button(self.frame, text="Dodaj")
+        self.button.pack(pady=5)
+        self.product = None
+
+    def bind(self, product, on_add):
+        """Shows a product on this tile; widgets are only reconfigured, never recreated."""
+        if product is self.product:
+            return
+        self.product = product
+        self.name_label.config(text=product['name'])
+        self.price_label.config(text=f"{product['price']} PLN")
+        self.button.config(command=lambda p=product: on_add(p))
+
+
+class PooledProductGrid:
+    """Grid of product tiles that reuses a pool of tiles across category switches."""
+
+    def __init__(self, parent, on_add, columns=COLUMNS):
+        self.frame = tk.Frame(parent, bg="white")
+        self.on_add = on_add
+        self.columns = columns
+        self.tiles = []
+        self.visible = 0
+
+    def render(self, products):
+        for index, product in enumerate(products):
+            if index == len(self.tiles):
+                self.tiles.append(ProductTile(self.frame))
+            tile = self.tiles[index]
+            tile.bind(product, self.on_add)
+            if index >= self.visible:
+                tile.frame.grid(row=index // self.columns, column=index % self.columns,
+                                padx=TILE_PADDING, pady=TILE_PADDING)
+        # Nadmiarowe kafelki ukrywamy zamiast niszczyc
+        for tile in self.tiles[len(products):self.visible]:
+            tile.frame.grid_remove()
+        self.visible = len(products)
+
+    def show(self):
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+    def hide(self):
+        self.frame.pack_forget()
+
+
+class VirtualProductGrid:
+    """Scrollable grid that only materializes the tiles of the visible rows.
+
+    Tiles sit in canvas windows; when the view scrolls, the pooled tiles are
+    moved to the newly visible rows and rebound to their products.
+    """
+
+    def __init__(self, parent, on_add, columns=COLUMNS):
+        self.frame = tk.Frame(parent, bg="white")
+        self.canvas = tk.Canvas(self.frame, bg="white", highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda e: self._layout())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(1))
+
+        self.on_add = on_add
+        self.columns = columns
+        self.products = []
+        self.slots = []  # (tile, canvas window id)
+        self.row_height = None
+        self.column_width = None
+
+    def _measure(self):
+        if self.row_height is None:
+            probe = ProductTile(self.canvas)
+            probe.bind({'name': "X" * 16, 'price': 99.99}, self.on_add)
+            probe.frame.update_idletasks()
+            self.row_height = probe.frame.winfo_reqheight() + 2 * TILE_PADDING
+            self.column_width = probe.frame.winfo_reqwidth() + 2 * TILE_PADDING
+            self.slots.append((probe, self.canvas.create_window(0, 0, window=probe.frame, anchor="nw")))
+
+    def render(self, products):
+        self.products = products
+        self._measure()
+        rows = -(-len(products) // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.column_width, rows * self.row_height))
+        self.canvas.yview_moveto(0)
+        self._layout()
+
+    def _layout(self):
+        """Binds the pooled tiles to the products of the rows currently in view."""
+        if self.row_height is None:
+            return
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first_row = int(self.canvas.canvasy(0) // self.row_height)
+        visible_rows = height // self.row_height + 2
+        first = first_row * self.columns
+        count = min(visible_rows * self.columns, max(len(self.products) - first, 0))
+
+        while len(self.slots) < count:
+            tile = ProductTile(self.canvas)
+            self.slots.append((tile, self.canvas.create_window(0, 0, window=tile.frame, anchor="nw")))
+
+        for slot, (tile, window) in enumerate(self.slots):
+            index = first + slot
+            if slot < count:
+                tile.bind(self.products[index], self.on_add)
+                self.canvas.coords(window, (index % self.columns) * self.column_width + TILE_PADDING,
+                                   (index // self.columns) * self.row_height + TILE_PADDING)
+                self.canvas.itemconfigure(window, state="normal")
+            else:
+                self.canvas.itemconfigure(window, state="hidden")
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._layout()
+
+    def _scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+        self._layout()
+
+    def _on_wheel(self, event):
+        self._scroll(-1 if event.delta > 0 else 1)
+
+    def show(self):
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+    def hide(self):
+        self.frame.pack_forget()
+
+
+class ProductGrid:
+    """Picks the pooled grid for small categories and the virtual grid for big ones."""
+
+    def __init__(self, parent, on_add, columns=COLUMNS, virtualize_threshold=VIRTUALIZE_THRESHOLD):
+        self.pooled = PooledProductGrid(parent, on_add, columns)
+        self.virtual = VirtualProductGrid(parent, on_add, columns)
+        self.virtualize_threshold = virtualize_threshold
+        self.active = None
+
+    def render(self, products):
+        grid = self.virtual if len(products) > self.virtualize_threshold else self.pooled
+        if grid is not self.active:
+            if self.active is not None:
+                self.active.hide()
+            grid.show()
+            self.active = grid
+        grid.render(products)
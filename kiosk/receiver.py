@@ -1,17 +1,21 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 import paho.mqtt.client as mqtt
-import json
 import threading
 
+from tap_filter import SESSION_TOPIC, TapFilter, decode_session, decode_tap
+
 
 class MqttClient(QObject):
     message_received = pyqtSignal(dict)  # Deklaracja sygnału
 
-    def __init__(self, broker_address, port, topic):
+    def __init__(self, broker_address, port, reader_ids, kiosk_id=None):
         super().__init__()
         self.broker_address = broker_address
         self.port = port
-        self.topic = topic
+        # Tylko czytniki tego kiosku; odrzuca duplikaty i przeterminowane odczyty
+        self.tap_filter = TapFilter(reader_ids)
+        # Z kiosk_id odczyty przychodza jako gotowe sesje z bramki (restauracja/tap_gateway.py)
+        self.session_topic = SESSION_TOPIC.format(kiosk_id=kiosk_id) if kiosk_id else None
         self.client = mqtt.Client()
         self.is_listening = True  # Flaga kontrolująca nasłuchiwanie RFID
         self.message = None
@@ -45,22 +49,28 @@ class MqttClient(QObject):
         if rc == 0:
             self.message_received.emit({"status": "Połączono z brokerem MQTT."})
             print("polaczylem sie")
-            client.subscribe(self.topic)
+            topics = [self.session_topic] if self.session_topic else self.tap_filter.topics
+            client.subscribe([(topic, 1) for topic in topics])
         else:
             self.message_received.emit({"error": f"Błąd połączenia: kod {rc}"})
 
     def on_message(self, client, userdata, msg):
         print(msg)
+        is_session = msg.topic == self.session_topic
         try:
-            rfid = msg.payload.decode("utf-8")
-            print(rfid)
-            
-            
-            self.controller.handle_rfid_input(rfid)
-           
-        except json.JSONDecodeError as e:
-            print("exzce")
+            payload = msg.payload.decode("utf-8")
+            tap, response = decode_session(payload) if is_session else (decode_tap(payload), None)
+        except (UnicodeDecodeError, ValueError) as e:
             self.message_received.emit({"error": f"Błąd dekodowania JSON: {e}"})
+            return
+        if not self.tap_filter.accept(tap):
+            print(f"Pominięto odczyt {tap['reader_id']}#{tap['seq']}")
+            return
+        print(tap["uid"])
+        if is_session:
+            self.controller.handle_session_push(response)
+        else:
+            self.controller.handle_rfid_input(tap["uid"])
 
     def start_rfid_listener(self):
         """Rozpoczyna nasłuchiwanie na RFID w osobnym wątku."""
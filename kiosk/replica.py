@@ -0,0 +1,355 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+REPLICA_DB = "kiosk_replica.sqlite"
+SYNC_INTERVAL = 5  # s
+MAX_REPLAY_ATTEMPTS = 5  # po tylu bledach 5xx zapis trafia do dead_letter
+IDEMPOTENCY_HEADER = "Idempotency-Key"  # backend zwraca zapisana odpowiedz na powtorzony zapis
+
+
+class LocalReplica:
+    """Local SQLite copy of the backend data, kept up to date from the /changes feed.
+
+    Also holds the outbox: writes made while the backend is unreachable are
+    stored here and replayed by SyncEngine when connectivity returns. Each
+    entry keeps the idempotency key of the original request, so a write that
+    timed out but reached the backend is not applied twice. Entries the
+    backend rejects, or keeps failing on, are moved to dead_letter.
+    """
+
+    def __init__(self, path=REPLICA_DB):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self._connection as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS categories (
+                    category_id   INTEGER PRIMARY KEY,
+                    name          TEXT NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    product_id    INTEGER PRIMARY KEY,
+                    name          TEXT NOT NULL,
+                    price         REAL NOT NULL,
+                    category_id   INTEGER NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)")
+            db.execute("CREATE TABLE IF NOT EXISTS cards (rfid_id TEXT PRIMARY KEY)")
+            # Zestawy karty w postaci z /rfid/<rfid>/sets; nazwe i cene bierzemy przy odczycie z products
+            db.execute("CREATE TABLE IF NOT EXISTS card_sets (rfid_id TEXT PRIMARY KEY, sets_json TEXT NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path          TEXT NOT NULL,
+                    body          TEXT NOT NULL,
+                    created_at    REAL NOT NULL,
+                    method        TEXT NOT NULL DEFAULT 'POST',
+                    idempotency_key TEXT,
+                    attempts      INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Repliki sprzed nowszych kolumn (wszystkie zapisy byly wtedy POST-ami, bez kluczy)
+            columns = [row['name'] for row in db.execute("PRAGMA table_info(outbox)")]
+            for column, definition in (("method", "TEXT NOT NULL DEFAULT 'POST'"),
+                                       ("idempotency_key", "TEXT"),
+                                       ("attempts", "INTEGER NOT NULL DEFAULT 0")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE outbox ADD COLUMN {column} {definition}")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS dead_letter (
+                    id            INTEGER PRIMARY KEY,
+                    method        TEXT NOT NULL,
+                    path          TEXT NOT NULL,
+                    body          TEXT NOT NULL,
+                    idempotency_key TEXT,
+                    created_at    REAL NOT NULL,
+                    attempts      INTEGER NOT NULL,
+                    status        INTEGER,
+                    failed_at     REAL NOT NULL
+                )
+            """)
+
+    # Odczyty
+
+    @property
+    def last_seq(self):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'last_seq'").fetchone()
+        return row[0] if row else 0
+
+    def is_ready(self):
+        """True once the replica has been filled from the feed at least once."""
+        return self.last_seq > 0
+
+    def menu(self):
+        """Returns the menu in the /kiosk/bootstrap format."""
+        with self._lock:
+            categories = self._connection.execute(
+                "SELECT category_id, name FROM categories ORDER BY category_id").fetchall()
+            products = self._connection.execute(
+                "SELECT product_id, name, price, category_id FROM products ORDER BY product_id").fetchall()
+        menu = {row['category_id']: {'category_id': row['category_id'], 'name': row['name'], 'products': []}
+                for row in categories}
+        for row in products:
+            if row['category_id'] in menu:
+                menu[row['category_id']]['products'].append(dict(row))
+        return list(menu.values())
+
+    def sets(self, rfid):
+        """Returns the card's sets with current product names and prices from the products table.
+
+        Items of products that no longer exist are left out, as in the backend's
+        join. Until the first sync (empty products table) and for offline items
+        without a product id, the name and price stored with the set are used.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT sets_json FROM card_sets WHERE rfid_id = ?", (str(rfid),)).fetchone()
+            if not row:
+                return {}
+            stored = json.loads(row[0])
+            product_ids = [item['product_id'] for items in stored.values() for item in items
+                           if item.get('product_id') is not None]
+            products = {product['product_id']: product for product in self._connection.execute("""
+                SELECT product_id, name, price FROM products WHERE product_id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(product_ids),))}
+            last_seq = self._connection.execute("SELECT value FROM meta WHERE key = 'last_seq'").fetchone()
+            ready = last_seq is not None and last_seq[0] > 0
+
+        sets = {}
+        for set_name, items in stored.items():
+            resolved = []
+            for item in items:
+                product = products.get(item.get('product_id'))
+                if product is not None:
+                    item = dict(item, name=product['name'], price=product['price'])
+                elif item.get('product_id') is not None and ready:
+                    continue  # produkt usuniety z menu
+                resolved.append(item)
+            sets[set_name] = resolved
+        return sets
+
+    def has_card(self, rfid):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM cards WHERE rfid_id = ?", (str(rfid),)).fetchone() is not None
+
+    # Zapisy z feedu
+
+    def apply_changes(self, changes, last_seq):
+        """Applies one page of /changes in a single transaction."""
+        with self._lock, self._connection as db:
+            for change in changes:
+                entity, key, data = change['entity'], change['key'], change['data']
+                if entity == 'category':
+                    if data is None:
+                        db.execute("DELETE FROM categories WHERE category_id = ?", (key,))
+                    else:
+                        db.execute("INSERT OR REPLACE INTO categories (category_id, name) VALUES (?, ?)",
+                                   (data['category_id'], data['name']))
+                elif entity == 'product':
+                    if data is None:
+                        db.execute("DELETE FROM products WHERE product_id = ?", (key,))
+                    else:
+                        db.execute("""
+                            INSERT OR REPLACE INTO products (product_id, name, price, category_id)
+                            VALUES (?, ?, ?, ?)
+                        """, (data['product_id'], data['name'], data['price'], data['category_id']))
+                elif entity == 'card':
+                    if data is None:
+                        db.execute("DELETE FROM cards WHERE rfid_id = ?", (str(key),))
+                    else:
+                        db.execute("INSERT OR IGNORE INTO cards (rfid_id) VALUES (?)", (str(key),))
+                elif entity == 'sets':
+                    self._store_sets(db, key, data or {})
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_seq', ?)", (last_seq,))
+
+    def _store_sets(self, db, rfid, sets):
+        db.execute("INSERT OR REPLACE INTO card_sets (rfid_id, sets_json) VALUES (?, ?)",
+                   (str(rfid), json.dumps(sets)))
+
+    # Lokalne zmiany (offline lub tuz po zapisie online)
+
+    def store_card(self, rfid, sets=None):
+        with self._lock, self._connection as db:
+            db.execute("INSERT OR IGNORE INTO cards (rfid_id) VALUES (?)", (str(rfid),))
+            if sets is not None:
+                self._store_sets(db, rfid, sets)
+
+    def _cart_to_items(self, db, cart):
+        items = []
+        for name, details in cart.items():
+            row = db.execute("SELECT product_id, price FROM products WHERE name = ?", (name,)).fetchone()
+            items.append({'product_id': row['product_id'] if row else None, 'name': name,
+                          'price': row['price'] if row else details.get('price'),
+                          'quantity': details['quantity']})
+        return items
+
+    def update_sets(self, rfid, change):
+        """Applies change(sets, db) to the card's local sets and stores the result."""
+        with self._lock, self._connection as db:
+            row = db.execute("SELECT sets_json FROM card_sets WHERE rfid_id = ?", (str(rfid),)).fetchone()
+            sets = json.loads(row[0]) if row else {}
+            change(sets, db)
+            self._store_sets(db, rfid, sets)
+
+    def apply_add_set(self, rfid, set_name, cart):
+        if not cart:
+            # Jak PUT /rfid/<rfid>/sets/<nazwa>: pusty koszyk usuwa zestaw
+            self.apply_delete_set(rfid, set_name)
+            return
+        self.update_sets(rfid, lambda sets, db: sets.__setitem__(set_name, self._cart_to_items(db, cart)))
+
+    def apply_overwrite_set(self, rfid, set_name_old, set_name_new, cart):
+        def change(sets, db):
+            sets.pop(set_name_old, None)
+            sets[set_name_new or set_name_old] = self._cart_to_items(db, cart)
+        self.update_sets(rfid, change)
+
+    def apply_rename_set(self, rfid, set_name_old, set_name_new):
+        def change(sets, db):
+            if set_name_old in sets:
+                sets[set_name_new] = sets.pop(set_name_old)
+        self.update_sets(rfid, change)
+
+    def apply_delete_set(self, rfid, set_name):
+        self.update_sets(rfid, lambda sets, db: sets.pop(set_name, None))
+
+    # Outbox
+
+    def enqueue(self, path, body, method="POST", idempotency_key=None):
+        """Queues a write; pass the key the original request was sent with, if there was one."""
+        with self._lock, self._connection as db:
+            db.execute("""
+                INSERT INTO outbox (path, body, created_at, method, idempotency_key) VALUES (?, ?, ?, ?, ?)
+            """, (path, json.dumps(body), time.time(), method, idempotency_key or uuid.uuid4().hex))
+
+    def pending(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, method, path, body, idempotency_key FROM outbox ORDER BY id").fetchall()
+        return [(row['id'], row['method'], row['path'], json.loads(row['body']), row['idempotency_key'])
+                for row in rows]
+
+    def remove_from_outbox(self, entry_id):
+        with self._lock, self._connection as db:
+            db.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def record_failure(self, entry_id):
+        """Counts a failed replay of an entry and returns its number of attempts so far."""
+        with self._lock, self._connection as db:
+            db.execute("UPDATE outbox SET attempts = attempts + 1 WHERE id = ?", (entry_id,))
+            row = db.execute("SELECT attempts FROM outbox WHERE id = ?", (entry_id,)).fetchone()
+        return row[0] if row else 0
+
+    def move_to_dead_letter(self, entry_id, status):
+        """Moves an entry that cannot be replayed out of the outbox, keeping it for inspection."""
+        with self._lock, self._connection as db:
+            db.execute("""
+                INSERT INTO dead_letter (id, method, path, body, idempotency_key, created_at, attempts, status,
+                                         failed_at)
+                SELECT id, method, path, body, idempotency_key, created_at, attempts, ?, ?
+                FROM outbox WHERE id = ?
+            """, (status, time.time(), entry_id))
+            db.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def dead_letters(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, method, path, body, attempts, status FROM dead_letter ORDER BY id").fetchall()
+        return [dict(row, body=json.loads(row['body'])) for row in rows]
+
+    def close(self):
+        self._connection.close()
+
+
+class SyncEngine:
+    """Background thread that replays the outbox and then pulls /changes into the replica."""
+
+    def __init__(self, replica, http, base_url, interval=SYNC_INTERVAL, page_size=500,
+                 max_attempts=MAX_REPLAY_ATTEMPTS):
+        self.replica = replica
+        self.http = http
+        self.base_url = base_url
+        self.interval = interval
+        self.page_size = page_size
+        self.max_attempts = max_attempts
+        self.online = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, name="replica-sync", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Requests a sync as soon as possible (e.g. right after a queued write)."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                print(f"Błąd synchronizacji repliki: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def sync_once(self):
+        """Replays queued writes, then pulls every pending page of changes. Returns True if online."""
+        with self._lock:
+            self.online = self._replay_outbox() and self._pull_changes()
+            return self.online
+
+    def _replay_outbox(self):
+        for entry_id, method, path, body, key in self.replica.pending():
+            headers = {IDEMPOTENCY_HEADER: key} if key else {}
+            response = self.http.request(method, f"{self.base_url}{path}", json=body, headers=headers)
+            if response is None:
+                return False  # nadal offline, sprobujemy pozniej w tej samej kolejnosci
+            if response.status_code == 503 and "Retry-After" in response.headers:
+                # Serwer prosi o ponowienie pozniej (np. klucz jeszcze zajety) - to nie jest nieudana proba
+                return False
+            if response.status_code >= 500:
+                attempts = self.replica.record_failure(entry_id)
+                if attempts < self.max_attempts:
+                    return False
+                # Jeden zepsuty zapis nie moze na zawsze blokowac kolejnych i pobierania /changes
+                print(f"Zapis z kolejki {path} odlozony po {attempts} probach: {response.status_code}")
+                self.replica.move_to_dead_letter(entry_id, response.status_code)
+                continue
+            if response.status_code >= 400:
+                print(f"Odrzucono zapis z kolejki {path}: {response.status_code}")
+                self.replica.move_to_dead_letter(entry_id, response.status_code)
+                continue
+            self.replica.remove_from_outbox(entry_id)
+        return True
+
+    def _pull_changes(self):
+        while True:
+            response = self.http.get(f"{self.base_url}/changes",
+                                     params={"since": self.replica.last_seq, "limit": self.page_size})
+            if response is None or response.status_code != 200:
+                return False
+            page = response.json()
+            if page['changes']:
+                self.replica.apply_changes(page['changes'], page['last_seq'])
+            if not page['more']:
+                return True
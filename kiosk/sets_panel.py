@@ -0,0 +1,139 @@
+import tkinter as tk
+
+
+class SetRow:
+    """One reusable "Moje Zestawy" row: a header with buttons and lazily filled item labels."""
+
+    def __init__(self, parent):
+        self.frame = tk.LabelFrame(parent, font=("Helvetica", 14), padx=10, pady=10, bg="white")
+        self.items_frame = tk.Frame(self.frame, bg="white")
+        self.items_frame.pack(fill=tk.X)
+        self.item_labels = []
+
+        button_frame = tk.Frame(self.frame, bg="white")
+        button_frame.pack(fill=tk.X, pady=5)
+        self.add_button = tk.Button(button_frame, text="Dodaj do koszyka")
+        self.delete_button = tk.Button(button_frame, text="Usuń")
+        self.rename_button = tk.Button(button_frame, text="Zmień nazwę")
+        self.select_button = tk.Button(button_frame, text="Wybierz do nadpisania")
+
+        self.items = []
+        self.items_shown = False
+
+    def bind(self, set_name, items, add_set_to_cart, delete_set, rename_set, select_set_callback=None):
+        """Shows a set on this row; only the header is filled, items wait for show_items()."""
+        self.frame.config(text=set_name)
+        self.items = items
+        self.items_shown = False
+        for label in self.item_labels:
+            label.pack_forget()
+
+        buttons = (self.add_button, self.delete_button, self.rename_button, self.select_button)
+        for button in buttons:
+            button.pack_forget()
+        if select_set_callback:
+            self.select_button.config(command=lambda s=set_name: select_set_callback(s))
+            self.select_button.pack(side=tk.LEFT, padx=5)
+        else:
+            self.add_button.config(command=lambda s=items: add_set_to_cart(s))
+            self.delete_button.config(command=lambda s=set_name: delete_set(s))
+            self.rename_button.config(command=lambda s=set_name: rename_set(s))
+            for button in buttons[:3]:
+                button.pack(side=tk.LEFT, padx=5)
+
+    def show_items(self):
+        if self.items_shown:
+            return
+        self.items_shown = True
+        for index, set_item in enumerate(self.items):
+            if index == len(self.item_labels):
+                self.item_labels.append(tk.Label(self.items_frame, font=("Helvetica", 12), bg="white"))
+            label = self.item_labels[index]
+            label.config(text=f"{set_item['name']}: {set_item['quantity']}")
+            label.pack(anchor="w", padx=5, pady=2)
+
+
+class SetsPanel:
+    """Scrollable list of a card's sets, built once and reused every time the panel opens.
+
+    Set headers are rendered immediately; the product lines of a set are only
+    created when its row scrolls into view. Rows and item labels are pooled.
+    """
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent, bg="white")
+        self.empty_label = tk.Label(self.frame, text="Nie znaleziono zestawów przypisanych do Twojej karty.",
+                                    bg="white", font=("Helvetica", 12))
+
+        # Scrollbar i Canvas dla przewijania, tworzone tylko raz
+        self.canvas = tk.Canvas(self.frame, bg="white")
+        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.rows_frame = tk.Frame(self.canvas, bg="white")
+        self.canvas.create_window((0, 0), window=self.rows_frame, anchor="nw")
+        self.rows_frame.bind("<Configure>", self._on_rows_resized)
+        self.canvas.bind("<Configure>", lambda e: self._schedule_fill())
+        self.canvas.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(1))
+
+        self.rows = []
+        self.visible = 0
+        self._fill_pending = False
+
+    def render(self, user_sets, add_set_to_cart, delete_set, rename_set, select_set_callback=None):
+        if not user_sets:
+            self.canvas.pack_forget()
+            self.scrollbar.pack_forget()
+            self.empty_label.pack(pady=10)
+        else:
+            self.empty_label.pack_forget()
+            self.canvas.pack(side="left", fill="both", expand=True)
+            self.scrollbar.pack(side="right", fill="y")
+
+        for index, (set_name, items) in enumerate((user_sets or {}).items()):
+            if index == len(self.rows):
+                self.rows.append(SetRow(self.rows_frame))
+            row = self.rows[index]
+            row.bind(set_name, items, add_set_to_cart, delete_set, rename_set, select_set_callback)
+            if index >= self.visible:
+                row.frame.pack(fill=tk.X, pady=5, padx=5)
+        # Nadmiarowe wiersze chowamy, zostaja w puli na kolejne otwarcie
+        count = len(user_sets or {})
+        for row in self.rows[count:self.visible]:
+            row.frame.pack_forget()
+        self.visible = count
+
+        self.canvas.yview_moveto(0)
+        self._schedule_fill()
+
+    def _on_rows_resized(self, event):
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self._schedule_fill()
+
+    def _schedule_fill(self):
+        # Pozycje wierszy sa znane dopiero po ulozeniu naglowkow
+        if not self._fill_pending:
+            self._fill_pending = True
+            self.frame.after_idle(self._fill_visible)
+
+    def _fill_visible(self):
+        """Creates the item lines of the rows that are currently in view."""
+        self._fill_pending = False
+        self.frame.update_idletasks()
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        for row in self.rows[:self.visible]:
+            y = row.frame.winfo_y()
+            if y > bottom:
+                break
+            if y + row.frame.winfo_height() >= top:
+                row.show_items()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_fill()
+
+    def _scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+        self._schedule_fill()
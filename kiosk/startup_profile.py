@@ -0,0 +1,47 @@
+import json
+import threading
+import time
+
+STARTUP_LOG = "kiosk_startup.log"  # jedna linia JSON na kazde uruchomienie
+
+
+class StartupProfile:
+    """Records named startup milestones relative to process start.
+
+    Kiosk.py marks "first_frame" once the window is drawn and "interactive"
+    once the menu is shown; report() prints every phase and appends the run
+    to STARTUP_LOG so boot times can be compared across power cycles.
+    """
+
+    def __init__(self, started=None, log_path=STARTUP_LOG):
+        self.started = started if started is not None else time.perf_counter()
+        self.log_path = log_path
+        self.marks = {}  # nazwa -> sekundy od startu
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Records a milestone (only its first occurrence); safe to call from any thread."""
+        with self._lock:
+            self.marks.setdefault(name, time.perf_counter() - self.started)
+
+    def summary(self):
+        with self._lock:
+            marks = dict(self.marks)
+        return {
+            'time_to_first_frame': marks.get('first_frame'),
+            'time_to_interactive': marks.get('interactive'),
+            'phases': dict(sorted(marks.items(), key=lambda item: item[1])),
+        }
+
+    def report(self):
+        summary = self.summary()
+        print("Profil uruchomienia:")
+        for name, seconds in summary['phases'].items():
+            print(f"  {name:<20} {seconds * 1000:8.1f} ms")
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as log:
+                    log.write(json.dumps(dict(summary, timestamp=time.time())) + "\n")
+            except OSError as e:
+                print(f"Nie udało się zapisać profilu uruchomienia: {e}")
+        return summary
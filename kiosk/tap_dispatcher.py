@@ -0,0 +1,90 @@
+import collections
+import statistics
+import threading
+import time
+
+MAX_PENDING = 32       # odczyty czekajace na watek UI
+COALESCE_WINDOW = 1.0  # s, kolejne odczyty tej samej karty w tym oknie lacza sie w jeden
+LATENCY_SAMPLES = 500
+
+
+class TapDispatcher:
+    """Hands taps from the MQTT network thread over to the UI thread.
+
+    offer() only touches an in-memory queue, so paho's loop never waits for
+    application work. Pending taps are keyed by card: a newer tap of a card
+    that is still queued replaces it, and a card delivered less than
+    `coalesce_window` ago is not delivered again. When the queue is full the
+    oldest tap is dropped. `schedule(callback)` must run the callback on the
+    UI thread (e.g. UiTaskRunner.call_soon); deliver(uid, payload) is then
+    called there, with the payload passed to offer() (None for a bare tap).
+    """
+
+    def __init__(self, deliver, schedule, max_pending=MAX_PENDING, coalesce_window=COALESCE_WINDOW,
+                 clock=time.monotonic):
+        self.deliver = deliver
+        self.schedule = schedule
+        self.max_pending = max_pending
+        self.coalesce_window = coalesce_window
+        self.clock = clock
+        self._pending = collections.OrderedDict()  # uid -> (czas przyjecia, dane)
+        self._last_delivered = {}                  # uid -> czas dostarczenia
+        self._scheduled = False
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.counters = {"offered": 0, "delivered": 0, "coalesced": 0, "dropped": 0, "max_depth": 0}
+        self._lock = threading.Lock()
+
+    def offer(self, uid, payload=None):
+        """Queues a tap; safe to call from any thread and never blocks on the UI."""
+        now = self.clock()
+        with self._lock:
+            self.counters["offered"] += 1
+            if uid in self._pending:
+                # Zostaje tylko najnowszy odczyt karty
+                del self._pending[uid]
+                self.counters["coalesced"] += 1
+            elif now - self._last_delivered.get(uid, float("-inf")) < self.coalesce_window:
+                self.counters["coalesced"] += 1
+                return False
+            elif len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.counters["dropped"] += 1
+            self._pending[uid] = (now, payload)
+            self.counters["max_depth"] = max(self.counters["max_depth"], len(self._pending))
+            if self._scheduled:
+                return True
+            self._scheduled = True
+        self.schedule(self._drain)
+        return True
+
+    def _drain(self):
+        """Runs on the UI thread: delivers every pending tap in arrival order."""
+        with self._lock:
+            pending, self._pending = self._pending, collections.OrderedDict()
+            self._scheduled = False
+            now = self.clock()
+            for uid, (queued_at, _) in pending.items():
+                self._latencies.append(now - queued_at)
+                self._last_delivered[uid] = now
+            self.counters["delivered"] += len(pending)
+            # Stare wpisy nie sa juz potrzebne do laczenia odczytow
+            self._last_delivered = {uid: at for uid, at in self._last_delivered.items()
+                                    if now - at < self.coalesce_window}
+        for uid, (_, payload) in pending.items():
+            try:
+                self.deliver(uid, payload)
+            except Exception as e:
+                print(f"Błąd obsługi odczytu {uid}: {e}")
+
+    def depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        """Counters, current queue depth and dispatch latency (queued -> handed to the UI thread) in ms."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self.counters, depth=len(self._pending))
+        if latencies:
+            stats["latency_p50_ms"] = statistics.median(latencies) * 1000
+            stats["latency_p99_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+        return stats
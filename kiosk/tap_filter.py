@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+
+TAP_VERSION = 1
+TAP_TOPIC = "rfid/{reader_id}/read"
+SESSION_TOPIC = "kiosk/{kiosk_id}/session"  # sesje publikowane przez restauracja/tap_gateway.py
+MAX_TAP_AGE = 10.0  # s, starsze odczyty (np. z kolejki czytnika po awarii sieci) odrzucamy
+
+
+def _parse_tap(message):
+    if message["v"] != TAP_VERSION:
+        raise ValueError(f"Nieobsługiwana wersja wiadomości: {message['v']}")
+    # "w" (czas zegarowy odczytu) moze nie wystepowac w wiadomosciach starszych czytnikow
+    wall_time = message.get("w")
+    return {"reader_id": str(message["r"]), "boot_id": str(message["b"]), "seq": int(message["s"]),
+            "timestamp": message["t"] / 1000, "wall_time": wall_time / 1000 if wall_time is not None else None,
+            "uid": str(message["u"])}
+
+
+def decode_tap(payload):
+    """Parses a tap message published by sender.py. Raises ValueError if it is not a valid v1 message."""
+    try:
+        return _parse_tap(json.loads(payload))
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Niepoprawna wiadomość odczytu: {e}") from e
+
+
+def decode_session(payload):
+    """Parses a session pushed by the tap gateway.
+
+    Returns (tap, response) where response has the /tap shape: rfid, new, message, sets.
+    If the gateway could not resolve the tap, response is {"rfid", "error"} instead.
+    """
+    try:
+        message = json.loads(payload)
+        if message["v"] != TAP_VERSION:
+            raise ValueError(f"Nieobsługiwana wersja wiadomości: {message['v']}")
+        tap = _parse_tap(dict(message["tap"], v=message["v"]))
+        keys = ("rfid", "error") if "error" in message else ("rfid", "new", "message", "sets")
+        response = {key: message[key] for key in keys}
+        return tap, response
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Niepoprawna wiadomość sesji: {e}") from e
+
+
+class TapFilter:
+    """Accepts only fresh, first-seen taps from this kiosk's readers.
+
+    Per (reader, boot) it remembers the highest sequence number seen, so
+    duplicates (QoS 1 redelivery, outbox replay) and out-of-order older taps
+    are dropped. A tap whose wall-clock read time is more than `max_age` in
+    the past is dropped as stale, including the first tap of a boot and taps
+    replayed from a reader's outbox after a restart. Reader and kiosk clocks
+    are expected to be NTP-synchronised.
+    """
+
+    def __init__(self, reader_ids, max_age=MAX_TAP_AGE, clock=time.time):
+        self.reader_ids = set(reader_ids)
+        self.max_age = max_age
+        self.clock = clock
+        self._last_seq = {}  # (reader_id, boot_id) -> najwyzszy numer
+        self.counters = {"accepted": 0, "foreign": 0, "duplicate": 0, "stale": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def topics(self):
+        return [TAP_TOPIC.format(reader_id=reader_id) for reader_id in sorted(self.reader_ids)]
+
+    def accept(self, tap):
+        key = (tap["reader_id"], tap["boot_id"])
+        now = self.clock()
+        with self._lock:
+            if tap["reader_id"] not in self.reader_ids:
+                return self._drop("foreign")
+            if tap["seq"] <= self._last_seq.get(key, 0):
+                return self._drop("duplicate")
+            self._last_seq[key] = tap["seq"]
+            if tap["wall_time"] is not None and now - tap["wall_time"] > self.max_age:
+                return self._drop("stale")
+            self.counters["accepted"] += 1
+            return True
+
+    def _drop(self, reason):
+        self.counters[reason] += 1
+        return False
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
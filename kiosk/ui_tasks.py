@@ -0,0 +1,108 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+IO_WORKERS = 4
+POLL_INTERVAL_MS = 20
+
+
+class UiTaskRunner:
+    """Runs blocking work (HTTP) off the Tk thread and delivers results back on it.
+
+    Only the Tk thread touches widgets: workers put callbacks on a queue that
+    the Tk thread drains every POLL_INTERVAL_MS via root.after. Tasks submitted
+    under the same key supersede each other, so a result that arrives after a
+    newer request (e.g. rapid category taps) is silently dropped.
+    """
+
+    def __init__(self, root, on_busy=None, workers=IO_WORKERS):
+        self.root = root
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kiosk-io")
+        self._callbacks = queue.Queue()
+        self._counter = itertools.count(1)
+        self._generations = {}  # key -> numer ostatniego zlecenia
+        self._futures = {}      # key -> future ostatniego zlecenia
+        self._active = 0
+        self._lock = threading.Lock()
+        self.root.after(POLL_INTERVAL_MS, self._drain)
+
+    def call_soon(self, callback, *args):
+        """Schedules callback(*args) on the Tk thread; safe to call from any thread."""
+        self._callbacks.put((callback, args))
+
+    def submit(self, key, work, on_done=None, on_error=None):
+        """Runs work() on the executor; on_done(result) / on_error(exc) then run on the Tk thread.
+
+        key=None means the task is never superseded. May be called from any thread.
+        """
+        if key is None:
+            key = object()
+        with self._lock:
+            generation = next(self._counter)
+            self._generations[key] = generation
+            previous = self._futures.get(key)
+            if previous is not None and previous.cancel():
+                self._active -= 1
+            self._active += 1
+            future = self.executor.submit(self._run, key, generation, work, on_done, on_error)
+            self._futures[key] = future
+        self.call_soon(self._notify_busy)
+        return future
+
+    def cancel(self, key):
+        """Drops the latest task under key: it doesn't start if still queued and its callbacks never run."""
+        with self._lock:
+            self._generations.pop(key, None)
+            future = self._futures.pop(key, None)
+            if future is not None and future.cancel():
+                self._active -= 1
+        self.call_soon(self._notify_busy)
+
+    def _run(self, key, generation, work, on_done, on_error):
+        try:
+            result, error = work(), None
+        except Exception as e:
+            result, error = None, e
+        self.call_soon(self._finish, key, generation, result, error, on_done, on_error)
+
+    def _finish(self, key, generation, result, error, on_done, on_error):
+        with self._lock:
+            self._active -= 1
+            current = self._generations.get(key) == generation
+            if current:
+                del self._generations[key]
+                self._futures.pop(key, None)
+        self._notify_busy()
+        if not current:
+            return  # nowsze zlecenie o tym samym kluczu juz wyslano
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+            else:
+                print(f"Błąd zadania {key}: {error}")
+        elif on_done is not None:
+            on_done(result)
+
+    def is_busy(self):
+        return self._active > 0
+
+    def _notify_busy(self):
+        if self.on_busy is not None:
+            self.on_busy(self.is_busy())
+
+    def _drain(self):
+        while True:
+            try:
+                callback, args = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Błąd w wywołaniu zwrotnym UI: {e}")
+        self.root.after(POLL_INTERVAL_MS, self._drain)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,59 +1,214 @@
-from flask import Flask, jsonify, request
-from init_database import init_db, get_db
+import atexit
+import json
+import re
+import sqlite3
+import time
+
+from flask import Flask, Response, jsonify, request, g, stream_with_context
+from init_database import init_db, db_manager
+from catalog_cache import catalog_cache
+from sets_cache import SetsCache
 from seeder import seed_database
+from bulk import export_ndjson, import_ndjson
+import idempotency
+import queries
 
 app = Flask(__name__)
 
+SETS_CACHE_SIZE = 1024  # ile kart trzymamy w pamieci
+SETS_CACHE_TTL = 300    # s
+RFID_PATTERN = re.compile(r'[0-9A-Za-z_-]{1,64}')  # numer karty z czytnika
+sets_cache = SetsCache(maxsize=SETS_CACHE_SIZE, ttl=SETS_CACHE_TTL)
+
 init_db()
+atexit.register(db_manager.close_all)
+
+
+def get_db():
+    """Checks a pooled connection out for the current app context; teardown_db returns it."""
+    if 'db' not in g:
+        g.db = db_manager.connect()
+    return g.db
+
+
+@app.teardown_appcontext
+def teardown_db(exception):
+    db = g.pop('db', None)
+    if db is not None:
+        db_manager.release(db)
+
+
+WRITE_METHODS = {'POST', 'PUT', 'DELETE'}
+
+
+@app.before_request
+def replay_idempotent_write():
+    """Answers a repeated write (same Idempotency-Key) with the stored response instead of running it again."""
+    key = request.headers.get(idempotency.HEADER)
+    if not key or request.method not in WRITE_METHODS:
+        return None
+    if len(key) > idempotency.MAX_KEY_LENGTH:
+        return jsonify({'error': 'Idempotency-Key is too long'}), 400
+
+    request_line = f"{request.method} {request.path}"
+    claimed_at = time.time()
+    row = idempotency.claim(get_db(), key, request_line, claimed_at)
+    if row is None:
+        g.idempotency_claim = (key, claimed_at)
+        return None
+    if row['request'] != request_line:
+        return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+    if row['status'] is None:
+        # Pierwsze zapytanie wciaz trwa - klient ponowi pozniej
+        response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    response = app.response_class(row['body'], status=row['status'], mimetype=row['content_type'])
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+@app.after_request
+def store_idempotent_write(response):
+    claim = g.pop('idempotency_claim', None)
+    if claim is not None:
+        if response.status_code >= 500 or response.is_streamed:
+            idempotency.release(get_db(), *claim)
+        else:
+            idempotency.store(get_db(), *claim, response.status_code, response.get_data(), response.mimetype)
+    return response
+
+
+@app.teardown_request
+def release_idempotency_key(exception):
+    # Nieobsluzony wyjatek pomija after_request - klucz nie moze zostac zajety na zawsze
+    claim = g.pop('idempotency_claim', None)
+    if claim is not None:
+        idempotency.release(get_db(), *claim)
+
+
+def resolve_product_ids(db, product_names):
+    """Resolves product names to ids with a single query.
+
+    Returns a ({name: product_id}, [missing names]) tuple.
+    """
+    product_names = list(product_names)
+    rows = db.execute(queries.PRODUCTS_BY_NAMES, (json.dumps(product_names),)).fetchall()
+    product_ids = {row['name']: row['product_id'] for row in rows}
+    missing = [name for name in product_names if name not in product_ids]
+    return product_ids, missing
+
+
+def insert_set_items(db, zestaw_id, cart, product_ids):
+    """Writes all cart lines of a set with one executemany."""
+    db.executemany("""
+            INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)
+        """, [(product_ids[name], zestaw_id, details['quantity']) for name, details in cart.items()])
+
+
+def catalog_response(key, build):
+    """Serves a catalog resource from the cache, answering 304 to a matching If-None-Match.
+
+    A revalidation hit never touches the database.
+    """
+    encoding = 'gzip' if 'gzip' in request.accept_encodings else 'identity'
+    etag = catalog_cache.etag_for(encoding)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        etag, body = catalog_cache.get(key, build, encoding)
+        response = app.response_class(body, mimetype='application/json')
+        if encoding == 'gzip':
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def load_categories():
+    categories = get_db().execute("SELECT category_id, name FROM categories").fetchall()
+    return [{'category_id': row[0], 'name': row[1]} for row in categories]
+
+
+def load_products(category=None):
+    db = get_db()
+    if category:
+        # If category_id is provided, filter products by that category
+        products = db.execute(queries.PRODUCTS_BY_CATEGORY, (category,)).fetchall()
+    else:
+        # Fetch all products if no category filter is applied
+        products = db.execute("""
+            SELECT product_id, name, price, category_id
+            FROM products
+        """).fetchall()
+    return [{'product_id': row[0], 'name': row[1], 'price': row[2], 'category_id': row[3]} for row in products]
+
+
+def load_menu():
+    """Builds the whole menu (categories with nested products) from one joined query."""
+    rows = get_db().execute("""
+        SELECT c.category_id, c.name AS category_name, p.product_id, p.name, p.price
+        FROM categories c
+        LEFT JOIN products p ON p.category_id = c.category_id
+        ORDER BY c.category_id, p.product_id
+    """).fetchall()
+
+    menu = {}
+    for row in rows:
+        category = menu.setdefault(row['category_id'], {
+            'category_id': row['category_id'],
+            'name': row['category_name'],
+            'products': []
+        })
+        if row['product_id'] is not None:
+            category['products'].append({
+                'product_id': row['product_id'],
+                'name': row['name'],
+                'price': row['price'],
+                'category_id': row['category_id']
+            })
+    return list(menu.values())
+
+
+@app.route('/kiosk/bootstrap', methods=['GET'])
+def kiosk_bootstrap():
+    """Returns every category with its products, so a kiosk needs one request for the whole menu."""
+    return catalog_response('menu', load_menu)
+
 
 @app.route('/categories', methods=['GET', 'POST'])
 def categories():
-    db = get_db()
     if request.method == 'GET':
-        categories = db.execute("SELECT category_id, name FROM categories").fetchall()
-        return jsonify([{'category_id': row[0], 'name': row[1]} for row in categories])
+        return catalog_response('categories', load_categories)
     elif request.method == 'POST':
+        db = get_db()
         data = request.json
         db.execute("INSERT INTO categories (category_id, name) VALUES (?, ?)", (data['category_id'], data['name']))
         db.commit()
+        catalog_cache.bump()
         return jsonify({'message': 'Category added successfully!'}), 201
 
+
 @app.route('/products', methods=['GET', 'POST'])
 def products():
-    db = get_db()
-    
     if request.method == 'GET':
-        category = request.args.get('category')  # Fetch category ID from query parameters
-        
-        if category:
-            try:
-                # If category_id is provided, filter products by that category
-                products = db.execute("""
-                    SELECT product_id, p.name, price, p.category_id
-                    FROM products p
-                    JOIN categories c ON p.category_id = c.category_id
-                    WHERE c.name = ?
-                """, (category,)).fetchall()
-            except ValueError:
-                return jsonify({'error': 'Invalid category ID'}), 400
-        else:
-            # Fetch all products if no category filter is applied
-            products = db.execute("""
-                SELECT product_id, name, price, category_id
-                FROM products
-            """).fetchall()
-        
-        return jsonify([{'product_id': row[0], 'name': row[1], 'price': row[2], 'category_id': row[3]} for row in products])
-    
+        category = request.args.get('category')  # Fetch category name from query parameters
+        return catalog_response(('products', category), lambda: load_products(category))
+
     elif request.method == 'POST':
+        db = get_db()
         data = request.json
         db.execute("""
             INSERT INTO products (product_id, name, price, category_id)
             VALUES (?, ?, ?, ?)
         """, (data['product_id'], data['name'], data['price'], data['category_id']))
         db.commit()
+        catalog_cache.bump()
         return jsonify({'message': 'Product added successfully!'}), 201
 
+
 @app.route('/rfid', methods=['POST'])
 def assign_rfid():
     db = get_db()
@@ -64,60 +219,90 @@ def assign_rfid():
     if not rfid:
         return jsonify({'error': 'RFID is required'}), 400
 
-    existing_rfid = db.execute("SELECT rfid_id FROM rfid WHERE rfid_id = ?", (rfid,)).fetchone()
+    existing_rfid = db.execute(queries.RFID_BY_ID, (rfid,)).fetchone()
 
     if not existing_rfid:
         db.execute("INSERT INTO rfid (rfid_id) VALUES (?)", (rfid,))
-        db.commit()
 
     if not sets:
+        db.commit()
         return jsonify({'message': 'RFID added successfully!', 'rfid': rfid}), 201
 
-    for set_name, products in sets.items():
-        db.execute("INSERT INTO zestawy (zestaw_name, rfid_id) VALUES (?, ?)", (set_name, rfid))
-        zestaw_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    # Wszystkie nazwy produktow ze wszystkich zestawow rozwiazujemy jednym zapytaniem
+    product_ids, _ = resolve_product_ids(db, {name for products in sets.values() for name in products})
 
-        for product_name, quantity in products.items():
-            product = db.execute("SELECT product_id FROM products WHERE name = ?", (product_name,)).fetchone()
-            if product:
-                product_id = product[0]
-                db.execute("INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)",
-                           (product_id, zestaw_id, quantity))
-
-    db.commit()
+    rows = []
+    try:
+        for set_name, products in sets.items():
+            zestaw_id = db.execute("INSERT INTO zestawy (zestaw_name, rfid_id) VALUES (?, ?)",
+                                   (set_name, rfid)).lastrowid
+            # Nieznane produkty sa pomijane, tak jak wczesniej
+            rows.extend((product_ids[name], zestaw_id, quantity)
+                        for name, quantity in products.items() if name in product_ids)
+
+        db.executemany("INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)", rows)
+        db.commit()
+    except sqlite3.IntegrityError:
+        # Karta ma juz zestaw o tej nazwie (unikalny indeks z migracji 3)
+        db.rollback()
+        return jsonify({'error': f"Zestaw '{set_name}' już istnieje."}), 409
+    sets_cache.invalidate(rfid)
     return jsonify({'message': 'RFID and sets assigned successfully!', 'rfid': rfid}), 201
 
-@app.route('/rfid/<rfid>/sets', methods=['GET'])
-def get_sets_by_rfid(rfid):
-    db = get_db()
-    
-    # Fetch all sets associated with the given RFID
-    sets = db.execute("""
-        SELECT zestawy.zestaw_name, product_zestaw.product_id, products.name AS product_name,products.price AS product_price,
-               product_zestaw.quantity
-        FROM zestawy
-        JOIN product_zestaw ON zestawy.zestaw_id = product_zestaw.zestaw_id
-        JOIN products ON product_zestaw.product_id = products.product_id
-        WHERE zestawy.rfid_id = ?
-    """, (rfid,)).fetchall()
-    
-    if not sets:
-        return jsonify({'error': 'No sets found for the given RFID'}), 404
-    
+
+def load_sets(db, rfid):
+    """Returns the card's sets as {set name: [items]} (empty dict if it has none)."""
+    sets = db.execute(queries.SETS_BY_RFID, (rfid,)).fetchall()
+
     response = {}
     for row in sets:
         set_name = row['zestaw_name']
         if set_name not in response:
             response[set_name] = []
-        
+
         response[set_name].append({
             'product_id': row['product_id'],
             'name': row['product_name'], # changed to name and price to match function "add_to_cart" function in controller.
             'price': row['product_price'],
             'quantity': row['quantity']
         })
+    return response
+
+
+@app.route('/rfid/<rfid>/sets', methods=['GET'])
+def get_sets_by_rfid(rfid):
+    # Fetch all sets associated with the given RFID (from the cache when possible)
+    sets, body = sets_cache.get_or_load(rfid, lambda: load_sets(get_db(), rfid))
+
+    if not sets:
+        return jsonify({'error': 'No sets found for the given RFID'}), 404
+
+    return app.response_class(body, mimetype='application/json'), 200
+
+
+@app.route('/stats/cache', methods=['GET'])
+def cache_stats():
+    return jsonify({'sets': sets_cache.stats(), 'catalog_version': catalog_cache.version})
+
+
+@app.route('/tap/<rfid>', methods=['POST'])
+def tap_rfid(rfid):
+    """Registers a card tap: adds the card if it is new and returns its sets, in one transaction."""
+    if not RFID_PATTERN.fullmatch(rfid):
+        return jsonify({'error': 'Invalid RFID'}), 400
+    db = get_db()
+    try:
+        db.execute('BEGIN IMMEDIATE')
+        is_new = db.execute("INSERT OR IGNORE INTO rfid (rfid_id) VALUES (?)", (rfid,)).rowcount == 1
+        sets, _ = sets_cache.get_or_load(rfid, lambda: load_sets(db, rfid))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
+
+    message = "Karta wczytana pomyślnie" if is_new else "RFID już istnieje"
+    return jsonify({'rfid': rfid, 'new': is_new, 'message': message, 'sets': sets}), 200
 
-    return jsonify(response), 200
 
 @app.route('/delete_set',methods=["POST"])
 def delete_set_by_name_and_rfid():
@@ -134,11 +319,7 @@ def delete_set_by_name_and_rfid():
         cursor = db.cursor()
 
         # Wyszukanie zestawu na podstawie nazwy i RFID
-        cursor.execute("""
-                SELECT z.zestaw_id FROM zestawy z
-                JOIN rfid r ON z.rfid_id = r.rfid_id
-                WHERE z.zestaw_name = ? AND r.rfid_id = ?
-            """, (set_name, rfid))
+        cursor.execute(queries.SET_BY_NAME_AND_RFID_JOIN, (set_name, rfid))
         row = cursor.fetchone()
 
         if not row:
@@ -150,9 +331,7 @@ def delete_set_by_name_and_rfid():
         db.execute('BEGIN')
 
         # Usunięcie powiązanych rekordów z tabeli product_zestaw
-        cursor.execute("""
-                DELETE FROM product_zestaw WHERE zestaw_id = ?
-            """, (zestaw_id,))
+        cursor.execute(queries.DELETE_SET_ITEMS, (zestaw_id,))
 
         # Usunięcie samego zestawu z tabeli zestawy
         cursor.execute("""
@@ -161,6 +340,7 @@ def delete_set_by_name_and_rfid():
 
         # Zatwierdzenie zmian w bazie danych
         db.commit()
+        sets_cache.invalidate(rfid)
 
         return jsonify({'success': True, 'message': 'Set deleted successfully'}), 200
 
@@ -171,9 +351,6 @@ def delete_set_by_name_and_rfid():
         db.rollback()
         return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
 
-    finally:
-        db.close()
-
 
 @app.route('/rename_set',methods=["POST"])
 def rename_set_by_name_and_rfid():
@@ -194,10 +371,7 @@ def rename_set_by_name_and_rfid():
         cursor = db.cursor()
 
         # Wyszukanie zestawu na podstawie starej nazwy i RFID
-        cursor.execute("""
-                SELECT zestaw_id FROM zestawy
-                WHERE zestaw_name = ? AND rfid_id = ?
-            """, (set_name_old, rfid))
+        cursor.execute(queries.SET_BY_NAME_AND_RFID, (set_name_old, rfid))
         row = cursor.fetchone()
 
         if not row:
@@ -214,18 +388,21 @@ def rename_set_by_name_and_rfid():
 
         # Zatwierdzenie zmian w bazie danych
         db.commit()
+        sets_cache.invalidate(rfid)
 
         return jsonify({'success': True, 'message': 'Set renamed successfully'}), 200
 
 
 
+    except sqlite3.IntegrityError:
+        db.rollback()
+        return jsonify({'error': f"Zestaw '{set_name_new}' już istnieje."}), 409
+
     except Exception as e:
         # Obsługa innych nieprzewidzianych błędów
         db.rollback()
         return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
 
-    finally:
-        db.close()
 
 @app.route('/add_set', methods=["POST"])
 def add_set_by_name_cart_and_rfid():
@@ -241,11 +418,16 @@ def add_set_by_name_cart_and_rfid():
     print(cart)
 
     try:
-        connection = get_db()
-        cursor = connection.cursor()
+        cursor = db.cursor()
+
+        # Rozwiąż wszystkie produkty jednym zapytaniem, zanim cokolwiek zapiszemy
+        product_ids, missing = resolve_product_ids(cursor, cart)
+        if missing:
+            db.rollback()
+            return jsonify({'error': f"Produkt '{missing[0]}' nie istnieje."}), 400
 
         # Sprawdź, czy RFID istnieje w tabeli rfid, jeśli nie, dodaj
-        cursor.execute("SELECT rfid_id FROM rfid WHERE rfid_id = ?", (rfid,))
+        cursor.execute(queries.RFID_BY_ID, (rfid,))
         if not cursor.fetchone():
             cursor.execute("INSERT INTO rfid (rfid_id) VALUES (?)", (rfid,))
 
@@ -256,32 +438,21 @@ def add_set_by_name_cart_and_rfid():
         zestaw_id = cursor.lastrowid
 
         # Dodaj produkty do zestawu
-        for product_name,quantity_price_dict in cart.items():
-
-            quantity = quantity_price_dict['quantity']
-            cursor.execute("SELECT product_id FROM products WHERE name = ?", (product_name,))
-            row = cursor.fetchone()
-            if row:
-                product_id = row['product_id']
-                cursor.execute("""
-                        INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)
-                    """, (product_id, zestaw_id, quantity))
-            else:
-                # Jeśli produkt nie istnieje, pomiń lub zwróć błąd
-                return jsonify({'error': f"Produkt '{product_name}' nie istnieje."}), 400
-
-        connection.commit()
-        connection.close()
+        insert_set_items(cursor, zestaw_id, cart, product_ids)
+
+        db.commit()
+        sets_cache.invalidate(rfid)
         return jsonify({'success': True, 'message': f"Zestaw '{set_name}' został zapisany."}), 200
 
+    except sqlite3.IntegrityError:
+        db.rollback()
+        return jsonify({'error': f"Zestaw '{set_name}' już istnieje."}), 409
+
     except Exception as e:
         # Obsługa innych nieprzewidzianych błędów
         db.rollback()
         return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
 
-    finally:
-        db.close()
-
 
 @app.route('/overwrite_set', methods=["POST"])
 def overwrite_set_by_name_cart_and_rfid():
@@ -297,49 +468,41 @@ def overwrite_set_by_name_cart_and_rfid():
     cart = data["cart"]
 
     try:
-        connection = get_db()
-        cursor = connection.cursor()
+        cursor = db.cursor()
 
         # Znajdź zestaw do nadpisania
-        cursor.execute("""
-                SELECT zestaw_id FROM zestawy WHERE zestaw_name = ? AND rfid_id = ?
-            """, (set_name_old, rfid))
+        cursor.execute(queries.SET_BY_NAME_AND_RFID, (set_name_old, rfid))
         row = cursor.fetchone()
         if not row:
             return jsonify({'error': 'Set not found'}), 404
         zestaw_id = row['zestaw_id']
 
+        product_ids, missing = resolve_product_ids(cursor, cart)
+        if missing:
+            db.rollback()
+            return jsonify({'error': f"Produkt '{missing[0]}' nie istnieje."}), 400
+
         # Jeśli podano nową nazwę, zaktualizuj ją
         if set_name_new and set_name_new != set_name_old:
             cursor.execute("""
                     UPDATE zestawy SET zestaw_name = ? WHERE zestaw_id = ?
                 """, (set_name_new, zestaw_id))
 
-
         # Usuń istniejące produkty w zestawie
-        cursor.execute("""
-                DELETE FROM product_zestaw WHERE zestaw_id = ?
-            """, (zestaw_id,))
+        cursor.execute(queries.DELETE_SET_ITEMS, (zestaw_id,))
 
         # Dodaj nowe produkty do zestawu
-        for product_name,quantity_price_dict in cart.items():
-
-            quantity = quantity_price_dict['quantity']
-            cursor.execute("SELECT product_id FROM products WHERE name = ?", (product_name,))
-            row = cursor.fetchone()
-            if row:
-                product_id = row['product_id']
-                cursor.execute("""
-                        INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)
-                    """, (product_id, zestaw_id, quantity))
-            else:
-                return jsonify({'error': f"Produkt '{product_name}' nie istnieje."}), 400
-
-        connection.commit()
-        connection.close()
+        insert_set_items(cursor, zestaw_id, cart, product_ids)
+
+        db.commit()
+        sets_cache.invalidate(rfid)
         return jsonify({'success': True, 'message': f"Zestaw '{set_name_old}' został nadpisany."}), 200
 
 
+    except sqlite3.IntegrityError:
+        db.rollback()
+        return jsonify({'error': f"Zestaw '{set_name_new}' już istnieje."}), 409
+
     except Exception as e:
 
         # Obsługa innych nieprzewidzianych błędów
@@ -349,16 +512,128 @@ def overwrite_set_by_name_cart_and_rfid():
         return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
 
 
-    finally:
 
-        db.close()
+@app.route('/rfid/<rfid>/sets/<path:set_name>', methods=['PUT'])
+def upsert_set(rfid, set_name):
+    """Creates or replaces a card's set in one transaction and returns all of the card's sets.
+
+    Answers 201 when the set was created and 200 when it was overwritten. An
+    empty cart deletes the set (200, created false); a card left without sets
+    then has `sets: {}` here and GET /rfid/<rfid>/sets answers 404.
+    """
+    db = get_db()
+    data = request.get_json(silent=True)
+
+    if not data or not isinstance(data.get('cart'), dict):
+        return jsonify({'error': 'Missing cart in request'}), 400
+    cart = data['cart']
+
+    try:
+        db.execute('BEGIN IMMEDIATE')
+
+        product_ids, missing = resolve_product_ids(db, cart)
+        if missing:
+            db.rollback()
+            return jsonify({'error': f"Produkt '{missing[0]}' nie istnieje."}), 400
+
+        db.execute("INSERT OR IGNORE INTO rfid (rfid_id) VALUES (?)", (rfid,))
+        # (rfid_id, zestaw_name) jest unikalne, wiec istnieje co najwyzej jeden taki zestaw
+        row = db.execute(queries.SET_BY_NAME_AND_RFID, (set_name, rfid)).fetchone()
+        if row:
+            zestaw_id = row['zestaw_id']
+            db.execute(queries.DELETE_SET_ITEMS, (zestaw_id,))
+        elif cart:
+            zestaw_id = db.execute("INSERT INTO zestawy (zestaw_name, rfid_id) VALUES (?, ?)",
+                                   (set_name, rfid)).lastrowid
+
+        if cart:
+            insert_set_items(db, zestaw_id, cart, product_ids)
+        elif row:
+            # Pusty koszyk usuwa zestaw - bez pozycji i tak nie bylby widoczny, a blokowalby nazwe
+            db.execute("DELETE FROM zestawy WHERE zestaw_id = ?", (zestaw_id,))
+        sets = load_sets(db, rfid)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return jsonify({'error': 'An unexpected error occurred', 'details': str(e)}), 500
+
+    sets_cache.invalidate(rfid)
+    created = row is None and bool(cart)
+    if not cart:
+        message = f"Zestaw '{set_name}' został usunięty."
+    elif created:
+        message = f"Zestaw '{set_name}' został zapisany."
+    else:
+        message = f"Zestaw '{set_name}' został nadpisany."
+    return jsonify({'success': True, 'rfid': rfid, 'set_name': set_name, 'created': created,
+                    'message': message, 'sets': sets}), 201 if created else 200
+
+CHANGES_PAGE_SIZE = 500
+
+
+def load_change(db, entity, key):
+    """Returns the current state of one changed entity, or None if it was deleted."""
+    if entity == 'category':
+        row = db.execute("SELECT category_id, name FROM categories WHERE category_id = ?", (key,)).fetchone()
+        return dict(row) if row else None
+    if entity == 'product':
+        row = db.execute("""
+            SELECT product_id, name, price, category_id FROM products WHERE product_id = ?
+        """, (key,)).fetchone()
+        return dict(row) if row else None
+    if entity == 'card':
+        row = db.execute(queries.RFID_BY_ID, (key,)).fetchone()
+        return dict(row) if row else None
+    if entity == 'sets':
+        return load_sets(db, key)
+    return None
+
+
+@app.route('/changes', methods=['GET'])
+def changes():
+    """Change feed for kiosk replicas: every entity changed after `since`, with its current state."""
+    since = request.args.get('since', 0, type=int)
+    limit = min(request.args.get('limit', CHANGES_PAGE_SIZE, type=int), CHANGES_PAGE_SIZE)
+    db = get_db()
 
+    rows = db.execute(queries.CHANGES_SINCE, (since, limit + 1)).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
 
+    result = [{
+        'seq': row['seq'],
+        'entity': row['entity'],
+        'key': row['entity_key'],
+        'data': load_change(db, row['entity'], row['entity_key'])
+    } for row in rows]
+    last_seq = rows[-1]['seq'] if rows else since
+    return jsonify({'changes': result, 'last_seq': last_seq, 'more': more})
 
 
+@app.route('/export', methods=['GET'])
+def export_data():
+    """Streams categories, products, cards and sets as NDJSON."""
+    return Response(stream_with_context(export_ndjson(get_db())), mimetype='application/x-ndjson')
+
+
+@app.route('/import', methods=['POST'])
+def import_data():
+    """Imports an NDJSON body in chunked transactions."""
+    try:
+        counts = import_ndjson(get_db(), request.stream)
+    except ValueError as e:
+        return jsonify({'error': 'Invalid import data', 'details': str(e)}), 400
+    except sqlite3.IntegrityError as e:
+        return jsonify({'error': 'Import conflicts with existing data', 'details': str(e)}), 409
+    finally:
+        # Czesc danych mogla zostac zapisana nawet przy bledzie
+        catalog_cache.bump()
+        sets_cache.clear()
+
+    return jsonify({'success': True, 'imported': counts}), 200
 
 
 if __name__ == '__main__':
-    db = get_db()
-    seed_database(db)
+    with db_manager.connection() as connection:
+        seed_database(connection)
     app.run(debug=True, host="127.0.0.1")
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""ASGI serving mode for the restaurant API.
+
+The Flask routes from app.py are exposed through an async ASGI application.
+Each request is handled by an async handler that offloads the route (and with
+it all SQLite work) to a bounded thread pool; the response body is sent chunk
+by chunk as the route produces it, so streamed responses (/export) are never
+held in memory whole. Reads and writes use separate
+pools, so a slow writer can never take all the workers that catalog reads need;
+the connection pool is sized for both pools together, so writers waiting on the
+SQLite write lock can't take the connections readers need either.
+
+Run with:  python asgi.py [--host 127.0.0.1] [--port 8000]
+(requires uvicorn: pip install uvicorn)
+"""
+import argparse
+import asyncio
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app
+from init_database import db_manager
+
+READ_WORKERS = 8
+WRITE_WORKERS = 2  # SQLite i tak ma jednego pisarza naraz
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+STREAM_BUFFER = 16  # fragmenty odpowiedzi czekajace na wyslanie do klienta
+
+
+class AsgiApp:
+    """Minimal ASGI adapter that runs a WSGI app on bounded read/write executors."""
+
+    def __init__(self, wsgi_app, read_workers=READ_WORKERS, write_workers=WRITE_WORKERS, pool=db_manager):
+        self.wsgi_app = wsgi_app
+        self.pool = pool
+        # Kazdy watek trzyma najwyzej jedno polaczenie naraz
+        pool.reserve(read_workers + write_workers)
+        self.read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='db-read')
+        self.write_executor = ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix='db-write')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self.handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.handle_lifespan(receive, send)
+
+    async def handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def shutdown(self):
+        self.read_executor.shutdown(wait=True)
+        self.write_executor.shutdown(wait=True)
+        self.pool.close_all()
+
+    async def handle_http(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        executor = self.read_executor if scope['method'] in READ_METHODS else self.write_executor
+        loop = asyncio.get_running_loop()
+        # Ograniczony bufor: watek WSGI czeka, gdy klient odbiera wolniej niz trasa generuje dane
+        messages = asyncio.Queue(maxsize=STREAM_BUFFER)
+        cancelled = threading.Event()
+
+        def emit(message):
+            if cancelled.is_set():
+                raise ConnectionAbortedError("Klient przerwał odbieranie odpowiedzi")
+            asyncio.run_coroutine_threadsafe(messages.put(message), loop).result()
+
+        task = loop.run_in_executor(executor, self.call_wsgi, build_environ(scope, bytes(body)), emit)
+        try:
+            while True:
+                message = await messages.get()
+                if message is None:
+                    break
+                await send(message)
+        except BaseException:
+            cancelled.set()
+            # Zwolnij watek, ktory moze czekac na miejsce w kolejce, i poczekaj az skonczy
+            while not task.done():
+                while not messages.empty():
+                    messages.get_nowait()
+                await asyncio.wait([task], timeout=0.01)
+            if not task.cancelled():
+                task.exception()  # juz obsluzony - nie chcemy ostrzezenia o nieodebranym wyjatku
+            raise
+        await task
+
+    def call_wsgi(self, environ, emit):
+        """Runs the WSGI app on an executor thread and emits ASGI messages chunk by chunk.
+
+        `emit(message)` hands one message to the event loop; None marks the end.
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+
+        try:
+            result = self.wsgi_app(environ, start_response)
+            try:
+                started = False
+                for chunk in result:
+                    if not chunk:
+                        continue
+                    if not started:
+                        emit({'type': 'http.response.start', 'status': response['status'],
+                              'headers': response['headers']})
+                        started = True
+                    emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                if not started:
+                    emit({'type': 'http.response.start', 'status': response['status'],
+                          'headers': response['headers']})
+                emit({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            try:
+                emit(None)
+            except ConnectionAbortedError:
+                pass
+
+
+def build_environ(scope, body):
+    """Translates an ASGI http scope into a WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+app = AsgiApp(flask_app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the restaurant API in ASGI mode.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("Tryb ASGI wymaga uvicorn: pip install uvicorn")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
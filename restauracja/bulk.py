@@ -0,0 +1,175 @@
+"""Streaming NDJSON export/import of categories, products, rfid cards and sets.
+
+Every line is one JSON object with a "type" field:
+    {"type": "category", "category_id": 1, "name": "Burgers"}
+    {"type": "product", "product_id": 101, "name": "Classic Burger", "price": 9.99, "category_id": 1}
+    {"type": "rfid", "rfid_id": "167405560536"}
+    {"type": "set", "rfid_id": "167405560536", "zestaw_name": "Set 1",
+     "items": [{"product_id": 101, "quantity": 2}]}
+
+CLI:
+    python bulk.py export menu.ndjson [--db kiosk_db.sqlite]
+    python bulk.py import menu.ndjson [--db kiosk_db.sqlite] [--chunk-size 5000]
+A running server keeps its caches until restarted; use POST /import to load data into a live server.
+"""
+import argparse
+import json
+import sys
+
+import queries
+
+CHUNK_SIZE = 5000
+
+
+def export_records(db):
+    """Yields every record as a dict; rows are streamed from cursors so memory stays flat."""
+    for row in db.execute("SELECT category_id, name FROM categories ORDER BY category_id"):
+        yield {'type': 'category', 'category_id': row[0], 'name': row[1]}
+
+    for row in db.execute("SELECT product_id, name, price, category_id FROM products ORDER BY product_id"):
+        yield {'type': 'product', 'product_id': row[0], 'name': row[1], 'price': row[2], 'category_id': row[3]}
+
+    for row in db.execute("SELECT rfid_id FROM rfid ORDER BY rfid_id"):
+        yield {'type': 'rfid', 'rfid_id': row[0]}
+
+    # Pozycje sa posortowane po zestawie, wiec w pamieci trzymamy tylko jeden zestaw naraz
+    current = None
+    for row in db.execute("""
+        SELECT z.zestaw_id, z.zestaw_name, z.rfid_id, pz.product_id, pz.quantity
+        FROM zestawy z
+        LEFT JOIN product_zestaw pz ON pz.zestaw_id = z.zestaw_id
+        ORDER BY z.zestaw_id, pz.id
+    """):
+        if current is None or current['zestaw_id'] != row[0]:
+            if current is not None:
+                del current['zestaw_id']
+                yield current
+            current = {'type': 'set', 'zestaw_id': row[0], 'zestaw_name': row[1], 'rfid_id': row[2], 'items': []}
+        if row[3] is not None:
+            current['items'].append({'product_id': row[3], 'quantity': row[4]})
+    if current is not None:
+        del current['zestaw_id']
+        yield current
+
+
+def export_ndjson(db):
+    """Yields the export as NDJSON lines."""
+    for record in export_records(db):
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class BulkImporter:
+    """Buffers parsed records and writes them in chunks, one transaction per chunk.
+
+    Records are upserted, so importing an export again leaves the database unchanged:
+    categories and products by id, sets by (rfid_id, zestaw_name) with their items replaced.
+    """
+
+    def __init__(self, db, chunk_size=CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.counts = {'category': 0, 'product': 0, 'rfid': 0, 'set': 0}
+        self._reset()
+
+    def _reset(self):
+        self.categories = []
+        self.products = []
+        self.rfids = []
+        self.sets = {}  # (rfid, nazwa zestawu) -> pozycje; w obrebie partii wygrywa ostatni rekord
+        self.pending = 0
+
+    def add(self, record):
+        kind = record.get('type')
+        if kind == 'category':
+            self.categories.append((record['category_id'], record['name']))
+        elif kind == 'product':
+            self.products.append((record['product_id'], record['name'], record['price'], record['category_id']))
+        elif kind == 'rfid':
+            self.rfids.append((str(record['rfid_id']),))
+        elif kind == 'set':
+            self.rfids.append((str(record['rfid_id']),))
+            self.sets[(str(record['rfid_id']), record['zestaw_name'])] = record.get('items', [])
+        else:
+            raise ValueError(f"Nieznany typ rekordu: {kind!r}")
+        self.counts[kind] += 1
+        self.pending += 1
+        if self.pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        db = self.db
+        try:
+            db.execute('BEGIN')
+            db.executemany("INSERT OR REPLACE INTO categories (category_id, name) VALUES (?, ?)", self.categories)
+            db.executemany("""
+                INSERT OR REPLACE INTO products (product_id, name, price, category_id) VALUES (?, ?, ?, ?)
+            """, self.products)
+            db.executemany("INSERT OR IGNORE INTO rfid (rfid_id) VALUES (?)", self.rfids)
+            items = []
+            for (rfid, set_name), set_items in self.sets.items():
+                # Zestaw o tej nazwie moze juz istniec (ponowny import) - wtedy podmieniamy jego pozycje
+                db.execute("""
+                    INSERT INTO zestawy (zestaw_name, rfid_id) VALUES (?, ?)
+                    ON CONFLICT (rfid_id, zestaw_name) DO NOTHING
+                """, (set_name, rfid))
+                zestaw_id = db.execute(queries.SET_BY_NAME_AND_RFID, (set_name, rfid)).fetchone()[0]
+                db.execute(queries.DELETE_SET_ITEMS, (zestaw_id,))
+                items.extend((item['product_id'], zestaw_id, item.get('quantity', 1)) for item in set_items)
+            db.executemany("INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)", items)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        self._reset()
+
+
+def import_ndjson(db, lines, chunk_size=CHUNK_SIZE):
+    """Imports NDJSON lines (str or bytes) and returns counts per record type.
+
+    Raises ValueError naming the offending line; chunks committed before it stay imported.
+    """
+    importer = BulkImporter(db, chunk_size)
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            importer.add(json.loads(line))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Linia {line_number}: {e}") from e
+    importer.flush()
+    return importer.counts
+
+
+def main():
+    from init_database import init_db, open_connection, DB_NAME
+
+    parser = argparse.ArgumentParser(description="NDJSON export/import of the kiosk database.")
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('path', help="NDJSON file, '-' for stdout/stdin")
+    parser.add_argument('--db', default=DB_NAME)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    init_db(args.db)
+    db = open_connection(args.db)
+    try:
+        if args.command == 'export':
+            out = sys.stdout if args.path == '-' else open(args.path, 'w', encoding='utf-8')
+            with out:
+                out.writelines(export_ndjson(db))
+        else:
+            source = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+            with source:
+                counts = import_ndjson(db, source, args.chunk_size)
+            print(f"Zaimportowano: {counts}", file=sys.stderr)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
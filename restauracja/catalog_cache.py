@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+import threading
+
+
+class CatalogCache:
+    """In-process cache of serialized catalog responses, keyed by a catalog version.
+
+    Every write to categories or products must call bump(); that invalidates all
+    cached bodies and changes the ETag clients revalidate against.
+    """
+
+    def __init__(self):
+        # Losowy prefiks, zeby ETagi sprzed restartu serwera nie pasowaly do nowych danych
+        self._boot_id = os.urandom(4).hex()
+        self._version = 1
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def etag_for(self, encoding):
+        """Strong ETag of the current version in the given content coding.
+
+        Each coding is a different representation, so it gets its own ETag.
+        """
+        etag = f"{self._boot_id}-{self._version}"
+        return f"{etag}-gz" if encoding == "gzip" else etag
+
+    def bump(self):
+        """Marks the catalog as changed."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def get(self, key, build, encoding="identity"):
+        """Returns (etag, serialized body) for key, calling build() only on a miss.
+
+        With encoding="gzip" the body is the gzip-compressed JSON, also cached.
+        """
+        with self._lock:
+            version, etag = self._version, self.etag_for(encoding)
+            bodies = self._entries.get(key)
+        if bodies is None:
+            bodies = {"identity": json.dumps(build()).encode("utf-8")}
+        if encoding not in bodies:
+            bodies = dict(bodies)
+            bodies[encoding] = gzip.compress(bodies["identity"], compresslevel=6)
+
+        with self._lock:
+            # Nie zapisuj wyniku, jesli katalog zmienil sie w trakcie budowania
+            if self._version == version:
+                self._entries[key] = bodies
+        return etag, bodies[encoding]
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,66 @@
+"""Idempotency keys for write requests.
+
+A client that may send the same write twice (a kiosk replaying its outbox
+after a request timed out) sends an Idempotency-Key header. The first request
+with a key runs normally and its response is stored; a repeat gets the stored
+response without running the route again. Keys expire after KEY_TTL. A key
+whose request never finished (the process died before teardown) can be
+claimed again once CLAIM_LEASE has passed.
+"""
+import time
+
+import queries
+
+HEADER = "Idempotency-Key"
+KEY_TTL = 7 * 24 * 3600  # s, kiosk moze byc offline przez kilka dni
+MAX_KEY_LENGTH = 128
+CLAIM_LEASE = 60  # s, dluzej zadne zapytanie nie trzyma klucza
+
+
+def claim(db, key, request_line, now=None):
+    """Reserves the key for this request.
+
+    Returns None if the key is new (or its earlier claim lapsed), otherwise its
+    stored row (request, status, body, content_type); status is NULL while the
+    first request is still running. The claim is identified by `now`, which
+    store/release take as claimed_at.
+    """
+    now = time.time() if now is None else now
+    db.execute(queries.DELETE_EXPIRED_IDEMPOTENCY_KEYS, (now - KEY_TTL,))
+    claimed = db.execute("""
+        INSERT OR IGNORE INTO idempotency_keys (idempotency_key, request, created_at, claimed_at)
+        VALUES (?, ?, ?, ?)
+    """, (key, request_line, now, now)).rowcount == 1
+    if not claimed:
+        # Porzucone zajecie (np. restart w trakcie zapytania) przejmuje ponowienie
+        claimed = db.execute(queries.RECLAIM_IDEMPOTENCY_KEY,
+                             (now, key, request_line, now - CLAIM_LEASE)).rowcount == 1
+    row = None
+    if not claimed:
+        row = db.execute(queries.IDEMPOTENCY_KEY, (key,)).fetchone()
+    db.commit()
+    return row
+
+
+def store(db, key, claimed_at, status, body, content_type):
+    """Saves the response of the request that claimed the key."""
+    if db.in_transaction:
+        # Niezatwierdzone resztki trasy i tak zostalyby wycofane przy zwrocie polaczenia
+        db.rollback()
+    db.execute("""
+        UPDATE idempotency_keys SET status = ?, body = ?, content_type = ?
+        WHERE idempotency_key = ? AND claimed_at = ?
+    """, (status, body, content_type, key, claimed_at))
+    db.commit()
+
+
+def release(db, key, claimed_at):
+    """Forgets a key whose request failed, so a retry runs the route again.
+
+    Only this request's claim is removed, not one taken over after its lease lapsed.
+    """
+    if db.in_transaction:
+        db.rollback()
+    db.execute("DELETE FROM idempotency_keys WHERE idempotency_key = ? AND status IS NULL AND claimed_at = ?",
+               (key, claimed_at))
+    db.commit()
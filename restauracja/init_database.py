@@ -1,14 +1,110 @@
+import contextlib
+import queue
 import sqlite3
+import threading
+
+from migrations import run_migrations
 
 DB_NAME = "kiosk_db.sqlite"
+POOL_SIZE = 8  # najwiecej otwartych polaczen naraz
+
+# Pragmy ustawiane na kazdym nowym polaczeniu
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -8000,          # ~8 MB cache stron
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,         # ms
+    "temp_store": "MEMORY",
+}
 
-def get_db():
-    connection = sqlite3.connect(DB_NAME)
+
+def open_connection(db_name=DB_NAME):
+    """Opens a new connection with the kiosk pragmas applied."""
+    # check_same_thread=False - polaczenie z puli trafia do roznych watkow (po jednym naraz)
+    connection = sqlite3.connect(db_name, timeout=PRAGMAS["busy_timeout"] / 1000, check_same_thread=False)
     connection.row_factory = sqlite3.Row
+    for pragma, value in PRAGMAS.items():
+        connection.execute(f"PRAGMA {pragma} = {value}")
     return connection
 
-def init_db():
-    connection = sqlite3.connect(DB_NAME)
+
+class ConnectionManager:
+    """Bounded pool of open connections; a request checks one out and returns it when it ends.
+
+    At most `size` connections are ever open. When all of them are checked
+    out, connect() waits up to `timeout` seconds for one to come back.
+    """
+
+    def __init__(self, db_name=DB_NAME, size=POOL_SIZE, timeout=PRAGMAS["busy_timeout"] / 1000):
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()  # ostatnio oddane polaczenie ma najcieplejszy cache
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connect(self):
+        """Checks a connection out of the pool, opening a new one while the pool is below its size."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                connection = open_connection(self.db_name)
+                self._connections.append(connection)
+                return connection
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Brak wolnego połączenia z bazą po {self.timeout} s") from None
+
+    def reserve(self, count):
+        """Grows the pool so `count` threads can each hold a connection at the same time."""
+        with self._lock:
+            self.size = max(self.size, count)
+
+    def release(self, connection):
+        """Returns the connection to the pool, rolling back anything left uncommitted."""
+        with self._lock:
+            if connection not in self._connections:
+                # Polaczenie sprzed close_all - juz zamkniete
+                return
+        if connection.in_transaction:
+            connection.rollback()
+        self._idle.put(connection)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Checks a connection out for a with-block and returns it on exit, also on an exception."""
+        connection = self.connect()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def open_count(self):
+        with self._lock:
+            return len(self._connections)
+
+    def close_all(self):
+        """Closes every pooled connection (used on shutdown)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._idle = queue.LifoQueue()
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.ProgrammingError:
+                pass
+
+
+db_manager = ConnectionManager()
+
+
+def init_db(db_name=DB_NAME):
+    connection = open_connection(db_name)
     cursor = connection.cursor()
 
     cursor.execute("""
@@ -50,4 +146,5 @@ def init_db():
         )
     """)
     connection.commit()
+    run_migrations(connection)
     connection.close()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Load test comparing serving modes of the restaurant API.
+
+Start the servers first, e.g.:
+    python app.py                 # Flask, port 5000
+    python asgi.py --port 8000    # ASGI
+then:
+    python loadtest.py http://127.0.0.1:5000 http://127.0.0.1:8000 --duration 10 --concurrency 32
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from seeder import rfid_list
+
+CATEGORIES = ["Burgers", "Sides", "Beverages", "Wraps", "Salads", "Desserts"]
+
+
+def pick_request(base_url, rng, write_ratio):
+    """Returns (method, url, body) for one request of the kiosk-like workload."""
+    rfid = rng.choice(rfid_list)
+    if rng.random() < write_ratio:
+        return 'POST', f"{base_url}/tap/{rfid}", b''
+    choice = rng.random()
+    if choice < 0.3:
+        return 'GET', f"{base_url}/categories", None
+    if choice < 0.6:
+        return 'GET', f"{base_url}/products?category={rng.choice(CATEGORIES)}", None
+    if choice < 0.7:
+        return 'GET', f"{base_url}/kiosk/bootstrap", None
+    return 'GET', f"{base_url}/rfid/{rfid}/sets", None
+
+
+def run_worker(base_url, deadline, write_ratio, seed, latencies, errors, lock):
+    rng = random.Random(seed)
+    local_latencies = []
+    local_errors = 0
+    while time.perf_counter() < deadline:
+        method, url, body = pick_request(base_url, rng, write_ratio)
+        request = urllib.request.Request(url, data=body, method=method)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            # 404 dla karty bez zestawow to poprawna odpowiedz
+            if e.code >= 500:
+                local_errors += 1
+        except OSError:
+            local_errors += 1
+        local_latencies.append(time.perf_counter() - started)
+    with lock:
+        latencies.extend(local_latencies)
+        errors[0] += local_errors
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(base_url, duration, concurrency, write_ratio):
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.perf_counter() + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_worker, base_url, deadline, write_ratio, worker, latencies, errors, lock)
+                   for worker in range(concurrency)]
+    # Wyjatek w watku roboczym przerywa test - inaczej wyniki wygladalyby na poprawne
+    for future in futures:
+        future.result()
+    latencies.sort()
+    return {
+        'url': base_url,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare requests/sec and p99 between serving modes.")
+    parser.add_argument('urls', nargs='+', help="base URLs of running servers, e.g. http://127.0.0.1:5000")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds per server")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--write-ratio', type=float, default=0.1, help="fraction of requests that are card taps")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    results = [run_load(url.rstrip('/'), args.duration, args.concurrency, args.write_ratio) for url in args.urls]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'url':<32}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(f"{result['url']:<32}{result['requests']:>10}{result['errors']:>8}"
+              f"{result['rps']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
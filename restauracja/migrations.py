@@ -0,0 +1,179 @@
+import sqlite3
+import sys
+
+import queries
+
+# Wypelnia change_log obecnymi danymi (po migracji 2 i po seeder.seed_scale, ktory pomija triggery)
+CHANGE_LOG_BACKFILL = [
+    "INSERT OR IGNORE INTO change_log (entity, entity_key) SELECT 'category', category_id FROM categories",
+    "INSERT OR IGNORE INTO change_log (entity, entity_key) SELECT 'product', product_id FROM products",
+    "INSERT OR IGNORE INTO change_log (entity, entity_key) SELECT 'card', rfid_id FROM rfid",
+    "INSERT OR IGNORE INTO change_log (entity, entity_key) SELECT DISTINCT 'sets', rfid_id FROM zestawy",
+]
+
+# Kolejne wersje schematu. Numer wersji trzymamy w PRAGMA user_version,
+# wiec istniejace pliki kiosk_db.sqlite aktualizuja sie na miejscu.
+MIGRATIONS = [
+    (1, "hot-path indexes for sets and product lookups", [
+        # WHERE zestawy.rfid_id = ? oraz WHERE zestaw_name = ? AND rfid_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_zestawy_rfid_name ON zestawy (rfid_id, zestaw_name)",
+        # JOIN product_zestaw ON zestaw_id, pokrywa product_id i quantity
+        "CREATE INDEX IF NOT EXISTS idx_product_zestaw_zestaw ON product_zestaw (zestaw_id, product_id, quantity)",
+        # SELECT product_id FROM products WHERE name = ?
+        "CREATE INDEX IF NOT EXISTS idx_products_name ON products (name)",
+        # /products?category=<name>
+        "CREATE INDEX IF NOT EXISTS idx_categories_name ON categories (name)",
+        "CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_id, name, price)",
+        "ANALYZE",
+    ]),
+    (2, "change log feeding /changes", [
+        # Jeden wiersz na encje; kazda zmiana nadaje mu nowy seq (REPLACE),
+        # wiec tabela ma rozmiar danych, a nie historii zmian.
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq           INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity        TEXT NOT NULL,
+            entity_key    NOT NULL,
+            UNIQUE (entity, entity_key)
+        )
+        """,
+        *[f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{suffix} AFTER {event} ON {table}
+        BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_key) VALUES ('{entity}', {row}.{key});
+        END
+        """ for table, entity, key in (("categories", "category", "category_id"),
+                                       ("products", "product", "product_id"),
+                                       ("rfid", "card", "rfid_id"),
+                                       ("zestawy", "sets", "rfid_id"))
+            for suffix, event, row in (("ai", "INSERT", "NEW"), ("au", "UPDATE", "NEW"), ("ad", "DELETE", "OLD"))],
+        # Zmiana wlasciciela zestawu zmienia tez zestawy poprzedniej karty
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_zestawy_au_old AFTER UPDATE OF rfid_id ON zestawy
+        BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_key) VALUES ('sets', OLD.rfid_id);
+        END
+        """,
+        *[f"""
+        CREATE TRIGGER IF NOT EXISTS trg_product_zestaw_{suffix} AFTER {event} ON product_zestaw
+        BEGIN
+            INSERT OR REPLACE INTO change_log (entity, entity_key)
+            SELECT 'sets', rfid_id FROM zestawy WHERE zestaw_id = {row}.zestaw_id;
+        END
+        """ for suffix, event, row in (("ai", "INSERT", "NEW"), ("au", "UPDATE", "NEW"), ("ad", "DELETE", "OLD"))],
+        # Dane sprzed migracji trafiaja do logu jako pierwsze zmiany
+        *CHANGE_LOG_BACKFILL,
+    ]),
+    (3, "unique set names per card", [
+        # Duplikaty (rfid_id, zestaw_name): zostaje najnowszy zestaw, starsze usuwamy razem z pozycjami
+        """
+        DELETE FROM product_zestaw WHERE zestaw_id IN (
+            SELECT z.zestaw_id FROM zestawy z
+            WHERE EXISTS (SELECT 1 FROM zestawy n
+                          WHERE n.rfid_id = z.rfid_id AND n.zestaw_name = z.zestaw_name
+                            AND n.zestaw_id > z.zestaw_id)
+        )
+        """,
+        """
+        DELETE FROM zestawy WHERE EXISTS (
+            SELECT 1 FROM zestawy n
+            WHERE n.rfid_id = zestawy.rfid_id AND n.zestaw_name = zestawy.zestaw_name
+              AND n.zestaw_id > zestawy.zestaw_id
+        )
+        """,
+        # Unikalny indeks zastepuje zwykly indeks z migracji 1
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_zestawy_rfid_name ON zestawy (rfid_id, zestaw_name)",
+        "DROP INDEX IF EXISTS idx_zestawy_rfid_name",
+    ]),
+    (4, "idempotency keys for replayed writes", [
+        # status NULL = pierwsze zapytanie z tym kluczem jeszcze trwa
+        """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            idempotency_key   TEXT PRIMARY KEY,
+            request           TEXT NOT NULL,
+            status            INTEGER,
+            body              BLOB,
+            content_type      TEXT,
+            created_at        REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created ON idempotency_keys (created_at)",
+    ]),
+    (5, "lease on in-progress idempotency keys", [
+        # Zajecie klucza wygasa po CLAIM_LEASE - proces mogl paść w trakcie zapytania
+        "ALTER TABLE idempotency_keys ADD COLUMN claimed_at REAL",
+        "UPDATE idempotency_keys SET claimed_at = created_at",
+    ]),
+]
+
+# Zapytania z tras, ktore nie moga robic pelnego skanu tabeli (te same stale, ktorych uzywaja trasy).
+ROUTE_QUERIES = {
+    "products by category": queries.PRODUCTS_BY_CATEGORY,
+    "rfid lookup": queries.RFID_BY_ID,
+    "sets by rfid": queries.SETS_BY_RFID,
+    "set by name and rfid": queries.SET_BY_NAME_AND_RFID,
+    "set by name and rfid (join)": queries.SET_BY_NAME_AND_RFID_JOIN,
+    "products by names": queries.PRODUCTS_BY_NAMES,
+    "set items delete": queries.DELETE_SET_ITEMS,
+    "changes since": queries.CHANGES_SINCE,
+    "rfids by ids": queries.RFIDS_BY_IDS,
+    "sets by rfids": queries.SETS_BY_RFIDS,
+    "idempotency key": queries.IDEMPOTENCY_KEY,
+    "expired idempotency keys": queries.DELETE_EXPIRED_IDEMPOTENCY_KEYS,
+    "idempotency key reclaim": queries.RECLAIM_IDEMPOTENCY_KEY,
+}
+
+
+def get_schema_version(connection):
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(connection):
+    """Applies every pending migration, each one in its own transaction."""
+    current = get_schema_version(connection)
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            connection.execute("BEGIN")
+            for statement in statements:
+                connection.execute(statement)
+            connection.execute(f"PRAGMA user_version = {version}")
+            connection.commit()
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+        print(f"Migracja {version}: {description}")
+        current = version
+    return current
+
+
+def find_table_scans(connection, queries=ROUTE_QUERIES):
+    """Returns {query name: [plan lines]} for every route query whose plan contains a full SCAN."""
+    scans = {}
+    for name, sql in queries.items():
+        params = (None,) * sql.count("?")
+        plan = connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        details = [row[3] for row in plan]
+        # SCAN po json_each przechodzi tylko po parametrach, nie po tabeli
+        if any(detail.startswith("SCAN") and "VIRTUAL TABLE" not in detail for detail in details):
+            scans[name] = details
+    return scans
+
+
+def check_query_plans(connection):
+    """Raises AssertionError if any route query would scan a whole table."""
+    scans = find_table_scans(connection)
+    if scans:
+        raise AssertionError(f"Zapytania ze skanem tabeli: {scans}")
+
+
+if __name__ == "__main__":
+    from init_database import init_db, open_connection, DB_NAME
+
+    db_name = sys.argv[1] if len(sys.argv) > 1 else DB_NAME
+    init_db(db_name)
+    connection = open_connection(db_name)
+    print(f"Wersja schematu: {get_schema_version(connection)}")
+    check_query_plans(connection)
+    print("Zadne zapytanie tras nie skanuje tabeli.")
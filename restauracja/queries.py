@@ -0,0 +1,53 @@
+"""SQL of the hot route queries, shared by the routes and the query-plan check.
+
+migrations.ROUTE_QUERIES checks these exact strings with EXPLAIN QUERY PLAN,
+so a change to a route query is checked as soon as it is made here.
+"""
+
+# app.py
+PRODUCTS_BY_CATEGORY = """
+    SELECT product_id, p.name, price, p.category_id
+    FROM products p
+    JOIN categories c ON p.category_id = c.category_id
+    WHERE c.name = ?
+"""
+RFID_BY_ID = "SELECT rfid_id FROM rfid WHERE rfid_id = ?"
+SETS_BY_RFID = """
+    SELECT zestawy.zestaw_name, product_zestaw.product_id, products.name AS product_name,
+           products.price AS product_price, product_zestaw.quantity
+    FROM zestawy
+    JOIN product_zestaw ON zestawy.zestaw_id = product_zestaw.zestaw_id
+    JOIN products ON product_zestaw.product_id = products.product_id
+    WHERE zestawy.rfid_id = ?
+"""
+SET_BY_NAME_AND_RFID = "SELECT zestaw_id FROM zestawy WHERE zestaw_name = ? AND rfid_id = ?"
+SET_BY_NAME_AND_RFID_JOIN = """
+    SELECT z.zestaw_id FROM zestawy z
+    JOIN rfid r ON z.rfid_id = r.rfid_id
+    WHERE z.zestaw_name = ? AND r.rfid_id = ?
+"""
+PRODUCTS_BY_NAMES = """
+    SELECT name, product_id FROM products
+    WHERE name IN (SELECT value FROM json_each(?))
+"""
+DELETE_SET_ITEMS = "DELETE FROM product_zestaw WHERE zestaw_id = ?"
+CHANGES_SINCE = "SELECT seq, entity, entity_key FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?"
+
+# tap_gateway.py: wszystkie karty partii odczytow naraz
+RFIDS_BY_IDS = "SELECT rfid.rfid_id FROM json_each(?) AS cards CROSS JOIN rfid ON rfid.rfid_id = cards.value"
+SETS_BY_RFIDS = """
+    SELECT zestawy.rfid_id, zestawy.zestaw_name, product_zestaw.product_id, products.name AS product_name,
+           products.price AS product_price, product_zestaw.quantity
+    FROM json_each(?) AS cards
+    CROSS JOIN zestawy ON zestawy.rfid_id = cards.value
+    JOIN product_zestaw ON zestawy.zestaw_id = product_zestaw.zestaw_id
+    JOIN products ON product_zestaw.product_id = products.product_id
+"""
+
+# idempotency.py
+IDEMPOTENCY_KEY = "SELECT request, status, body, content_type FROM idempotency_keys WHERE idempotency_key = ?"
+DELETE_EXPIRED_IDEMPOTENCY_KEYS = "DELETE FROM idempotency_keys WHERE created_at < ?"
+RECLAIM_IDEMPOTENCY_KEY = """
+    UPDATE idempotency_keys SET claimed_at = ?
+    WHERE idempotency_key = ? AND request = ? AND status IS NULL AND claimed_at < ?
+"""
@@ -1,4 +1,9 @@
+import argparse
+import os
 import random
+import time
+
+from migrations import CHANGE_LOG_BACKFILL
 
 # Data for seeding
 categories = [
@@ -145,4 +150,144 @@ def seed_database(db):
     sets = seed_sets(products)
     rfid_mappings = generate_sets_to_rfid(sets)
     seed_mappings(db, rfid_mappings)
-    print("Database seeded successfully!")
\ No newline at end of file
+    print("Database seeded successfully!")
+
+
+# Scale mode: duze, deterministyczne dane do testow obciazeniowych
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert_chunked(db, sql, rows, chunk_size):
+    """Inserts rows with executemany, `chunk_size` rows at a time (in the caller's transaction)."""
+    count = 0
+    for chunk in _chunks(rows, chunk_size):
+        db.executemany(sql, chunk)
+        count += len(chunk)
+    return count
+
+
+def _drop_change_log_triggers(db):
+    """Drops the change_log triggers and returns their SQL, so they can be created again."""
+    triggers = db.execute("""
+        SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND sql LIKE '%change_log%'
+    """).fetchall()
+    for name, _ in triggers:
+        db.execute(f"DROP TRIGGER {name}")
+    return [sql for _, sql in triggers]
+
+
+def seed_scale(db, num_cards=1_000_000, num_sets=5_000_000, num_products=10_000, num_categories=20,
+               min_products=2, max_products=5, seed=42, chunk_size=50_000):
+    """Seeds an empty database with a production-sized, reproducible dataset.
+
+    Sets get explicit ids, so sets and their items are written with executemany
+    without last_insert_rowid() lookups. The same seed always gives the same data.
+    Everything is written in one transaction with the change_log triggers
+    dropped (each row would otherwise log itself); change_log is rebuilt at the
+    end, as if the data had been there before migration 2.
+    """
+    if num_cards < 1 or num_products < 1 or num_categories < 1:
+        raise ValueError("Potrzebna jest co najmniej jedna karta, jeden produkt i jedna kategoria")
+    rng = random.Random(seed)
+    db.execute("PRAGMA synchronous = OFF")
+    db.execute("BEGIN")
+    try:
+        counts = _seed_scale_rows(db, rng, num_cards, num_sets, num_products, num_categories,
+                                  min_products, max_products, chunk_size)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.execute("PRAGMA synchronous = NORMAL")
+    db.execute("ANALYZE")
+    return counts
+
+
+def _seed_scale_rows(db, rng, num_cards, num_sets, num_products, num_categories, min_products, max_products,
+                     chunk_size):
+    triggers = _drop_change_log_triggers(db)
+
+    category_names = [category["name"] for category in categories]
+    category_rows = [(i, category_names[i - 1] if i <= len(category_names) else f"Category {i}")
+                     for i in range(1, num_categories + 1)]
+    _insert_chunked(db, "INSERT INTO categories (category_id, name) VALUES (?, ?)", category_rows, chunk_size)
+
+    product_rows = ((product_id, f"Product {product_id}", round(rng.uniform(4.99, 19.99), 2),
+                     rng.randint(1, num_categories))
+                    for product_id in range(1, num_products + 1))
+    _insert_chunked(db, "INSERT INTO products (product_id, name, price, category_id) VALUES (?, ?, ?, ?)",
+                    product_rows, chunk_size)
+
+    rfid_ids = [str(100_000_000_000 + i) for i in range(num_cards)]
+    _insert_chunked(db, "INSERT INTO rfid (rfid_id) VALUES (?)", ((rfid,) for rfid in rfid_ids), chunk_size)
+
+    items_count = 0
+    set_rows = []
+    item_rows = []
+    for zestaw_id in range(1, num_sets + 1):
+        set_rows.append((zestaw_id, f"Set {zestaw_id}", rfid_ids[rng.randrange(num_cards)]))
+        # Przy malym katalogu zestaw nie moze miec wiecej roznych produktow niz istnieje
+        size = min(rng.randint(min_products, max_products), num_products)
+        for product_id in rng.sample(range(1, num_products + 1), size):
+            item_rows.append((product_id, zestaw_id, rng.randint(1, 3)))
+        if len(set_rows) >= chunk_size or zestaw_id == num_sets:
+            db.executemany("INSERT INTO zestawy (zestaw_id, zestaw_name, rfid_id) VALUES (?, ?, ?)", set_rows)
+            db.executemany("INSERT INTO product_zestaw (product_id, zestaw_id, quantity) VALUES (?, ?, ?)",
+                           item_rows)
+            items_count += len(item_rows)
+            set_rows, item_rows = [], []
+
+    for statement in CHANGE_LOG_BACKFILL:
+        db.execute(statement)
+    for sql in triggers:
+        db.execute(sql)
+    db.commit()
+    return {"categories": num_categories, "products": num_products, "cards": num_cards,
+            "sets": num_sets, "set_items": items_count}
+
+
+def build_snapshot(path, **options):
+    """Creates a fresh database file at path, seeds it in scale mode and checkpoints the WAL
+    so the single .sqlite file can be copied and reused."""
+    from init_database import init_db, open_connection
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    init_db(path)
+    db = open_connection(path)
+    try:
+        counts = seed_scale(db, **options)
+        db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        db.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a large, deterministic DB snapshot for load tests.")
+    parser.add_argument("out", help="snapshot file to create (overwritten)")
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--sets", type=int, default=5_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = build_snapshot(args.out, num_cards=args.cards, num_sets=args.sets, num_products=args.products,
+                            num_categories=args.categories, seed=args.seed, chunk_size=args.chunk_size)
+    print(f"Snapshot {args.out}: {counts} w {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class SetsCache:
+    """Bounded LRU cache of a card's sets, with a TTL and hit/miss counters.
+
+    Values are kept both as the sets dict and as the serialized JSON body,
+    so /rfid/<rfid>/sets can answer a hit without touching SQLite.
+    Every route that changes a card's sets must call invalidate(rfid).
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # rfid -> (expires_at, sets, body)
+        # rfid -> [trwajace odczyty, uniewaznienia w ich trakcie]; tylko karty z odczytem w toku
+        self._loads = {}
+        self._epoch = 0  # zwiekszany przez clear()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, rfid, load):
+        """Returns (sets, body) for the card, calling load() only on a miss or expired entry."""
+        rfid = str(rfid)
+        with self._lock:
+            entry = self._entries.get(rfid)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(rfid)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            load_state = self._loads.setdefault(rfid, [0, 0])
+            load_state[0] += 1
+            generation = (self._epoch, load_state[1])
+
+        try:
+            sets = load()
+            body = json.dumps(sets)
+        except Exception:
+            with self._lock:
+                self._finish_load(rfid)
+            raise
+        with self._lock:
+            # Jesli w trakcie odczytu ktos zmienil zestawy karty, nie zapisujemy starego wyniku
+            if (self._epoch, self._loads[rfid][1]) == generation:
+                self._entries[rfid] = (time.monotonic() + self.ttl, sets, body)
+                self._entries.move_to_end(rfid)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            self._finish_load(rfid)
+        return sets, body
+
+    def _finish_load(self, rfid):
+        load_state = self._loads[rfid]
+        load_state[0] -= 1
+        if load_state[0] == 0:
+            del self._loads[rfid]
+
+    def invalidate(self, rfid):
+        """Drops the cached sets of one card."""
+        rfid = str(rfid)
+        with self._lock:
+            self._entries.pop(rfid, None)
+            load_state = self._loads.get(rfid)
+            if load_state is not None:
+                load_state[1] += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'loading': len(self._loads),
+            }
@@ -0,0 +1,251 @@
+"""Tap gateway: resolves card taps against the database and pushes the session to the kiosk.
+
+    reader -> rfid/<reader_id>/read -> gateway (SQLite) -> kiosk/<kiosk_id>/session -> kiosk
+
+The kiosk gets the same payload /tap would return (card registered, sets
+included) without any HTTP round trip. Taps arriving together are resolved
+in one transaction with one query for all their cards. If the database stays
+unavailable (e.g. locked) after a few retries, every tap of the batch gets an
+error session ({"v", "tap", "rfid", "error"}) and the kiosk calls /tap itself.
+
+Run with:  python tap_gateway.py [--broker 127.0.0.1] [--route reader-1=kiosk-1 ...]
+(requires paho-mqtt: pip install paho-mqtt)
+"""
+import argparse
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from init_database import init_db, open_connection, DB_NAME
+import queries
+
+TAP_TOPIC = "rfid/+/read"
+SESSION_TOPIC = "kiosk/{kiosk_id}/session"
+TAP_VERSION = 1
+BATCH_SIZE = 64
+BATCH_WINDOW = 0.01  # s, ile czekamy na kolejne odczyty do tej samej partii
+DEFAULT_ROUTES = {"reader-1": "kiosk-1"}  # czytnik -> kiosk
+BATCH_RETRIES = 3
+RETRY_DELAY = 0.1  # s, podwajane przy kazdej kolejnej probie
+
+
+def parse_tap(payload):
+    """Parses a v1 tap message from sender.py. Raises ValueError if it is invalid."""
+    try:
+        message = json.loads(payload)
+        if message["v"] != TAP_VERSION:
+            raise ValueError(f"Nieobsługiwana wersja wiadomości: {message['v']}")
+        tap = {"r": str(message["r"]), "b": str(message["b"]), "s": int(message["s"]),
+               "t": message["t"], "u": str(message["u"])}
+        if "w" in message:
+            tap["w"] = message["w"]  # kiosk odrzuca po nim przeterminowane odczyty
+        return tap
+    except (KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Niepoprawna wiadomość odczytu: {e}") from e
+
+
+def register_cards(db, rfids):
+    """Adds unknown cards and loads the sets of all of them, in one transaction.
+
+    Returns (set of newly added rfids, {rfid: {set name: [items]}}).
+    """
+    rfids_json = json.dumps(sorted(set(rfids)))
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        known = {row["rfid_id"] for row in db.execute(queries.RFIDS_BY_IDS, (rfids_json,))}
+        new = set(rfids) - known
+        db.executemany("INSERT OR IGNORE INTO rfid (rfid_id) VALUES (?)", [(rfid,) for rfid in new])
+
+        sets = {rfid: {} for rfid in rfids}
+        rows = db.execute(queries.SETS_BY_RFIDS, (rfids_json,))
+        # Ten sam ksztalt co load_sets w app.py
+        for row in rows:
+            sets[row["rfid_id"]].setdefault(row["zestaw_name"], []).append({
+                'product_id': row['product_id'],
+                'name': row['product_name'],
+                'price': row['product_price'],
+                'quantity': row['quantity']
+            })
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return new, sets
+
+
+class TapGateway:
+    """Collects taps from the MQTT thread and resolves them in batches on its own worker thread.
+
+    `publish(topic, payload)` sends a session to a kiosk. Taps from readers
+    without a route, and repeated sequence numbers (QoS 1 redelivery), are
+    dropped before they reach the database.
+    """
+
+    def __init__(self, db, publish, routes=None, batch_size=BATCH_SIZE, batch_window=BATCH_WINDOW,
+                 retries=BATCH_RETRIES, retry_delay=RETRY_DELAY):
+        self.db = db
+        self.publish = publish
+        self.routes = dict(routes if routes is not None else DEFAULT_ROUTES)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.counters = {"taps": 0, "dropped": 0, "batches": 0, "published": 0, "retries": 0, "failed": 0,
+                         "errors": 0}
+        self._queue = queue.Queue()
+        self._last_seq = {}  # (reader, boot) -> najwyzszy numer
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def submit(self, payload):
+        """Queues a raw tap message; called from the MQTT network thread, never blocks on the database."""
+        try:
+            tap = parse_tap(payload)
+        except ValueError as e:
+            print(e)
+            return False
+        key = (tap["r"], tap["b"])
+        with self._lock:
+            self.counters["taps"] += 1
+            if tap["r"] not in self.routes or tap["s"] <= self._last_seq.get(key, 0):
+                self.counters["dropped"] += 1
+                return False
+            self._last_seq[key] = tap["s"]
+        self._queue.put(tap)
+        return True
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _register(self, rfids):
+        """register_cards with retries for transient database errors (e.g. 'database is locked')."""
+        for attempt in range(self.retries + 1):
+            try:
+                return register_cards(self.db, rfids)
+            except sqlite3.OperationalError:
+                if attempt == self.retries or self._stop.is_set():
+                    raise
+                with self._lock:
+                    self.counters["retries"] += 1
+                self._stop.wait(self.retry_delay * 2 ** attempt)
+
+    def process_batch(self, batch):
+        """Resolves all taps of a batch with one transaction and publishes one session per tap.
+
+        If the batch cannot be resolved, each tap gets an error session instead,
+        so no tap is lost silently.
+        """
+        try:
+            new, sets = self._register([tap["u"] for tap in batch])
+        except Exception as e:
+            print(f"Nie udało się obsłużyć partii odczytów, kiosk wywoła /tap: {e}")
+            for tap in batch:
+                session = {"v": TAP_VERSION, "tap": tap, "rfid": tap["u"], "error": str(e)}
+                self.publish(SESSION_TOPIC.format(kiosk_id=self.routes[tap["r"]]), json.dumps(session))
+            with self._lock:
+                self.counters["failed"] += len(batch)
+            return
+        for tap in batch:
+            rfid = tap["u"]
+            is_new = rfid in new
+            message = "Karta wczytana pomyślnie" if is_new else "RFID już istnieje"
+            # Ten sam ksztalt co odpowiedz /tap, plus oryginalny odczyt do filtrowania w kiosku
+            session = {"v": TAP_VERSION, "tap": tap, "rfid": rfid, "new": is_new, "message": message,
+                       "sets": sets[rfid]}
+            self.publish(SESSION_TOPIC.format(kiosk_id=self.routes[tap["r"]]), json.dumps(session))
+            new.discard(rfid)  # kolejny odczyt tej samej karty w partii nie jest juz nowy
+        with self._lock:
+            self.counters["batches"] += 1
+            self.counters["published"] += len(batch)
+
+    def run(self):
+        """Worker loop; blocks until stop()."""
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.process_batch(batch)
+            except Exception as e:
+                with self._lock:
+                    self.counters["errors"] += 1
+                print(f"Błąd obsługi partii odczytów: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, queued=self._queue.qsize())
+
+
+def parse_routes(values):
+    routes = {}
+    for value in values:
+        reader_id, sep, kiosk_id = value.partition("=")
+        if not sep or not reader_id or not kiosk_id:
+            raise ValueError(f"Niepoprawna trasa '{value}', oczekiwano czytnik=kiosk")
+        routes[reader_id] = kiosk_id
+    return routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve card taps and push sessions to kiosks over MQTT.")
+    parser.add_argument('--broker', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1883)
+    parser.add_argument('--db', default=DB_NAME)
+    parser.add_argument('--route', action='append', default=[], help="reader_id=kiosk_id (repeatable)")
+    args = parser.parse_args()
+
+    try:
+        import paho.mqtt.client as mqtt
+    except ImportError:
+        sys.exit("Bramka wymaga paho-mqtt: pip install paho-mqtt")
+
+    try:
+        routes = parse_routes(args.route) if args.route else DEFAULT_ROUTES
+    except ValueError as e:
+        parser.error(str(e))
+    init_db(args.db)
+    client = mqtt.Client()
+    gateway = TapGateway(open_connection(args.db), lambda topic, payload: client.publish(topic, payload, qos=1),
+                         routes)
+
+    def on_connect(client, userdata, flags, rc):
+        if rc == 0:
+            client.subscribe(TAP_TOPIC, qos=1)
+            print(f"Bramka połączona, trasy: {routes}")
+        else:
+            print(f"Błąd połączenia z brokerem: kod {rc}")
+
+    client.on_connect = on_connect
+    client.on_message = lambda client, userdata, msg: gateway.submit(msg.payload.decode("utf-8", "replace"))
+    client.reconnect_delay_set(min_delay=1, max_delay=30)
+    client.connect_async(args.broker, args.port, 60)
+    client.loop_start()
+    try:
+        gateway.run()
+    except KeyboardInterrupt:
+        print(f"Statystyki bramki: {gateway.stats()}")
+    finally:
+        client.loop_stop()
+
+
+if __name__ == '__main__':
+    main()
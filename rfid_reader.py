@@ -0,0 +1,190 @@
+"""RFID reader interface and the polling scheduler used by sender.py.
+
+A reader is anything with read() -> uid (int) or None. RFID wraps a real
+MFRC522; FakeMFRC522 imitates its API on a plain Linux box (scripted taps,
+simulated SPI cost), so bench_reader.py can measure CPU use and detection
+latency without the hardware.
+"""
+import threading
+import time
+
+FAST_INTERVAL = 0.02   # s, odpytywanie tuz po wykryciu karty
+IDLE_INTERVAL = 0.25   # s, najdluzsza przerwa, gdy nikt nie przyklada karty
+FAST_WINDOW = 2.0      # s, jak dlugo po ostatnim wykryciu odpytujemy szybko
+BACKOFF = 1.5          # mnoznik przerwy w stanie bezczynnosci
+IRQ_REARM_INTERVAL = 0.02  # s, co ile wysylamy nowe REQA w trybie IRQ
+
+
+class RFID():
+
+    def __init__(self,reader):
+        self.reader= reader
+        self._irq = None
+
+    def read(self):
+        (status, TagType) = self.reader.MFRC522_Request(self.reader.PICC_REQIDL)
+        if status == self.reader.MI_OK:
+            (status, uid) = self.reader.MFRC522_Anticoll()
+            if status == self.reader.MI_OK:
+                 return self.uid_to_int(uid)
+        return None
+
+
+    def uid_to_int(self,uid:list):
+        return int("".join(f"{x:02X}" for x in uid),16)
+
+    def enable_irq(self, pin):
+        """Routes the MFRC522 receive interrupt to a GPIO pin (IRQ mode)."""
+        import RPi.GPIO as GPIO
+
+        self._irq = threading.Event()
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        GPIO.add_event_detect(pin, GPIO.FALLING, callback=lambda channel: self._irq.set())
+        # IRqInv (aktywny stan niski) + RxIEn: przerwanie po odebraniu odpowiedzi karty
+        self.reader.Write_MFRC522(self.reader.CommIEnReg, 0xA0)
+
+    def _arm_request(self):
+        reader = self.reader
+        reader.Write_MFRC522(reader.CommIrqReg, 0x7F)  # wyczysc flagi przerwan
+        reader.Write_MFRC522(reader.FIFOLevelReg, 0x80)  # wyczysc FIFO
+        reader.Write_MFRC522(reader.FIFODataReg, reader.PICC_REQIDL)
+        reader.Write_MFRC522(reader.CommandReg, reader.PCD_TRANSCEIVE)
+        reader.Write_MFRC522(reader.BitFramingReg, 0x87)  # start nadawania, 7 bitow
+
+    def wait_for_irq(self, timeout, rearm_interval=IRQ_REARM_INTERVAL):
+        """Sleeps until a card answers or the timeout passes. Returns True on IRQ.
+
+        A REQA only reaches cards that are in the field when it is sent, so it
+        is sent again every `rearm_interval` (a few register writes, no reads).
+        """
+        self._irq.clear()
+        deadline = time.monotonic() + timeout
+        while True:
+            self._arm_request()
+            remaining = deadline - time.monotonic()
+            if self._irq.wait(max(0.0, min(rearm_interval, remaining))):
+                return True
+            if remaining <= rearm_interval:
+                return False
+
+    @property
+    def supports_irq(self):
+        return self._irq is not None
+
+
+class FakeMFRC522:
+    """Stand-in for mfrc522.MFRC522 that presents cards according to a script.
+
+    `taps` is a list of (start, duration, uid bytes) relative to start().
+    Every request costs `spi_cost` seconds of busy work, like a real SPI
+    transaction, so the CPU cost of polling shows up in measurements.
+    """
+
+    MI_OK = 0
+    MI_NOTAGERR = 1
+    PICC_REQIDL = 0x26
+
+    def __init__(self, taps=(), spi_cost=0.0005):
+        self.taps = sorted(taps)
+        self.spi_cost = spi_cost
+        self.requests = 0
+        self.started = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def card_present(self):
+        now = time.perf_counter() - self.started
+        for start, duration, uid in self.taps:
+            if start <= now < start + duration:
+                return uid
+            if start > now:
+                break
+        return None
+
+    def _spi(self):
+        self.requests += 1
+        deadline = time.perf_counter() + self.spi_cost
+        while time.perf_counter() < deadline:
+            pass
+
+    def MFRC522_Request(self, mode):
+        self._spi()
+        return (self.MI_OK, 0x10) if self.card_present() else (self.MI_NOTAGERR, None)
+
+    def MFRC522_Anticoll(self):
+        self._spi()
+        uid = self.card_present()
+        return (self.MI_OK, list(uid)) if uid else (self.MI_NOTAGERR, [])
+
+
+class FakeIrqReader(RFID):
+    """RFID over FakeMFRC522 with a simulated IRQ line that fires when a card is in the field."""
+
+    def __init__(self, reader, irq_check=0.005):
+        super().__init__(reader)
+        self._irq = threading.Event()
+        self.irq_check = irq_check
+
+    def wait_for_irq(self, timeout):
+        # Linia IRQ sprawdzana "sprzetowo" - watek spi w Event.wait, bez transakcji SPI
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if self.reader.card_present():
+                return True
+            self._irq.wait(self.irq_check)
+        return False
+
+
+class PollingScheduler:
+    """Calls on_tag(uid) for every successful read, polling as rarely as it can afford.
+
+    Right after a detection the reader is polled every `fast_interval` for
+    `fast_window` seconds (a card held on the reader keeps the window open).
+    When idle the interval grows by `backoff` up to `idle_interval`. In IRQ
+    mode (reader.supports_irq) the idle phase sleeps until the reader raises
+    its interrupt instead of polling.
+    """
+
+    def __init__(self, reader, on_tag, fast_interval=FAST_INTERVAL, idle_interval=IDLE_INTERVAL,
+                 fast_window=FAST_WINDOW, backoff=BACKOFF, use_irq=False, clock=time.monotonic):
+        self.reader = reader
+        self.on_tag = on_tag
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.fast_window = fast_window
+        self.backoff = backoff
+        self.use_irq = use_irq and getattr(reader, "supports_irq", False)
+        self.clock = clock
+        self.polls = 0
+        self._stop = threading.Event()
+
+    def next_interval(self, interval, since_last_tag):
+        """Returns how long to wait before the next poll."""
+        if since_last_tag < self.fast_window:
+            return self.fast_interval
+        return min(max(interval, self.fast_interval) * self.backoff, self.idle_interval)
+
+    def run(self):
+        """Polls until stop() is called; blocks the calling thread."""
+        last_tag = float("-inf")
+        interval = self.fast_interval
+        while not self._stop.is_set():
+            uid = self.reader.read()
+            self.polls += 1
+            now = self.clock()
+            if uid is not None:
+                last_tag = now
+                self.on_tag(uid)
+
+            interval = self.next_interval(interval, now - last_tag)
+            if self.use_irq and now - last_tag >= self.fast_window:
+                # Bezczynnosc: czekamy na przerwanie zamiast odpytywac
+                while not self._stop.is_set() and not self.reader.wait_for_irq(self.idle_interval):
+                    pass
+                interval = self.fast_interval
+            else:
+                self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
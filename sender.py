@@ -6,29 +6,18 @@ from config import *
 from mfrc522 import MFRC522
 import paho.mqtt.client as mqtt
 import json
+from rfid_reader import RFID, PollingScheduler
+from tap_publisher import Debouncer, DiskOutbox, TapPublisher
+from tap_message import TapEncoder
 client = mqtt.Client()
 
 MQTT_BROKER = "127.0.0.1"
 MQTT_PORT = 1883
-MQTT_TOPIC = "rfid/read"
+READER_ID = "reader-1"  # kiosk subskrybuje rfid/<READER_ID>/read swoich czytnikow
 TIME_INTERVAL = 0.5
-class RFID():
+OUTBOX_PATH = "tap_outbox.jsonl"  # odczyty niepotwierdzone przez broker przetrwaja restart
+IRQ_PIN = None  # numer pinu (tryb GPIO z config) podlaczonego do IRQ czytnika; None = samo odpytywanie
 
-    def __init__(self,reader):
-        self.reader= reader
-    
-    def read(self):
-        (status, TagType) = self.reader.MFRC522_Request(self.reader.PICC_REQIDL)
-        if status == self.reader.MI_OK:
-            (status, uid) = self.reader.MFRC522_Anticoll()
-            if status == self.reader.MI_OK:
-                 return self.uid_to_int(uid)
-        return None    
-                
-
-    def uid_to_int(self,uid:list):
-        return int("".join(f"{x:02X}" for x in uid),16)
-    
 
 def beep_and_blink():
     GPIO.output(buzzerPin,GPIO.LOW)
@@ -42,37 +31,38 @@ def main():
     
     reader = MFRC522()
     rfid = RFID(reader)
+    if IRQ_PIN is not None:
+        rfid.enable_irq(IRQ_PIN)
+
+    debouncer = Debouncer(TIME_INTERVAL)
+    encoder = TapEncoder(READER_ID)
+    publisher = TapPublisher(client, encoder.topic, DiskOutbox(OUTBOX_PATH))
+    publisher.attach()
+
+    def on_tag(rfid_read):
+        if debouncer.accept(rfid_read):
+            publisher.publish_tap(encoder.encode(rfid_read))
+            print(f"Odczyt {rfid_read} przekazany do publikacji")
+
+            beep_and_blink()
+
+    # Szybkie odpytywanie tylko tuz po wykryciu karty, potem coraz rzadziej (lub IRQ)
+    scheduler = PollingScheduler(rfid, on_tag, use_irq=IRQ_PIN is not None)
 
-    
     try:
-        client.connect(MQTT_BROKER,MQTT_PORT,60)
+        # connect_async: brak brokera przy starcie nie zatrzymuje czytnika, paho laczy sie ponownie sam
+        client.reconnect_delay_set(min_delay=1, max_delay=30)
+        client.connect_async(MQTT_BROKER,MQTT_PORT,60)
         client.loop_start()
-        previous_read_timestamp = time.time()
-        previous_rfid = None
-        while True:
-            rfid_read = rfid.read()
-            
-            current_rfid = rfid_read
-            current_timestamp = time.time()
-            if rfid_read:
-                if current_timestamp - previous_read_timestamp> TIME_INTERVAL or current_rfid != previous_rfid:
-                    message = f"{rfid_read}"
-
-                    client.publish(MQTT_TOPIC,message)
-                    print(f"Opublikowano {message}")
-
-                    beep_and_blink()
-                    #print(f"previous: {previous_rfid}, current: {current_rfid}")
-            
-                previous_read_timestamp= time.time()
-                previous_rfid = current_rfid
-            
+        scheduler.run()
 
     except KeyboardInterrupt:
         print("zatrzymano program")
 
     finally:
         client.loop_stop()
+        publisher.close()
+        print(f"Statystyki publikacji: {publisher.stats()}")
         GPIO.cleanup()
 
 
@@ -0,0 +1,47 @@
+"""Versioned tap message published by sender.py to rfid/<reader_id>/read.
+
+Compact JSON, e.g. {"v":1,"r":"reader-1","b":"5f2c9a1e","s":42,"t":123456,"w":1760000000000,"u":"..."}:
+    v  format version
+    r  reader id
+    b  boot id - random per sender start, so sequence numbers may restart
+    s  sequence number, increasing within one boot
+    t  monotonic timestamp of the read in ms (only comparable within one boot)
+    w  wall-clock time of the read in ms since the epoch; receivers use it to drop
+       stale taps (e.g. replayed from the outbox after an outage)
+    u  card UID as a string
+"""
+import itertools
+import json
+import os
+import threading
+import time
+
+VERSION = 1
+TOPIC_TEMPLATE = "rfid/{reader_id}/read"
+
+
+def topic_for(reader_id):
+    return TOPIC_TEMPLATE.format(reader_id=reader_id)
+
+
+class TapEncoder:
+    """Stamps taps of one reader with the boot id, a sequence number and the read time."""
+
+    def __init__(self, reader_id, clock=time.monotonic, wall_clock=time.time):
+        self.reader_id = reader_id
+        self.boot_id = os.urandom(4).hex()
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def topic(self):
+        return topic_for(self.reader_id)
+
+    def encode(self, uid):
+        with self._lock:
+            sequence = next(self._sequence)
+        return json.dumps({"v": VERSION, "r": self.reader_id, "b": self.boot_id, "s": sequence,
+                           "t": int(self.clock() * 1000), "w": int(self.wall_clock() * 1000), "u": str(uid)},
+                          separators=(",", ":"))
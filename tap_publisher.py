@@ -0,0 +1,276 @@
+"""Reliable publishing of card taps from sender.py.
+
+Pipeline: Debouncer -> TapPublisher (in-memory queue + DiskOutbox) -> MQTT QoS 1.
+A tap leaves the outbox only after the broker acknowledged it (on_publish).
+While the process runs, paho resends unacknowledged QoS 1 messages on
+reconnect; the disk outbox covers taps lost with the process itself.
+"""
+import collections
+import itertools
+import json
+import os
+import threading
+import time
+
+TIME_INTERVAL = 0.5        # s, ten sam odczyt karty w tym czasie to jedno przylozenie
+QOS = 1
+MAX_QUEUE = 1000           # ile niewyslanych odczytow trzymamy; najstarsze sa odrzucane
+FLUSH_BATCH = 100          # ile odczytow wysylamy naraz po ponownym polaczeniu
+OUTBOX_PATH = "tap_outbox.jsonl"
+COMPACT_BYTES = 64 * 1024  # przepisz outbox, gdy urosnie ponad tyle
+MAX_EARLY_ACKS = 1000      # potwierdzenia czekajace na powrot publish()
+
+# Kody powrotu paho.mqtt.client.publish (bez importu paho, modul dziala tez bez niego)
+MQTT_ERR_SUCCESS = 0
+MQTT_ERR_NO_CONN = 4
+
+
+class Debouncer:
+    """Decides whether a read is a new tap.
+
+    A card held on the reader is read over and over; it counts again only
+    after TIME_INTERVAL without reads, or when a different card is read.
+    """
+
+    def __init__(self, interval=TIME_INTERVAL, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.previous_rfid = None
+        self.previous_read_timestamp = None
+
+    def accept(self, rfid):
+        now = self.clock()
+        is_new = (self.previous_read_timestamp is None
+                  or now - self.previous_read_timestamp > self.interval
+                  or rfid != self.previous_rfid)
+        self.previous_read_timestamp = now
+        self.previous_rfid = rfid
+        return is_new
+
+
+def sync_directory(path):
+    """Makes a rename in the directory durable; a no-op where directories can't be opened (Windows)."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class DiskOutbox:
+    """Append-only journal of unacknowledged taps.
+
+    Each line is {"op": "add", "id", "payload"} or {"op": "ack", "id"}.
+    load() replays the journal; the file is rewritten with only the pending
+    entries when it grows past COMPACT_BYTES. Every added tap is fsynced
+    before append() returns, so it survives a power cut. Acks are only
+    flushed: a lost ack just publishes the tap once more.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, compact_bytes=COMPACT_BYTES):
+        self.path = path
+        self.compact_bytes = compact_bytes
+        self._file = None
+
+    def load(self):
+        """Returns [(id, payload)] of entries that were never acknowledged."""
+        pending = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # urwany ostatni wiersz po zaniku zasilania
+                    if record["op"] == "add":
+                        pending[record["id"]] = record["payload"]
+                    else:
+                        pending.pop(record["id"], None)
+        self.rewrite(pending.items())
+        return list(pending.items())
+
+    def _write(self, record, sync=False):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())  # flush() zostawia dane w cache systemu
+
+    def append(self, entry_id, payload):
+        self._write({"op": "add", "id": entry_id, "payload": payload}, sync=True)
+
+    def ack(self, entry_id):
+        self._write({"op": "ack", "id": entry_id})
+
+    def needs_compaction(self):
+        return self._file is not None and self._file.tell() > self.compact_bytes
+
+    def rewrite(self, pending):
+        """Replaces the journal with just the pending entries."""
+        self.close()
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as journal:
+            for entry_id, payload in pending:
+                journal.write(json.dumps({"op": "add", "id": entry_id, "payload": payload}) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary, self.path)
+        sync_directory(os.path.dirname(os.path.abspath(self.path)))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TapPublisher:
+    """Publishes taps with QoS 1, keeping every tap until the broker has acknowledged it.
+
+    Call attach() before client.connect_async()/loop_start(); it installs the
+    paho callbacks. Each tap is handed to paho once. From then on paho owns
+    the retries: it queues QoS 1 messages while disconnected and resends
+    unacknowledged ones after a reconnect. This class only keeps the taps on
+    disk until their PUBACK, so taps lost with the process (restart, power
+    cut) are published again at the next start.
+
+    client.publish() is never called while self._lock is held: paho runs
+    on_publish under its own message lock, and on_publish takes self._lock.
+
+    Counters: published (acknowledged by the broker), queued (taps accepted),
+    dropped (oldest taps thrown away when the queue was full) and retried
+    (taps published again: restored from disk, or refused by paho earlier).
+    """
+
+    def __init__(self, client, topic, outbox=None, max_queue=MAX_QUEUE, flush_batch=FLUSH_BATCH, qos=QOS):
+        self.client = client
+        self.topic = topic
+        self.outbox = outbox
+        self.max_queue = max_queue
+        self.flush_batch = flush_batch
+        self.qos = qos
+        self.counters = {"published": 0, "queued": 0, "dropped": 0, "retried": 0}
+        self.connected = False
+        self._pending = collections.OrderedDict()  # id -> payload, w kolejnosci odczytow
+        self._unsent = collections.OrderedDict()   # id -> None; jeszcze nieprzekazane do paho
+        self._inflight = {}                         # mid -> id
+        self._early_acks = collections.OrderedDict()  # mid -> None; PUBACK szybszy niz zapis mid
+        self._lock = threading.Lock()
+
+        restored = outbox.load() if outbox is not None else []
+        for entry_id, payload in restored:
+            self._pending[entry_id] = payload
+            self._unsent[entry_id] = None
+        self._retries = set(self._unsent)  # id, ktorych nastepne wyslanie jest ponowieniem
+        self._ids = itertools.count(max((entry_id for entry_id, _ in restored), default=0) + 1)
+
+    def attach(self):
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_publish = self.on_publish
+
+    def publish_tap(self, payload):
+        """Queues a tap (in memory and on disk) and hands it to paho, which sends it now or on reconnect."""
+        with self._lock:
+            entry_id = next(self._ids)
+            if len(self._pending) >= self.max_queue:
+                dropped_id, _ = self._pending.popitem(last=False)
+                self._unsent.pop(dropped_id, None)
+                self._forget(dropped_id)
+                self.counters["dropped"] += 1
+            self._pending[entry_id] = payload
+            if self.outbox is not None:
+                self.outbox.append(entry_id, payload)
+            self.counters["queued"] += 1
+        self._send(entry_id, payload)
+        return entry_id
+
+    def _send(self, entry_id, payload):
+        """Hands one entry to paho. Must be called without self._lock. Returns False if paho refused it."""
+        info = self.client.publish(self.topic, payload, qos=self.qos)
+        with self._lock:
+            if entry_id in self._retries:
+                self._retries.discard(entry_id)
+                self.counters["retried"] += 1
+            # NO_CONN: paho i tak trzyma wiadomosc QoS 1 i wysle ja po polaczeniu
+            if info.rc not in (MQTT_ERR_SUCCESS, MQTT_ERR_NO_CONN):
+                if entry_id in self._pending:
+                    self._unsent[entry_id] = None
+                    self._retries.add(entry_id)
+                return False
+            if info.mid in self._early_acks:
+                del self._early_acks[info.mid]
+                self._complete(entry_id)
+            else:
+                self._inflight[info.mid] = entry_id
+        return True
+
+    def flush(self):
+        """Hands every entry paho has not accepted yet over to it, FLUSH_BATCH entries at a time."""
+        while True:
+            with self._lock:
+                batch = []
+                while self._unsent and len(batch) < self.flush_batch:
+                    entry_id, _ = self._unsent.popitem(last=False)
+                    if entry_id in self._pending:
+                        batch.append((entry_id, self._pending[entry_id]))
+            if not batch:
+                return
+            for index, (entry_id, payload) in enumerate(batch):
+                if not self._send(entry_id, payload):
+                    # paho nie przyjmuje wiadomosci - reszta partii czeka na nastepne on_connect
+                    with self._lock:
+                        for rest_id, _ in batch[index + 1:]:
+                            self._unsent[rest_id] = None
+                    return
+
+    def _complete(self, entry_id):
+        """Drops an acknowledged entry. Requires self._lock."""
+        if self._pending.pop(entry_id, None) is None:
+            return  # wyrzucony wczesniej z pelnej kolejki
+        self._forget(entry_id)
+        self.counters["published"] += 1
+        if self.outbox is not None and self.outbox.needs_compaction():
+            self.outbox.rewrite(self._pending.items())
+
+    def _forget(self, entry_id):
+        if self.outbox is not None:
+            self.outbox.ack(entry_id)
+
+    # Callbacki paho (watek sieciowy MQTT)
+
+    def on_connect(self, client, userdata, flags, rc):
+        if rc != 0:
+            print(f"Błąd połączenia z brokerem: kod {rc}")
+            return
+        with self._lock:
+            self.connected = True
+        # Niepotwierdzone wiadomosci z poprzedniego polaczenia ponawia samo paho
+        self.flush()
+
+    def on_disconnect(self, client, userdata, rc):
+        with self._lock:
+            self.connected = False
+
+    def on_publish(self, client, userdata, mid):
+        with self._lock:
+            entry_id = self._inflight.pop(mid, None)
+            if entry_id is None:
+                # publish() jeszcze nie wrocil z tym mid - _send dokonczy potwierdzenie
+                self._early_acks[mid] = None
+                while len(self._early_acks) > MAX_EARLY_ACKS:
+                    self._early_acks.popitem(last=False)
+                return
+            self._complete(entry_id)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, pending=len(self._pending), inflight=len(self._inflight),
+                        unsent=len(self._unsent))
+
+    def close(self):
+        if self.outbox is not None:
+            self.outbox.close()
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Moduly importuja sie nawzajem po nazwie (bez pakietow), tak jak przy uruchamianiu z ich katalogow
+for directory in (ROOT, os.path.join(ROOT, "restauracja"), os.path.join(ROOT, "kiosk")):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir(tmp_path_factory):
+    """Runs the whole session in a temp dir, so app.py creates its kiosk_db.sqlite there."""
+    path = tmp_path_factory.mktemp("work")
+    previous = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh, migrated database connection."""
+    from init_database import init_db, open_connection
+
+    db_name = str(tmp_path / "test.sqlite")
+    init_db(db_name)
+    connection = open_connection(db_name)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def flask_app(workdir):
+    from app import app
+
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def rfid():
+    return f"card-{uuid.uuid4().hex[:12]}"
+
+
+def test_first_tap_registers_the_card(client, rfid):
+    response = client.post(f'/tap/{rfid}')
+    assert response.status_code == 200
+    assert response.get_json() == {'rfid': rfid, 'new': True, 'message': "Karta wczytana pomyślnie", 'sets': {}}
+    assert client.post(f'/tap/{rfid}').get_json()['new'] is False
+
+
+def test_repeat_tap_is_served_from_the_sets_cache(client, rfid, monkeypatch):
+    import app
+
+    loads = []
+    load_sets = app.load_sets
+    monkeypatch.setattr(app, 'load_sets', lambda db, card: loads.append(card) or load_sets(db, card))
+    client.post(f'/tap/{rfid}')
+    hits = app.sets_cache.stats()['hits']
+    second = client.post(f'/tap/{rfid}')
+    assert second.status_code == 200 and second.get_json()['message'] == "RFID już istnieje"
+    assert loads == [rfid]
+    assert app.sets_cache.stats()['hits'] == hits + 1
+
+
+@pytest.mark.parametrize('bad', ['a' * 65, 'ab cd', 'karta!'])
+def test_invalid_rfid_is_rejected(client, bad):
+    import app
+
+    response = client.post(f'/tap/{bad}')
+    assert response.status_code == 400
+    with app.app.app_context():
+        assert app.get_db().execute("SELECT 1 FROM rfid WHERE rfid_id = ?", (bad,)).fetchone() is None
+
+
+@pytest.fixture
+def product(flask_app):
+    import app
+
+    with app.app.app_context():
+        db = app.get_db()
+        db.execute("INSERT OR IGNORE INTO categories (category_id, name) VALUES (9000, 'Route tests')")
+        db.execute("""
+            INSERT OR IGNORE INTO products (product_id, name, price, category_id)
+            VALUES (9001, 'Route burger', 12.5, 9000)
+        """)
+        db.commit()
+    return {'product_id': 9001, 'name': 'Route burger', 'price': 12.5}
+
+
+def test_put_set_creates_then_overwrites(client, rfid, product):
+    created = client.put(f'/rfid/{rfid}/sets/Lunch', json={'cart': {'Route burger': {'quantity': 1}}})
+    assert created.status_code == 201
+    assert created.get_json()['created'] is True
+    assert created.get_json()['sets'] == {'Lunch': [dict(product, quantity=1)]}
+
+    overwritten = client.put(f'/rfid/{rfid}/sets/Lunch', json={'cart': {'Route burger': {'quantity': 3}}})
+    assert overwritten.status_code == 200
+    assert overwritten.get_json()['created'] is False
+    assert overwritten.get_json()['sets'] == {'Lunch': [dict(product, quantity=3)]}
+    assert client.get(f'/rfid/{rfid}/sets').get_json() == overwritten.get_json()['sets']
+
+
+def test_put_set_with_empty_cart_deletes_it(client, rfid, product):
+    client.put(f'/rfid/{rfid}/sets/Lunch', json={'cart': {'Route burger': {'quantity': 1}}})
+    deleted = client.put(f'/rfid/{rfid}/sets/Lunch', json={'cart': {}})
+    assert deleted.status_code == 200
+    assert deleted.get_json()['sets'] == {} and deleted.get_json()['created'] is False
+    assert client.get(f'/rfid/{rfid}/sets').status_code == 404
+    # Nazwa jest znow wolna - kolejny zapis tworzy zestaw od nowa
+    assert client.put(f'/rfid/{rfid}/sets/Lunch', json={'cart': {'Route burger': {'quantity': 1}}}).status_code == 201
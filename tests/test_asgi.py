@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+
+def call(app, path, method='GET'):
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': b'', 'headers': []}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+@pytest.fixture
+def asgi_app(flask_app):
+    from asgi import AsgiApp
+    from init_database import db_manager
+
+    connection = db_manager.connect()
+    connection.executemany("INSERT OR IGNORE INTO rfid (rfid_id) VALUES (?)", [(f"asgi-{i}",) for i in range(5)])
+    connection.commit()
+    db_manager.release(connection)
+
+    app = AsgiApp(flask_app, read_workers=1, write_workers=1)
+    yield app
+    app.read_executor.shutdown()
+    app.write_executor.shutdown()
+
+
+def test_export_is_streamed_in_chunks(asgi_app):
+    sent = call(asgi_app, '/export')
+    assert sent[0]['type'] == 'http.response.start' and sent[0]['status'] == 200
+    bodies = sent[1:]
+    assert len(bodies) > 5
+    assert all(message['more_body'] for message in bodies[:-1])
+    assert bodies[-1]['more_body'] is False
+    assert b''.join(message['body'] for message in bodies).count(b'"type": "rfid"') >= 5
+
+
+def test_client_disconnect_releases_worker(asgi_app):
+    async def run():
+        scope = {'type': 'http', 'method': 'GET', 'path': '/export', 'query_string': b'', 'headers': []}
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                raise OSError("disconnected")
+
+        with pytest.raises(OSError):
+            await asgi_app(scope, receive, send)
+
+    asyncio.run(run())
+    # Watek roboczy wrocil do puli - kolejne zapytanie przechodzi
+    assert call(asgi_app, '/categories')[0]['status'] == 200
+
+
+def test_writers_waiting_for_the_lock_leave_connections_for_readers(flask_app, monkeypatch):
+    import app as app_module
+    from asgi import AsgiApp
+    from init_database import ConnectionManager, open_connection
+
+    pool = ConnectionManager(size=2, timeout=0.5)
+    monkeypatch.setattr(app_module, 'db_manager', pool)
+    asgi_app = AsgiApp(flask_app, read_workers=1, write_workers=2, pool=pool)
+    holder = open_connection()
+    holder.execute("BEGIN IMMEDIATE")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        writers = [loop.run_in_executor(None, call, asgi_app, f'/tap/asgi-lock-{i}', 'POST') for i in range(2)]
+        while pool.open_count() < 2:
+            await asyncio.sleep(0.01)  # oba zapisy czekaja na blokade zapisu z polaczeniem z puli
+        bootstrap = await loop.run_in_executor(None, call, asgi_app, '/kiosk/bootstrap')
+        holder.commit()
+        return bootstrap, await asyncio.gather(*writers)
+
+    try:
+        bootstrap, writes = asyncio.run(run())
+    finally:
+        holder.close()
+        asgi_app.shutdown()
+    assert bootstrap[0]['status'] == 200
+    assert [sent[0]['status'] for sent in writes] == [200, 200]
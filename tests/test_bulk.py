@@ -0,0 +1,47 @@
+import json
+
+from bulk import export_ndjson, import_ndjson
+
+RECORDS = [
+    {"type": "category", "category_id": 1, "name": "Burgers"},
+    {"type": "product", "product_id": 101, "name": "Classic Burger", "price": 9.99, "category_id": 1},
+    {"type": "product", "product_id": 102, "name": "Fries", "price": 3.5, "category_id": 1},
+    {"type": "rfid", "rfid_id": "111"},
+    {"type": "set", "rfid_id": "111", "zestaw_name": "Lunch",
+     "items": [{"product_id": 101, "quantity": 2}, {"product_id": 102, "quantity": 1}]},
+]
+
+
+def ndjson(records):
+    return [json.dumps(record) + "\n" for record in records]
+
+
+def test_reimport_of_export_is_idempotent(db):
+    import_ndjson(db, ndjson(RECORDS))
+    exported = list(export_ndjson(db))
+    import_ndjson(db, exported)
+    assert list(export_ndjson(db)) == exported
+    assert db.execute("SELECT COUNT(*) FROM zestawy").fetchone()[0] == 1
+    assert db.execute("SELECT COUNT(*) FROM product_zestaw").fetchone()[0] == 2
+
+
+def test_import_replaces_items_of_existing_set(db):
+    import_ndjson(db, ndjson(RECORDS))
+    changed = dict(RECORDS[-1], items=[{"product_id": 102, "quantity": 5}])
+    import_ndjson(db, ndjson([changed]))
+    rows = db.execute("SELECT product_id, quantity FROM product_zestaw").fetchall()
+    assert [tuple(row) for row in rows] == [(102, 5)]
+
+
+def test_same_set_twice_in_one_chunk_keeps_last(db):
+    import_ndjson(db, ndjson(RECORDS[:4] + [RECORDS[-1], dict(RECORDS[-1], items=[{"product_id": 101}])]))
+    rows = db.execute("SELECT product_id, quantity FROM product_zestaw").fetchall()
+    assert [tuple(row) for row in rows] == [(101, 1)]
+
+
+def test_export_import_round_trip_over_http(client):
+    client.post('/import', data="".join(ndjson(RECORDS)))
+    exported = client.get('/export').get_data()
+    response = client.post('/import', data=exported)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.get_json()['imported']['set'] >= 1
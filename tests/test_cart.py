@@ -0,0 +1,47 @@
+from cart import Cart, to_minor
+
+FRIES = {"product_id": 1, "name": "Fries", "price": 5.44}
+COLA = {"product_id": 2, "name": "Cola", "price": 4.99}
+
+
+def make_cart():
+    cart = Cart()
+    events = []
+    cart.subscribe(lambda event, index, line: events.append((event, index, line and line.name)))
+    return cart, events
+
+
+def test_prices_are_kept_in_minor_units():
+    assert to_minor(5.44) == 544
+    assert to_minor(0.1 + 0.2) == 30
+    cart, _ = make_cart()
+    cart.add(FRIES, 3)
+    assert cart.total_minor == 1632 and cart.total == 16.32
+    assert cart.to_payload() == {"Fries": {"quantity": 3, "price": 5.44}}
+
+
+def test_add_remove_and_clear_keep_the_total():
+    cart, events = make_cart()
+    cart.add(FRIES)
+    cart.add(COLA, 2)
+    cart.add(FRIES, 2)
+    assert cart.total_minor == 3 * 544 + 2 * 499
+    assert events == [("added", 0, "Fries"), ("added", 1, "Cola"), ("updated", 0, "Fries")]
+
+    cart.remove(1, 1)
+    assert cart.total_minor == 2 * 544 + 2 * 499 and events[-1] == ("updated", 0, "Fries")
+    cart.remove(1)
+    assert cart.total_minor == 2 * 499 and events[-1] == ("removed", 0, "Fries")
+    cart.add(COLA)
+    assert events[-1] == ("updated", 0, "Cola")  # Cola przesunela sie na pierwszy wiersz
+
+    cart.clear()
+    assert cart.total_minor == 0 and len(cart) == 0
+    assert events[-1] == ("cleared", None, None)
+
+
+def test_lines_without_id_are_keyed_by_name():
+    cart, _ = make_cart()
+    cart.add({"name": "Offline burger", "price": 9.99})
+    cart.add({"name": "Offline burger", "price": 9.99})
+    assert [(line.key, line.quantity) for line in cart] == [("Offline burger", 2)]
@@ -0,0 +1,16 @@
+def test_gzip_and_identity_have_distinct_etags(client):
+    identity = client.get('/categories', headers={'Accept-Encoding': 'identity'})
+    gzipped = client.get('/categories', headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert identity.headers['ETag'] != gzipped.headers['ETag']
+
+
+def test_revalidation_matches_only_own_encoding(client):
+    gzipped = client.get('/categories', headers={'Accept-Encoding': 'gzip'})
+    etag = gzipped.headers['ETag']
+
+    assert client.get('/categories', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+    # ETag wersji gzip nie moze potwierdzic wersji bez kompresji
+    response = client.get('/categories', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
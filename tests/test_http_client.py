@@ -0,0 +1,40 @@
+import requests
+from requests.adapters import BaseAdapter
+
+from http_client import ApiSession
+
+
+class DownAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request.method, kwargs.get("timeout")))
+        raise requests.ConnectionError("connection refused")
+
+    def close(self):
+        pass
+
+
+def test_network_error_returns_none_and_records_latency():
+    api = ApiSession()
+    adapter = DownAdapter()
+    api.session.mount("http://", adapter)
+    assert api.get("http://backend/categories") is None
+    assert adapter.sent == [("GET", api.timeout)]
+    method, path, status, seconds = api.latencies[-1]
+    assert (method, path, status) == ("GET", "/categories", None) and seconds >= 0
+    assert api.latency_summary()["GET /categories"]["count"] == 1
+    api.close()
+
+
+def test_retries_cover_only_gateway_errors_of_idempotent_methods():
+    api = ApiSession()
+    retry = api.session.get_adapter("http://backend").max_retries
+    assert set(retry.status_forcelist) == {502, 503, 504}
+    assert retry.is_retry("GET", 503) and retry.is_retry("PUT", 502)
+    assert not retry.is_retry("GET", 500)
+    # POST (np. /tap, zapisy z kolejki) nie jest powtarzany przez urllib3 - powtorke robi outbox z kluczem
+    assert not retry.is_retry("POST", 503)
+    api.close()
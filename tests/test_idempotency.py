@@ -0,0 +1,69 @@
+import time
+import uuid
+
+
+def test_repeated_write_returns_stored_response(client):
+    key = uuid.uuid4().hex
+    body = {'rfid': f'idem-{key}', 'sets': {'Lunch': {}}}
+    first = client.post('/rfid', json=body, headers={'Idempotency-Key': key})
+    second = client.post('/rfid', json=body, headers={'Idempotency-Key': key})
+    assert first.status_code == second.status_code == 201
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json() == first.get_json()
+    # Bez klucza ten sam zapis to konflikt
+    assert client.post('/rfid', json=body).status_code == 409
+
+
+def test_key_reused_for_another_request_is_rejected(client):
+    key = uuid.uuid4().hex
+    client.post('/tap/idem-a', headers={'Idempotency-Key': key})
+    assert client.post('/tap/idem-b', headers={'Idempotency-Key': key}).status_code == 422
+
+
+def test_client_error_is_remembered(client):
+    key = uuid.uuid4().hex
+    bad = client.put('/rfid/idem-c/sets/x', data='not json', headers={'Idempotency-Key': key})
+    assert bad.status_code == 400
+    replay = client.put('/rfid/idem-c/sets/x', data='not json', headers={'Idempotency-Key': key})
+    assert replay.status_code == 400 and replay.headers['Idempotent-Replayed'] == 'true'
+
+
+def test_server_error_frees_its_key(client, monkeypatch):
+    import app
+
+    def broken(db, rfid):
+        raise RuntimeError("database is locked")
+
+    key = uuid.uuid4().hex
+    monkeypatch.setattr(app, 'load_sets', broken)
+    assert client.post('/tap/idem-d', headers={'Idempotency-Key': key}).status_code == 500
+    monkeypatch.undo()
+    retry = client.post('/tap/idem-d', headers={'Idempotency-Key': key})
+    assert retry.status_code == 200 and 'Idempotent-Replayed' not in retry.headers
+
+
+def test_abandoned_claim_can_be_taken_over(db):
+    import idempotency
+
+    # Proces padl po zajeciu klucza - teardown nie zwolnil go
+    assert idempotency.claim(db, 'key-1', 'POST /tap/x', now=1000.0) is None
+    assert idempotency.claim(db, 'key-1', 'POST /tap/x', now=1001.0)['status'] is None
+    later = 1000.0 + idempotency.CLAIM_LEASE + 1
+    assert idempotency.claim(db, 'key-1', 'POST /tap/x', now=later) is None
+
+    # Spoznione zwolnienie pierwszego zapytania nie rusza nowego zajecia
+    idempotency.release(db, 'key-1', 1000.0)
+    idempotency.store(db, 'key-1', later, 200, b'{}', 'application/json')
+    assert idempotency.claim(db, 'key-1', 'POST /tap/x', now=later + 1)['status'] == 200
+
+
+def test_abandoned_claim_lets_the_replay_run(client):
+    import app
+    import idempotency
+
+    key = uuid.uuid4().hex
+    with app.app.app_context():
+        idempotency.claim(app.get_db(), key, 'POST /tap/idem-e', now=time.time() - idempotency.CLAIM_LEASE - 1)
+    replay = client.post('/tap/idem-e', headers={'Idempotency-Key': key})
+    assert replay.status_code == 200 and 'Idempotent-Replayed' not in replay.headers
+    assert client.post('/tap/idem-e', headers={'Idempotency-Key': key}).headers['Idempotent-Replayed'] == 'true'
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from init_database import ConnectionManager, init_db
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db_name = str(tmp_path / "pool.sqlite")
+    init_db(db_name)
+    manager = ConnectionManager(db_name, size=2, timeout=0.1)
+    yield manager
+    manager.close_all()
+
+
+def test_pool_reuses_connections_across_threads(manager):
+    def request():
+        connection = manager.connect()
+        connection.execute("SELECT 1").fetchone()
+        manager.release(connection)
+
+    for _ in range(50):
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+    assert manager.open_count() == 1
+
+
+def test_pool_is_bounded(manager):
+    first, second = manager.connect(), manager.connect()
+    with pytest.raises(Exception, match="Brak wolnego"):
+        manager.connect()
+    manager.release(first)
+    assert manager.connect() is first
+    assert manager.open_count() == 2
+    manager.release(second)
+
+
+def test_release_rolls_back(manager):
+    connection = manager.connect()
+    connection.execute("INSERT INTO categories (name) VALUES ('x')")
+    manager.release(connection)
+    assert manager.connect().execute("SELECT COUNT(*) FROM categories").fetchone()[0] == 0
+
+
+def test_connection_block_returns_the_connection(manager):
+    with pytest.raises(RuntimeError):
+        with manager.connection() as connection:
+            connection.execute("INSERT INTO categories (name) VALUES ('x')")
+            raise RuntimeError("boom")
+    with manager.connection() as again, manager.connection() as other:
+        assert again is connection and other is not connection
+        assert again.execute("SELECT COUNT(*) FROM categories").fetchone()[0] == 0
+
+
+def test_requests_do_not_leak_connections(client):
+    from init_database import db_manager
+
+    assert client.get('/changes').status_code == 200
+    opened = db_manager.open_count()
+    for _ in range(20):
+        assert client.get('/changes').status_code == 200
+    assert db_manager.open_count() == opened
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+import kiosk_controller
+from kiosk_controller import KioskController
+
+
+class FakeRoot:
+    """Stand-in for Tk: after() callbacks run when the test pumps the loop."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self, rounds=20):
+        for _ in range(rounds):
+            pending, self.pending = self.pending, []
+            for callback in pending:
+                callback()
+            time.sleep(0.005)
+
+
+class FakeView:
+    def __init__(self):
+        self.master = FakeRoot()
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args))
+
+    def called(self, name):
+        return [args for call, args in self.calls if call == name]
+
+
+class FakeModel:
+    def __init__(self, taps=None, write_result=None):
+        self.taps = taps or {}
+        self.write_result = write_result
+
+    def get_menu(self):
+        return []
+
+    def tap_rfid(self, rfid):
+        return self.taps.get(rfid, {"rfid": rfid, "message": "ok", "sets": {}})
+
+    def local_sets(self, rfid):
+        return None
+
+    def get_sets_by_rfid(self, rfid):
+        return {}
+
+    def delete_set(self, set_name, rfid):
+        return self.write_result
+
+    def rename_set(self, set_name_old, rfid, set_name_new):
+        return self.write_result
+
+
+@pytest.fixture(autouse=True)
+def no_auto_refresh(monkeypatch):
+    monkeypatch.setattr(kiosk_controller.MenuStore, "start_auto_refresh", lambda self, *args: None)
+
+
+def make_controller(model):
+    view = FakeView()
+    controller = KioskController(model, view)
+    view.master.pump()
+    return controller, view
+
+
+def tap(controller, view, rfid):
+    controller.handle_rfid_input(rfid)
+    view.master.pump()
+
+
+def test_rejected_delete_is_reported_as_failure():
+    controller, view = make_controller(FakeModel(write_result={"success": False, "message": "Set not found"}))
+    tap(controller, view, "A")
+    controller.delete_set("Lunch")
+    view.master.pump()
+    assert not [args for args in view.called("show_info") if args[0] == "Usunięto Zestaw"]
+    assert any("Set not found" in args[1] for args in view.called("show_warning"))
+
+
+def test_successful_delete_is_confirmed():
+    controller, view = make_controller(FakeModel(write_result={"success": True, "message": "ok"}))
+    tap(controller, view, "A")
+    controller.delete_set("Lunch")
+    view.master.pump()
+    assert [args for args in view.called("show_info") if args[0] == "Usunięto Zestaw"]
+
+
+def test_failed_tap_keeps_the_previous_card():
+    model = FakeModel(taps={"B": {"message": "Błąd połączenia z bazą danych"}})
+    controller, view = make_controller(model)
+    tap(controller, view, "A")
+    first = controller.session
+
+    tap(controller, view, "B")
+    assert controller.current_rfid == "A"
+    assert controller.session is first and controller.session.rfid == "A"
+    assert view.called("update_rfid_display")[-1] == ("A",)
+
+    controller.show_user_sets()
+    view.master.pump()
+    assert not [args for args in view.called("show_warning") if args[0] == "Brak karty"]
+
+
+def test_confirmed_tap_switches_card_and_session_together():
+    controller, view = make_controller(FakeModel())
+    tap(controller, view, "A")
+    tap(controller, view, "B")
+    assert controller.current_rfid == controller.session.rfid == "B"
+    assert controller.pending_session is None
+
+
+def test_error_session_falls_back_to_tap_request():
+    model = FakeModel()
+    calls = []
+    model.tap_rfid = lambda rfid: calls.append(rfid) or {"rfid": rfid, "message": "ok", "sets": {}}
+    controller, view = make_controller(model)
+    controller.handle_session_push({"rfid": "A", "error": "database is locked"})
+    view.master.pump()
+    assert calls == ["A"]
+    assert controller.current_rfid == "A"
@@ -0,0 +1,41 @@
+from kiosk_model import KioskModel
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeHttp:
+    def __init__(self, response):
+        self.response = response
+        self.headers = []
+
+    def request(self, method, url, json=None, headers=None):
+        self.headers.append(headers)
+        return self.response
+
+
+def test_set_writes_report_success_for_200():
+    model = KioskModel(http=FakeHttp(FakeResponse(200, {"success": True, "message": "Set deleted successfully"})))
+    assert model.delete_set("Lunch", "1")["success"] is True
+    assert model.rename_set("Lunch", "1", "Obiad")["success"] is True
+
+
+def test_set_writes_report_backend_rejection():
+    model = KioskModel(http=FakeHttp(FakeResponse(409, {"error": "Zestaw 'Obiad' już istnieje."})))
+    result = model.rename_set("Lunch", "1", "Obiad")
+    assert result == {"success": False, "message": "Zestaw 'Obiad' już istnieje."}
+
+
+def test_set_writes_carry_an_idempotency_key():
+    http = FakeHttp(FakeResponse(200, {"success": True}))
+    model = KioskModel(http=http)
+    model.delete_set("Lunch", "1")
+    model.delete_set("Lunch", "1")
+    keys = [headers["Idempotency-Key"] for headers in http.headers]
+    assert len(set(keys)) == 2
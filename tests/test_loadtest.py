@@ -0,0 +1,12 @@
+import pytest
+
+import loadtest
+
+
+def test_worker_crash_is_reported(monkeypatch):
+    def crash(*args):
+        raise RuntimeError("worker crashed")
+
+    monkeypatch.setattr(loadtest, 'run_worker', crash)
+    with pytest.raises(RuntimeError, match="worker crashed"):
+        loadtest.run_load('http://127.0.0.1:9', 0.01, 2, 0.0)
@@ -0,0 +1,80 @@
+import pytest
+
+from kiosk_model import KioskModel
+from menu_store import MenuStore
+
+BURGERS = {"category_id": 1, "name": "Burgers"}
+CLASSIC = {"product_id": 101, "name": "Classic Burger", "price": 9.99, "category_id": 1}
+CHEESE = {"product_id": 102, "name": "Cheeseburger", "price": 10.99, "category_id": 1}
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, etag=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = {"ETag": etag} if etag else {}
+
+    def json(self):
+        return self._data
+
+
+class FakeCatalog:
+    """Serves catalog resources by path with ETag revalidation; a path missing from `resources` is down."""
+
+    def __init__(self, resources):
+        self.resources = resources
+        self.requests = []
+
+    def get(self, url, params=None, headers=None):
+        path = url.split(KioskModel.BASE_URL, 1)[1]
+        if params:
+            path += f"?category={params['category']}"
+        self.requests.append((path, dict(headers or {})))
+        if path not in self.resources:
+            return None
+        etag, data = self.resources[path]
+        if (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, data, etag)
+
+
+@pytest.fixture
+def catalog():
+    return FakeCatalog({"/kiosk/bootstrap": ('"v1"', [dict(BURGERS, products=[CLASSIC])])})
+
+
+def test_category_lookup(catalog):
+    store = MenuStore(KioskModel(http=catalog))
+    assert store.refresh() is True
+    assert store.categories() == [BURGERS]
+    assert store.products_in("Burgers") == [CLASSIC]
+    assert store.products_in("Desserts") is None
+    assert store.product_by_id(101) is store.product_by_name("Classic Burger")
+
+
+def test_failed_bootstrap_falls_back_to_categories(catalog):
+    catalog.resources = {"/categories": ('"c1"', [BURGERS]),
+                         "/products?category=Burgers": ('"p1"', [CLASSIC, CHEESE])}
+    store = MenuStore(KioskModel(http=catalog))
+    assert store.refresh() is True
+    assert store.products_in("Burgers") == [CLASSIC, CHEESE]
+
+
+def test_offline_refresh_keeps_the_menu(catalog):
+    store = MenuStore(KioskModel(http=catalog))
+    store.refresh()
+    catalog.resources = {}
+    assert store.refresh() is False
+    assert store.products_in("Burgers") == [CLASSIC] and store.version == 1
+
+
+def test_refresh_follows_etag_changes(catalog):
+    store = MenuStore(KioskModel(http=catalog))
+    store.refresh()
+    assert store.refresh() is False  # 304 - ta sama wersja
+    assert catalog.requests[-1] == ("/kiosk/bootstrap", {"If-None-Match": '"v1"'})
+    assert store.version == 1
+
+    catalog.resources["/kiosk/bootstrap"] = ('"v2"', [dict(BURGERS, products=[CLASSIC, CHEESE])])
+    assert store.refresh() is True
+    assert store.version == 2 and store.product_by_name("Cheeseburger") == CHEESE
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+import migrations
+from init_database import init_db, open_connection
+
+
+def test_fresh_database_is_at_latest_version(db):
+    assert migrations.get_schema_version(db) == migrations.MIGRATIONS[-1][0]
+    migrations.check_query_plans(db)
+
+
+def test_migration_3_removes_duplicate_sets(tmp_path, monkeypatch):
+    db_name = str(tmp_path / "v2.sqlite")
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:2])
+    init_db(db_name)
+    db = open_connection(db_name)
+    db.execute("INSERT INTO rfid (rfid_id) VALUES ('1')")
+    for _ in range(3):
+        zestaw_id = db.execute("INSERT INTO zestawy (zestaw_name, rfid_id) VALUES ('Lunch', '1')").lastrowid
+        db.execute("INSERT INTO product_zestaw (product_id, zestaw_id) VALUES (1, ?)", (zestaw_id,))
+    db.commit()
+    monkeypatch.undo()
+
+    assert migrations.run_migrations(db) == migrations.MIGRATIONS[-1][0]
+    assert [tuple(row) for row in db.execute("SELECT zestaw_id FROM zestawy")] == [(zestaw_id,)]
+    assert db.execute("SELECT zestaw_id FROM product_zestaw").fetchall()[0][0] == zestaw_id
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("INSERT INTO zestawy (zestaw_name, rfid_id) VALUES ('Lunch', '1')")
+    db.close()
+
+
+def test_assign_rfid_with_existing_set_name_is_a_conflict(client):
+    body = {'rfid': 'migr-1', 'sets': {'Lunch': {}}}
+    assert client.post('/rfid', json=body).status_code == 201
+    response = client.post('/rfid', json=body)
+    assert response.status_code == 409
+    assert 'error' in response.get_json()
+
+
+def test_plan_check_covers_the_shared_route_queries():
+    import queries
+
+    shared = {value for name, value in vars(queries).items() if name.isupper()}
+    assert set(migrations.ROUTE_QUERIES.values()) == shared
+
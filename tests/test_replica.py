@@ -0,0 +1,102 @@
+import pytest
+
+from replica import LocalReplica, SyncEngine, IDEMPOTENCY_HEADER
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+
+class FakeHttp:
+    """Answers writes with scripted status codes per path and serves an empty /changes feed."""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.requests = []
+
+    def request(self, method, url, json=None, headers=None):
+        path = url.split("http://backend", 1)[1]
+        self.requests.append((method, path, headers or {}))
+        status = self.statuses.get(path, 200)
+        if status == "busy":
+            return FakeResponse(503, headers={"Retry-After": "1"})
+        return None if status is None else FakeResponse(status)
+
+    def get(self, url, params=None):
+        return FakeResponse(200, {"changes": [], "last_seq": params["since"], "more": False})
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = LocalReplica(str(tmp_path / "replica.sqlite"))
+    yield replica
+    replica.close()
+
+
+def test_poisoned_entry_goes_to_dead_letter(replica):
+    replica.enqueue("/bad", {"n": 1})
+    replica.enqueue("/good", {"n": 2})
+    http = FakeHttp({"/bad": 500})
+    engine = SyncEngine(replica, http, "http://backend", max_attempts=3)
+
+    assert engine.sync_once() is False
+    assert engine.sync_once() is False
+    assert engine.sync_once() is True  # trzecia proba: /bad odlozony, /good wyslany
+    assert replica.pending() == []
+    assert [(entry["path"], entry["attempts"], entry["status"]) for entry in replica.dead_letters()] == \
+        [("/bad", 3, 500)]
+    assert [path for _, path, _ in http.requests].count("/good") == 1
+
+
+def test_retry_after_is_not_a_failed_attempt(replica):
+    replica.enqueue("/add_set", {"n": 1}, idempotency_key="key-1")
+    http = FakeHttp({"/add_set": "busy"})
+    engine = SyncEngine(replica, http, "http://backend", max_attempts=2)
+    for _ in range(5):
+        assert engine.sync_once() is False
+    assert replica.dead_letters() == []
+    http.statuses = {}
+    assert engine.sync_once() is True
+    assert replica.pending() == []
+
+
+def test_rejected_entry_is_kept_in_dead_letter(replica):
+    replica.enqueue("/add_set", {"set_name": "x"})
+    assert SyncEngine(replica, FakeHttp({"/add_set": 409}), "http://backend").sync_once() is True
+    assert replica.dead_letters()[0]["status"] == 409
+
+
+def test_replay_sends_the_original_idempotency_key(replica):
+    replica.enqueue("/add_set", {}, idempotency_key="key-1")
+    http = FakeHttp({})
+    SyncEngine(replica, http, "http://backend").sync_once()
+    assert http.requests[0][2] == {IDEMPOTENCY_HEADER: "key-1"}
+
+
+def test_cached_sets_follow_product_changes(replica):
+    product = {"product_id": 1, "name": "Burger", "price": 10.0, "category_id": 1}
+    replica.apply_changes([{"entity": "product", "key": 1, "data": product}], 1)
+    replica.store_card("card", {"Lunch": [dict(product, quantity=2)]})
+
+    replica.apply_changes([{"entity": "product", "key": 1, "data": dict(product, price=12.5)}], 2)
+    assert replica.sets("card")["Lunch"][0]["price"] == 12.5
+
+    replica.apply_changes([{"entity": "product", "key": 1, "data": None}], 3)
+    assert replica.sets("card") == {"Lunch": []}
+
+
+def test_sets_before_first_sync_use_stored_items(replica):
+    replica.store_card("card", {"Lunch": [{"product_id": 7, "name": "Fries", "price": 3.0, "quantity": 1}]})
+    assert replica.sets("card")["Lunch"][0]["name"] == "Fries"
+
+
+def test_empty_cart_upsert_deletes_the_local_set(replica):
+    replica.store_card("card", {"Lunch": [{"product_id": 7, "name": "Fries", "price": 3.0, "quantity": 1}]})
+    replica.apply_add_set("card", "Lunch", {})
+    assert replica.sets("card") == {}
@@ -0,0 +1,96 @@
+import threading
+
+from rfid_reader import RFID, PollingScheduler
+
+
+class ScriptedReader:
+    """Reader over a fake clock: every read() takes 0.1 s and sees the card scripted for that moment."""
+
+    supports_irq = True
+
+    def __init__(self, scheduler_holder, cards, irq_after=None):
+        self.now = 0.0
+        self.cards = cards  # {czas: uid}
+        self.holder = scheduler_holder
+        self.irq_waits = 0
+        self.irq_after = irq_after
+
+    def read(self):
+        self.now += 0.1
+        if self.now > 6:
+            self.holder[0].stop()
+        return self.cards.get(round(self.now, 1))
+
+    def wait_for_irq(self, timeout):
+        self.irq_waits += 1
+        self.now += timeout
+        if self.irq_after is not None and self.irq_waits >= self.irq_after:
+            self.irq_after = None
+            self.now = 5.0
+            return True
+        return False
+
+
+def make_scheduler(cards, use_irq=False, irq_after=None):
+    holder, tags, intervals = [], [], []
+    reader = ScriptedReader(holder, cards, irq_after)
+    scheduler = PollingScheduler(reader, tags.append, fast_interval=0.0001, idle_interval=0.0008,
+                                 fast_window=1.0, backoff=2.0, use_irq=use_irq, clock=lambda: reader.now)
+    next_interval = scheduler.next_interval
+    scheduler.next_interval = lambda *args: intervals.append(next_interval(*args)) or intervals[-1]
+    holder.append(scheduler)
+    return scheduler, reader, tags, intervals
+
+
+def test_interval_backs_off_when_idle_and_snaps_back_after_a_tag():
+    scheduler, _, tags, intervals = make_scheduler({2.0: 42})
+    scheduler.run()
+    assert tags == [42]
+    assert intervals[0] == 0.0002 and max(intervals[:19]) == 0.0008  # bezczynnosc do 2 s
+    assert intervals[19] == 0.0001  # odczyt w 2.0 s
+    assert set(intervals[19:29]) == {0.0001}  # przez fast_window
+    assert intervals[30] > 0.0001
+
+
+def test_irq_mode_waits_for_the_interrupt_when_idle():
+    scheduler, reader, tags, _ = make_scheduler({5.1: 7}, use_irq=True, irq_after=3)
+    scheduler.run()
+    assert tags == [7]
+    assert scheduler.polls < 25  # bez przerwania bylyby odczyty co 0.1 s przez 6 s
+    assert reader.irq_waits >= 3
+
+
+class RegisterReader:
+    CommIrqReg, FIFOLevelReg, FIFODataReg, CommandReg, BitFramingReg, CommIEnReg = range(6)
+    PICC_REQIDL, PCD_TRANSCEIVE = 0x26, 0x0C
+
+    def __init__(self, answer_on=None):
+        self.arms = 0
+        self.answer_on = answer_on
+        self.rfid = None
+
+    def Write_MFRC522(self, register, value):
+        if register == self.CommandReg:
+            self.arms += 1
+            if self.arms == self.answer_on:
+                self.rfid._irq.set()  # karta odpowiedziala na to REQA
+
+
+def irq_reader(answer_on=None):
+    hardware = RegisterReader(answer_on)
+    rfid = RFID(hardware)
+    rfid._irq = threading.Event()
+    hardware.rfid = rfid
+    return rfid, hardware
+
+
+def test_wait_for_irq_rearms_the_request_until_timeout():
+    rfid, hardware = irq_reader()
+    assert rfid.wait_for_irq(0.05, rearm_interval=0.01) is False
+    assert hardware.arms >= 4
+
+
+def test_wait_for_irq_returns_on_a_later_request():
+    rfid, hardware = irq_reader(answer_on=3)
+    assert rfid.wait_for_irq(1.0, rearm_interval=0.01) is True
+    assert hardware.arms == 3
@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+
+from seeder import seed_scale
+
+
+def test_seed_scale_with_fewer_products_than_set_size(db):
+    counts = seed_scale(db, num_cards=10, num_sets=20, num_products=2, num_categories=2, chunk_size=7)
+    assert counts["sets"] == 20
+    assert db.execute("SELECT COUNT(*) FROM zestawy").fetchone()[0] == 20
+    assert db.execute("SELECT MAX(product_id) FROM product_zestaw").fetchone()[0] <= 2
+
+
+def test_seed_scale_is_reproducible(tmp_path):
+    from init_database import init_db, open_connection
+
+    dumps = []
+    for name in ("a.sqlite", "b.sqlite"):
+        init_db(str(tmp_path / name))
+        db = open_connection(str(tmp_path / name))
+        seed_scale(db, num_cards=5, num_sets=10, num_products=8, num_categories=2)
+        dumps.append(db.execute("SELECT * FROM product_zestaw ORDER BY id").fetchall())
+        db.close()
+    assert [tuple(row) for row in dumps[0]] == [tuple(row) for row in dumps[1]]
+
+
+def trigger_names(db):
+    return sorted(row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+
+
+def test_seed_scale_rebuilds_change_log_and_triggers(db):
+    triggers = trigger_names(db)
+    seed_scale(db, num_cards=4, num_sets=6, num_products=5, num_categories=2, chunk_size=3)
+    assert trigger_names(db) == triggers
+    logged = dict(db.execute("SELECT entity, COUNT(*) FROM change_log GROUP BY entity").fetchall())
+    cards_with_sets = db.execute("SELECT COUNT(DISTINCT rfid_id) FROM zestawy").fetchone()[0]
+    assert logged == {"category": 2, "product": 5, "card": 4, "sets": cards_with_sets}
+    # Triggery dzialaja dalej dla zwyklych zapisow
+    db.execute("INSERT INTO rfid (rfid_id) VALUES ('new-card')")
+    assert db.execute("SELECT 1 FROM change_log WHERE entity_key = 'new-card'").fetchone()
+
+
+def test_seed_scale_needs_cards_and_products(db):
+    for options in ({"num_cards": 0}, {"num_products": 0}):
+        with pytest.raises(ValueError):
+            seed_scale(db, **dict(dict(num_cards=2, num_sets=2, num_products=2, num_categories=1), **options))
+    assert db.execute("SELECT COUNT(*) FROM rfid").fetchone()[0] == 0
+
+
+def test_failed_seed_keeps_the_triggers(db):
+    triggers = trigger_names(db)
+    db.execute("INSERT INTO categories (category_id, name) VALUES (1, 'taken')")
+    db.commit()
+    with pytest.raises(sqlite3.IntegrityError):
+        seed_scale(db, num_cards=2, num_sets=2, num_products=2, num_categories=1)
+    assert trigger_names(db) == triggers
+    assert db.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 0
@@ -0,0 +1,45 @@
+import pytest
+
+from sets_cache import SetsCache
+
+
+def test_hit_after_miss():
+    cache = SetsCache(maxsize=2)
+    loads = []
+    cache.get_or_load("1", lambda: loads.append(1) or {"a": []})
+    sets, body = cache.get_or_load("1", lambda: loads.append(1) or {"b": []})
+    assert sets == {"a": []} and body == '{"a": []}'
+    assert len(loads) == 1
+
+
+def test_invalidation_during_load_is_not_cached():
+    cache = SetsCache()
+
+    def load():
+        cache.invalidate("1")
+        return {"stale": []}
+
+    cache.get_or_load("1", load)
+    assert cache.get_or_load("1", lambda: {"fresh": []})[0] == {"fresh": []}
+
+
+def test_bookkeeping_stays_bounded():
+    cache = SetsCache(maxsize=10)
+    for rfid in range(1000):
+        cache.get_or_load(rfid, lambda: {})
+        cache.invalidate(rfid)
+    for rfid in range(1000, 2000):
+        cache.invalidate(rfid)
+    assert cache._loads == {}
+    assert cache.stats()["size"] == 0
+
+
+def test_failed_load_is_cleaned_up():
+    cache = SetsCache()
+
+    def load():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("1", load)
+    assert cache._loads == {}
@@ -0,0 +1,48 @@
+from tap_dispatcher import TapDispatcher
+
+
+def make_dispatcher(**kwargs):
+    now = [0.0]
+    scheduled, delivered = [], []
+    dispatcher = TapDispatcher(lambda uid, payload: delivered.append((uid, payload)), scheduled.append,
+                               clock=lambda: now[0], **kwargs)
+    return dispatcher, now, scheduled, delivered
+
+
+def drain(scheduled):
+    while scheduled:
+        scheduled.pop(0)()
+
+
+def test_distinct_cards_keep_their_order_and_share_one_drain():
+    dispatcher, _, scheduled, delivered = make_dispatcher()
+    for uid in ("A", "B", "C"):
+        assert dispatcher.offer(uid)
+    assert len(scheduled) == 1
+    drain(scheduled)
+    assert delivered == [("A", None), ("B", None), ("C", None)]
+
+
+def test_repeated_taps_of_a_card_are_coalesced():
+    dispatcher, now, scheduled, delivered = make_dispatcher(coalesce_window=1.0)
+    dispatcher.offer("A", {"n": 1})
+    dispatcher.offer("A", {"n": 2})  # jeszcze w kolejce - zostaje najnowszy
+    drain(scheduled)
+    assert delivered == [("A", {"n": 2})]
+
+    now[0] = 0.5
+    assert not dispatcher.offer("A")  # dopiero dostarczona
+    now[0] = 2.0
+    assert dispatcher.offer("A")
+    drain(scheduled)
+    assert [uid for uid, _ in delivered] == ["A", "A"]
+    assert dispatcher.stats()["coalesced"] == 2
+
+
+def test_full_queue_drops_the_oldest_tap():
+    dispatcher, _, scheduled, delivered = make_dispatcher(max_pending=2)
+    for uid in ("A", "B", "C"):
+        dispatcher.offer(uid)
+    drain(scheduled)
+    assert delivered == [("B", None), ("C", None)]
+    assert dispatcher.stats()["dropped"] == 1 and dispatcher.stats()["max_depth"] == 2
@@ -0,0 +1,52 @@
+import json
+
+from tap_filter import TapFilter, decode_session, decode_tap
+from tap_message import TapEncoder
+
+NOW = 1_760_000_000.0
+
+
+def encoder(read_at=NOW, reader_id="reader-1"):
+    return TapEncoder(reader_id, clock=lambda: 100.0, wall_clock=lambda: read_at)
+
+
+def test_encoder_round_trip():
+    tap = decode_tap(encoder().encode(1234))
+    assert tap["reader_id"] == "reader-1" and tap["seq"] == 1 and tap["uid"] == "1234"
+    assert tap["wall_time"] == NOW
+
+
+def test_sequence_numbers_increase():
+    tap_encoder = encoder()
+    assert [decode_tap(tap_encoder.encode(1))["seq"] for _ in range(3)] == [1, 2, 3]
+
+
+def test_duplicates_and_foreign_readers_are_dropped():
+    tap_filter = TapFilter(["reader-1"], clock=lambda: NOW)
+    message = encoder().encode(1)
+    assert tap_filter.accept(decode_tap(message))
+    assert not tap_filter.accept(decode_tap(message))
+    assert not tap_filter.accept(decode_tap(encoder(reader_id="reader-2").encode(1)))
+    assert tap_filter.stats() == {"accepted": 1, "foreign": 1, "duplicate": 1, "stale": 0}
+
+
+def test_replayed_backlog_is_stale_even_as_first_taps():
+    tap_filter = TapFilter(["reader-1"], clock=lambda: NOW)
+    old = encoder(read_at=NOW - 600)
+    assert not any(tap_filter.accept(decode_tap(old.encode(uid))) for uid in range(5))
+    assert tap_filter.stats()["stale"] == 5
+    assert tap_filter.accept(decode_tap(encoder().encode(9)))
+
+
+def test_session_carries_the_tap():
+    tap = json.loads(encoder().encode(7))
+    session = json.dumps({"v": 1, "tap": tap, "rfid": "7", "new": False, "message": "ok", "sets": {}})
+    decoded_tap, response = decode_session(session)
+    assert decoded_tap["wall_time"] == NOW
+    assert response == {"rfid": "7", "new": False, "message": "ok", "sets": {}}
+
+
+def test_error_session_decodes_to_error_response():
+    tap = json.loads(encoder().encode(7))
+    session = json.dumps({"v": 1, "tap": tap, "rfid": "7", "error": "database is locked"})
+    assert decode_session(session)[1] == {"rfid": "7", "error": "database is locked"}
@@ -0,0 +1,72 @@
+import json
+import sqlite3
+
+import tap_gateway
+from tap_filter import decode_session
+from tap_gateway import TapGateway
+from tap_message import TapEncoder
+
+
+def make_gateway(db, **kwargs):
+    published = []
+    gateway = TapGateway(db, lambda topic, payload: published.append((topic, payload)),
+                         retry_delay=0, **kwargs)
+    return gateway, published
+
+
+def taps(*uids):
+    encoder = TapEncoder("reader-1", clock=lambda: 100.0, wall_clock=lambda: 1_760_000_000.0)
+    return [tap_gateway.parse_tap(encoder.encode(uid)) for uid in uids]
+
+
+def flaky_register(failures):
+    calls = []
+    register = tap_gateway.register_cards
+
+    def fake(db, rfids):
+        calls.append(list(rfids))
+        if len(calls) <= failures:
+            raise sqlite3.OperationalError("database is locked")
+        return register(db, rfids)
+
+    return fake, calls
+
+
+def test_batch_publishes_one_session_per_tap(db):
+    gateway, published = make_gateway(db)
+    gateway.process_batch(taps(1, 1))
+    sessions = [decode_session(payload)[1] for _, payload in published]
+    assert [topic for topic, _ in published] == ["kiosk/kiosk-1/session"] * 2
+    assert [session["new"] for session in sessions] == [True, False]
+    assert json.loads(published[0][1])["tap"]["w"] == 1_760_000_000_000
+
+
+def test_redelivered_taps_are_dropped(db):
+    gateway, _ = make_gateway(db)
+    message = TapEncoder("reader-1").encode(1)
+    assert gateway.submit(message)
+    assert not gateway.submit(message)
+    assert gateway.stats()["dropped"] == 1
+
+
+def test_locked_database_is_retried(db, monkeypatch):
+    fake, calls = flaky_register(failures=2)
+    monkeypatch.setattr(tap_gateway, "register_cards", fake)
+    gateway, published = make_gateway(db)
+    gateway.process_batch(taps(1))
+    assert len(calls) == 3
+    assert decode_session(published[0][1])[1]["rfid"] == "1"
+    assert "error" not in json.loads(published[0][1])
+    assert gateway.stats()["retries"] == 2
+
+
+def test_failed_batch_publishes_error_sessions(db, monkeypatch):
+    fake, calls = flaky_register(failures=10)
+    monkeypatch.setattr(tap_gateway, "register_cards", fake)
+    gateway, published = make_gateway(db, retries=1)
+    gateway.process_batch(taps(1, 2))
+    assert len(calls) == 2
+    responses = [decode_session(payload)[1] for _, payload in published]
+    assert [response["rfid"] for response in responses] == ["1", "2"]
+    assert all("database is locked" in response["error"] for response in responses)
+    assert gateway.stats()["failed"] == 2 and gateway.stats()["published"] == 0
@@ -0,0 +1,116 @@
+import itertools
+import os
+import threading
+
+from tap_publisher import Debouncer, DiskOutbox, TapPublisher, MQTT_ERR_NO_CONN
+
+
+class Info:
+    def __init__(self, mid, rc=0):
+        self.mid = mid
+        self.rc = rc
+
+
+class FakeClient:
+    """paho-like client; ack_inline delivers the PUBACK from another thread before publish() returns."""
+
+    def __init__(self, rc=0, ack_inline=False):
+        self.rc = rc
+        self.ack_inline = ack_inline
+        self.published = []
+        self._mids = itertools.count(1)
+        self.publisher = None
+
+    def publish(self, topic, payload, qos):
+        assert not self.publisher._lock.locked(), "publish() called under the publisher lock"
+        mid = next(self._mids)
+        self.published.append((mid, payload))
+        if self.ack_inline:
+            # Watek sieciowy paho potwierdza, zanim publish() wroci do wywolujacego
+            thread = threading.Thread(target=self.on_publish, args=(self, None, mid))
+            thread.start()
+            thread.join(timeout=2)
+            assert not thread.is_alive(), "on_publish deadlocked"
+        return Info(mid, self.rc)
+
+
+def make_publisher(client, outbox=None):
+    publisher = TapPublisher(client, "rfid/reader-1/read", outbox)
+    client.publisher = publisher
+    publisher.attach()
+    return publisher
+
+
+def test_ack_before_publish_returns_completes_the_tap():
+    client = FakeClient(ack_inline=True)
+    publisher = make_publisher(client)
+    publisher.on_connect(client, None, {}, 0)
+    publisher.publish_tap("tap")
+    stats = publisher.stats()
+    assert stats["published"] == 1 and stats["pending"] == 0 and stats["inflight"] == 0
+
+
+def test_reconnect_does_not_republish_inflight_taps():
+    client = FakeClient()
+    publisher = make_publisher(client)
+    publisher.on_connect(client, None, {}, 0)
+    publisher.publish_tap("a")
+    publisher.on_disconnect(client, None, 1)
+    publisher.on_connect(client, None, {}, 0)
+    assert [payload for _, payload in client.published] == ["a"]
+    # PUBACK dla wiadomosci ponowionej przez paho nadal zamyka odczyt
+    publisher.on_publish(client, None, client.published[0][0])
+    assert publisher.stats()["pending"] == 0
+
+
+def test_taps_while_disconnected_are_left_to_paho():
+    client = FakeClient(rc=MQTT_ERR_NO_CONN)
+    publisher = make_publisher(client)
+    publisher.publish_tap("offline")
+    publisher.on_connect(client, None, {}, 0)
+    assert len(client.published) == 1
+    assert publisher.stats()["inflight"] == 1
+
+
+def test_unacked_taps_survive_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    client = FakeClient()
+    publisher = make_publisher(client, DiskOutbox(path))
+    publisher.on_connect(client, None, {}, 0)
+    publisher.publish_tap("acked")
+    publisher.publish_tap("lost")
+    publisher.on_publish(client, None, client.published[0][0])
+    publisher.close()
+
+    client = FakeClient()
+    publisher = make_publisher(client, DiskOutbox(path))
+    publisher.on_connect(client, None, {}, 0)
+    assert [payload for _, payload in client.published] == ["lost"]
+    assert publisher.stats()["retried"] == 1
+    publisher.close()
+
+
+def test_outbox_fsyncs_added_taps_and_compaction(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    outbox = DiskOutbox(str(tmp_path / "outbox.jsonl"))
+    outbox.append(1, "tap")
+    assert len(synced) == 1
+    outbox.ack(1)
+    assert len(synced) == 1  # zgubione potwierdzenie to tylko powtorna publikacja
+
+    outbox.rewrite([(2, "tap")])
+    assert len(synced) >= 2  # plik tymczasowy (i katalog, gdzie sie da)
+    outbox.close()
+
+
+def test_debouncer():
+    now = [0.0]
+    debouncer = Debouncer(interval=0.5, clock=lambda: now[0])
+    assert debouncer.accept(1)
+    now[0] = 0.3
+    assert not debouncer.accept(1)
+    assert debouncer.accept(2)
+    now[0] = 1.0
+    assert debouncer.accept(2)
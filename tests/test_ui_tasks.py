@@ -0,0 +1,75 @@
+import threading
+
+from ui_tasks import UiTaskRunner
+
+
+class FakeRoot:
+    """Stand-in for Tk: after() callbacks run only when the test pumps the loop."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+def make_runner(workers=2):
+    root = FakeRoot()
+    busy = []
+    return UiTaskRunner(root, on_busy=busy.append, workers=workers), root, busy
+
+
+def test_results_are_delivered_only_by_the_drain():
+    runner, root, busy = make_runner()
+    done = []
+    runner.submit('menu', lambda: 42, done.append).result(timeout=5)
+    assert done == []
+    root.pump()
+    assert done == [42] and busy[-1] is False
+    runner.shutdown()
+
+
+def test_superseded_task_callback_never_runs():
+    runner, root, _ = make_runner()
+    started, release = threading.Event(), threading.Event()
+    done = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "old"
+
+    first = runner.submit('products', slow, done.append)
+    started.wait(5)
+    runner.submit('products', lambda: "new", done.append).result(timeout=5)
+    release.set()
+    first.result(timeout=5)
+    root.pump()
+    assert done == ["new"] and not runner.is_busy()
+    runner.shutdown()
+
+
+def test_cancelled_key_is_dropped():
+    runner, root, _ = make_runner(workers=1)
+    release = threading.Event()
+    done = []
+    blocker = runner.submit(None, lambda: release.wait(5))
+    running = runner.submit('user_sets', lambda: "running", done.append)  # czeka za blokujacym
+    runner.cancel('user_sets')
+    assert running.cancelled()
+    release.set()
+    blocker.result(timeout=5)
+
+    started = threading.Event()
+    late = runner.submit('user_sets', lambda: started.set() or "late", done.append)
+    started.wait(5)
+    runner.cancel('user_sets')  # juz dziala - wynik zostanie odrzucony
+    late.result(timeout=5)
+    root.pump()
+    assert done == [] and not runner.is_busy()
+    runner.shutdown()